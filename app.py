@@ -6,6 +6,8 @@ from drone_routing.data_generator import generate_drones, generate_deliveries, g
 from drone_routing.graph import Graph
 from drone_routing.csp import CSP
 from drone_routing.ga import GeneticAlgorithm
+from drone_routing.alns import ALNS
+from drone_routing.energy_model import compute_energy, battery_capacity_wh
 from typing import Dict, List
 import os
 from datetime import datetime
@@ -22,6 +24,8 @@ area_size_x = st.sidebar.number_input("Alan genişliği (m)", min_value=100.0, v
 area_size_y = st.sidebar.number_input("Alan yüksekliği (m)", min_value=100.0, value=1000.0)
 run_csp = st.sidebar.checkbox("CSP ile çöz", value=True)
 run_ga = st.sidebar.checkbox("GA ile çöz", value=True)
+run_alns = st.sidebar.checkbox("ALNS ile çöz", value=False)
+alns_iterations = st.sidebar.number_input("ALNS yineleme sayısı", min_value=1, max_value=100000, value=1000)
 br = st.sidebar.button("Çalıştır")
 
 # Log alanı oluştur
@@ -34,26 +38,33 @@ def evaluate_solution_ui(individual: Dict[int, List[int]], graph: Graph):
     energy = 0.0
     violations = 0
     total_wait = 0.0
-    earliest_start = min(graph._time_to_min(dp.time_window[0]) for dp in graph.deliveries)
+    earliest_start = graph.earliest_start
+    deliveries_by_id = {d.id: d for d in graph.deliveries}
     for dr in graph.drones:
         route = individual.get(dr.id, [])
         prev_pos = dr.start_pos
         current_time = earliest_start
+        battery = battery_capacity_wh(dr.battery)
+        energy_used = 0.0
         for dp_id in route:
-            dp = next(d for d in graph.deliveries if d.id == dp_id)
+            dp = deliveries_by_id[dp_id]
             dist = graph._distance(prev_pos, dp.pos)
             travel_time = (dist / dr.speed) * (1/60)
             arrival_time = current_time + travel_time
-            ws = graph._time_to_min(dp.time_window[0])
-            we = graph._time_to_min(dp.time_window[1])
+            ws, we = dp.time_window
             if arrival_time > we:
                 violations += 1
                 break
+            leg_energy = compute_energy(dist, dp.weight, dr.speed)
+            if energy_used + leg_energy > battery:
+                violations += 1
+                break
+            energy_used += leg_energy
             wait_time = max(0, ws - arrival_time)
             total_wait += wait_time
             if arrival_time < ws:
                 arrival_time = ws
-            energy += dist * dp.weight
+            energy += leg_energy
             delivered += 1
             prev_pos = dp.pos
             current_time = arrival_time
@@ -105,10 +116,8 @@ if br:
         csp = CSP(graph)
         assignments = csp.solve()
         t_csp = time.time() - start
-        # drone bazlı rotalara dönüştür
-        dr_routes = {dr.id: [] for dr in drones}
-        for dp_id, dr_id in assignments.items():
-            dr_routes[dr_id].append(dp_id)
+        # drone bazlı sıralı rotalar
+        dr_routes = csp.routes
         res = evaluate_solution_ui(dr_routes, graph)
         log(f"CSP: teslimat %{res[0]/m_deliveries*100:.2f}, enerji {res[1]:.2f}, iklal {res[2]}, ort. bekleme {res[3]:.2f}dk, süre {t_csp:.2f}s")
         results['CSP'] = dr_routes
@@ -122,6 +131,16 @@ if br:
         res = evaluate_solution_ui(best_ind, graph)
         log(f"GA: teslimat %{res[0]/m_deliveries*100:.2f}, enerji {res[1]:.2f}, iklal {res[2]}, ort. bekleme {res[3]:.2f}dk, süre {t_ga:.2f}s")
         results['GA'] = best_ind
+    # ALNS çözümü
+    if run_alns:
+        log("ALNS çözümü başlıyor...")
+        start = time.time()
+        alns = ALNS(graph, iterations=int(alns_iterations))
+        best_ind, best_fit = alns.run()
+        t_alns = time.time() - start
+        res = evaluate_solution_ui(best_ind, graph)
+        log(f"ALNS: teslimat %{res[0]/m_deliveries*100:.2f}, enerji {res[1]:.2f}, iklal {res[2]}, ort. bekleme {res[3]:.2f}dk, süre {t_alns:.2f}s")
+        results['ALNS'] = best_ind
 
     # Görselleştirme
     for key, routes in results.items():
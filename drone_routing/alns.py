@@ -0,0 +1,385 @@
+import math
+import random
+import time
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from .graph import Graph
+from .energy_model import compute_energy
+
+# Adaptif Büyük Komşuluk Araması (ALNS)
+#  - Yok etme: rastgele, en maliyetli, ilişkili (Shaw) ve zaman penceresi tabanlı
+#  - Onarım: açgözlü ve regret-k ekleme; tüm ekleme konumları NumPy ile birlikte değerlendirilir
+#  - Operatör ağırlıkları segment başına başarı puanlarıyla uyarlanır, kabul tavlama benzetimiyle
+# Amaç GA fitness'ıyla aynıdır: alpha * teslimat - beta * enerji; rotalar her zaman pencere, kapasite ve batarya olurludur.
+
+
+class ALNS:
+    """
+    Drone rotalarını {drone_id: [delivery_id, ...]} biçiminde üretir (GA ile aynı çıktı).
+    Mesafe, pencere, kapasite ve batarya verileri graf dizilerinden okunur; kenar enerjileri bir kez hesaplanır.
+    remove_fraction: her yinelemede kaldırılacak atanmış teslimat oranı aralığı.
+    scores: (yeni global en iyi, mevcuttan iyi, kabul edilen kötü) çözüm için operatör puanları.
+    start_temperature: başlangıç çözümünden bu oranda kötü bir çözümün %50 olasılıkla kabul edileceği sıcaklık;
+    sıcaklık son yinelemede başlangıcın final_temperature katına iner.
+    """
+    DESTROY = ("random", "worst", "related", "time_window")
+    REPAIR = ("greedy", "regret")
+    EPS = 1e-9
+
+    def __init__(self,
+                 graph: Graph,
+                 iterations: int = 1000,
+                 remove_fraction: Tuple[float, float] = (0.1, 0.3),
+                 regret_k: int = 3,
+                 segment_length: int = 50,
+                 reaction: float = 0.1,
+                 scores: Tuple[float, float, float] = (33.0, 9.0, 13.0),
+                 start_temperature: float = 0.05,
+                 final_temperature: float = 0.002,
+                 randomness: float = 3.0,  # worst / related seçiminde rastgelelik üssü
+                 alpha: float = 10.0,      # teslimat sayısı ağırlığı
+                 beta: float = 1.0,        # enerji tüketimi ağırlığı
+                 wind_speed: float = 0.0,  # ortam rüzgâr hızı (m/s)
+                 time_limit: Optional[float] = None):
+        if regret_k < 2:
+            raise ValueError("regret_k en az 2 olmalı")
+        self.graph = graph
+        self.iterations = iterations
+        self.remove_fraction = remove_fraction
+        self.regret_k = regret_k
+        self.segment_length = segment_length
+        self.reaction = reaction
+        self.scores = scores
+        self.start_temperature = start_temperature
+        self.final_temperature = final_temperature
+        self.randomness = randomness
+        self.alpha = alpha
+        self.beta = beta
+        self.time_limit = time_limit
+        self.start_time = graph.earliest_start
+        n = len(graph.node_ids)
+        # Son satır / sütun "rota sonu" gözcüsü: mesafe ve enerji sıfır
+        self.end = n
+        self.dist = np.zeros((n + 1, n + 1))
+        self.dist[:n, :n] = graph.dist_matrix
+        # Hız 1 m/s için kenar enerjisi (hedef düğümün yüküyle); drone hızına bölünerek kullanılır
+        self.energy = np.zeros((n + 1, n + 1))
+        self.energy[:n, :n] = (graph.energy_matrix if wind_speed == 0 else
+                               compute_energy(graph.dist_matrix, graph.weights[np.newaxis, :], 1.0, wind_speed))
+        self.window_start = graph.window_start.copy()
+        self.window_end = graph.window_end.copy()
+        self.weights = graph.weights.copy()
+        self.drone_nodes = dict(graph.store.drone_index)
+        self.delivery_nodes = dict(graph.store.delivery_index)
+        self.node_ids = graph.node_ids.tolist()
+        self.speeds = {dr_id: float(graph.speeds[i]) for dr_id, i in self.drone_nodes.items()}
+        self.max_weights = {dr_id: float(graph.max_weights[i]) for dr_id, i in self.drone_nodes.items()}
+        self.battery = {dr_id: float(graph.battery_wh[i]) for dr_id, i in self.drone_nodes.items()}
+        # İlişkililik (Shaw) ölçüsü için normalize mesafe / pencere / ağırlık farkları
+        dp = np.flatnonzero(graph.is_delivery)
+        self._dist_scale = (float(graph.dist_matrix[np.ix_(dp, dp)].max()) if len(dp) else 0.0) or 1.0
+        span = float(self.window_end[dp].max() - self.window_start[dp].min()) if len(dp) else 1.0
+        self._time_scale = span if span > 0 else 1.0
+        self._weight_scale = float(self.weights[dp].max()) if len(dp) and self.weights[dp].max() > 0 else 1.0
+        self.stats: Dict[str, Dict[str, Dict[str, float]]] = {}
+
+    # --- dış API ---
+
+    def run(self, initial: Optional[Dict[int, List[int]]] = None) -> Tuple[Dict[int, List[int]], float]:
+        """
+        ALNS'i çalıştırır ve (en iyi çözüm, fitness) döner.
+        initial verilirse (ör. GA ya da CSP planı) pencereyi kaçıran ya da bataryayı aşan teslimatları çıkarılarak
+        korunur, kalan teslimatlar eklenir.
+        """
+        started = time.perf_counter()
+        routes = self._initial_routes(initial)
+        self._repair(routes, self._unassigned(routes), 1)
+        current_cost = best_cost = self._cost(routes)
+        current, best = self._copy(routes), self._copy(routes)
+        weights = {"destroy": [1.0] * len(self.DESTROY), "repair": [1.0] * len(self.REPAIR)}
+        seg_score = {key: [0.0] * len(w) for key, w in weights.items()}
+        seg_uses = {key: [0] * len(w) for key, w in weights.items()}
+        total_uses = {key: [0] * len(w) for key, w in weights.items()}
+        temperature = self.start_temperature * abs(current_cost) / math.log(2) or 1.0
+        cooling = (self.final_temperature / self.start_temperature) ** (1.0 / max(self.iterations, 1))
+        done = 0
+        for it in range(self.iterations):
+            if self.time_limit is not None and time.perf_counter() - started >= self.time_limit:
+                break
+            d = random.choices(range(len(self.DESTROY)), weights["destroy"])[0]
+            r = random.choices(range(len(self.REPAIR)), weights["repair"])[0]
+            candidate = self._copy(current)
+            assigned = sum(len(route) for route in candidate.values())
+            if assigned:
+                low = max(1, int(self.remove_fraction[0] * assigned))
+                high = max(low, int(self.remove_fraction[1] * assigned))
+                removed = getattr(self, f"_destroy_{self.DESTROY[d]}")(candidate, random.randint(low, high))
+                self._remove(candidate, removed)
+            self._repair(candidate, self._unassigned(candidate), 1 if self.REPAIR[r] == "greedy" else self.regret_k)
+            cost = self._cost(candidate)
+            score = 0.0
+            if cost < best_cost - self.EPS:
+                best, best_cost = self._copy(candidate), cost
+                current, current_cost = candidate, cost
+                score = self.scores[0]
+            elif cost < current_cost - self.EPS:
+                current, current_cost = candidate, cost
+                score = self.scores[1]
+            elif random.random() < math.exp(-(cost - current_cost) / temperature):
+                current, current_cost = candidate, cost
+                score = self.scores[2]
+            for key, op in (("destroy", d), ("repair", r)):
+                seg_score[key][op] += score
+                seg_uses[key][op] += 1
+                total_uses[key][op] += 1
+            temperature *= cooling
+            done = it + 1
+            if done % self.segment_length == 0:
+                self._update_weights(weights, seg_score, seg_uses)
+        self.stats = {
+            key: {name: {"weight": weights[key][i], "uses": total_uses[key][i]}
+                  for i, name in enumerate(names)}
+            for key, names in (("destroy", self.DESTROY), ("repair", self.REPAIR))
+        }
+        self.stats["run"] = {"iterations": done, "elapsed": time.perf_counter() - started}
+        return self._as_ids(best), -best_cost
+
+    # --- çözüm durumu ---
+
+    def _copy(self, routes: Dict[int, List[int]]) -> Dict[int, List[int]]:
+        return {key: route[:] for key, route in routes.items()}
+
+    def _as_ids(self, routes: Dict[int, List[int]]) -> Dict[int, List[int]]:
+        return {key: [self.node_ids[n] for n in route] for key, route in routes.items()}
+
+    def _initial_routes(self, initial: Optional[Dict[int, List[int]]]) -> Dict[int, List[int]]:
+        routes: Dict[int, List[int]] = {dr_id: [] for dr_id in self.drone_nodes}
+        seen = set()
+        for dr_id, route in (initial or {}).items():
+            if dr_id not in routes:
+                continue
+            for dp_id in route:
+                n = self.delivery_nodes.get(dp_id)
+                if n is not None and n not in seen and self.weights[n] <= self.max_weights[dr_id]:
+                    seen.add(n)
+                    routes[dr_id].append(n)
+            self._trim(dr_id, routes[dr_id])
+        return routes
+
+    def _unassigned(self, routes: Dict[int, List[int]]) -> List[int]:
+        assigned = {n for route in routes.values() for n in route}
+        return [n for n in self.delivery_nodes.values() if n not in assigned]
+
+    def _cost(self, routes: Dict[int, List[int]]) -> float:
+        """-fitness: beta * enerji - alpha * teslimat sayısı."""
+        cost = 0.0
+        for dr_id, route in routes.items():
+            if route:
+                cost += self.beta * self._route_energy(dr_id, route)
+                cost -= self.alpha * len(route)
+        return cost
+
+    def _schedule(self, dr_id: int, route: List[int]) -> Tuple[List[float], List[float], List[float]]:
+        """Varış, hizmet başlangıcı ve ileri bolluk (bkz. LocalSearch._refresh)."""
+        ws, we = self.window_start, self.window_end
+        rate = 1.0 / (self.speeds[dr_id] * 60)
+        prev, now = self.drone_nodes[dr_id], self.start_time
+        arrival, begin = [], []
+        for n in route:
+            arr = now + self.dist[prev, n] * rate
+            now = max(arr, ws[n])
+            arrival.append(arr)
+            begin.append(now)
+            prev = n
+        slack = [0.0] * len(route)
+        nxt = float('inf')
+        for i in range(len(route) - 1, -1, -1):
+            nxt = (begin[i] - arrival[i]) + min(we[route[i]] - begin[i], nxt)
+            slack[i] = nxt
+        return arrival, begin, slack
+
+    def _route_energy(self, dr_id: int, route: List[int]) -> float:
+        """Rotanın toplam enerjisi (Wh), drone hızında."""
+        path = [self.drone_nodes[dr_id]] + route
+        return float(self.energy[path[:-1], path[1:]].sum()) / self.speeds[dr_id]
+
+    def _trim(self, dr_id: int, route: List[int]) -> List[int]:
+        """Pencereyi kaçıran ya da bataryayı aşan teslimatları rotadan çıkarır (yerinde); çıkarılanları döner."""
+        ws, we = self.window_start, self.window_end
+        speed = self.speeds[dr_id]
+        rate = 1.0 / (speed * 60)
+        battery = self.battery[dr_id]
+        prev, now, used = self.drone_nodes[dr_id], self.start_time, 0.0
+        kept, dropped = [], []
+        for n in route:
+            arr = now + self.dist[prev, n] * rate
+            leg = self.energy[prev, n] / speed
+            if arr > we[n] + self.EPS or used + leg > battery + self.EPS:
+                dropped.append(n)
+                continue
+            used += leg
+            now = max(arr, ws[n])
+            kept.append(n)
+            prev = n
+        route[:] = kept
+        return dropped
+
+    def _remove(self, routes: Dict[int, List[int]], removed: List[int]) -> None:
+        """Teslimatları çıkarır; mesafeler üçgen eşitsizliğini sağlamıyorsa oluşan ihlaller de temizlenir."""
+        gone = set(removed)
+        for dr_id, route in routes.items():
+            if any(n in gone for n in route):
+                route[:] = [n for n in route if n not in gone]
+                self._trim(dr_id, route)
+
+    def _update_weights(self, weights, seg_score, seg_uses) -> None:
+        for key in weights:
+            for i, uses in enumerate(seg_uses[key]):
+                if uses:
+                    weights[key][i] = ((1 - self.reaction) * weights[key][i]
+                                       + self.reaction * seg_score[key][i] / uses)
+                seg_score[key][i] = 0.0
+                seg_uses[key][i] = 0
+
+    # --- yok etme operatörleri (kaldırılacak düğümleri döner) ---
+
+    def _pick(self, ordered: List[int]) -> int:
+        """Sıralı listeden başa yakın rastgele bir indeks (y^p kuralı)."""
+        return int(random.random() ** self.randomness * len(ordered))
+
+    def _destroy_random(self, routes: Dict[int, List[int]], q: int) -> List[int]:
+        assigned = [n for route in routes.values() for n in route]
+        return random.sample(assigned, min(q, len(assigned)))
+
+    def _destroy_worst(self, routes: Dict[int, List[int]], q: int) -> List[int]:
+        """Çıkarıldığında en çok enerji kazandıran teslimatlar (rastgeleleştirilmiş sırayla)."""
+        nodes, gains = [], []
+        for dr_id, route in routes.items():
+            if not route:
+                continue
+            path = np.array([self.drone_nodes[dr_id]] + route + [self.end])
+            prev, cur, nxt = path[:-2], path[1:-1], path[2:]
+            gain = (self.energy[prev, cur] + self.energy[cur, nxt] - self.energy[prev, nxt]) / self.speeds[dr_id]
+            nodes.extend(route)
+            gains.extend(gain.tolist())
+        ordered = [nodes[i] for i in np.argsort(gains)[::-1]]
+        removed = []
+        while ordered and len(removed) < q:
+            removed.append(ordered.pop(self._pick(ordered)))
+        return removed
+
+    def _destroy_related(self, routes: Dict[int, List[int]], q: int) -> List[int]:
+        """Shaw kaldırma: konum, pencere ve ağırlık olarak birbirine yakın teslimatlar."""
+        rest = np.array([n for route in routes.values() for n in route])
+        if not len(rest):
+            return []
+        seed = random.randrange(len(rest))
+        removed = [int(rest[seed])]
+        rest = np.delete(rest, seed)
+        while len(rest) and len(removed) < q:
+            ref = random.choice(removed)
+            relatedness = (self.dist[ref, rest] / self._dist_scale
+                           + np.abs(self.window_start[ref] - self.window_start[rest]) / self._time_scale
+                           + np.abs(self.weights[ref] - self.weights[rest]) / self._weight_scale)
+            order = np.argsort(relatedness)
+            i = order[self._pick(order.tolist())]
+            removed.append(int(rest[i]))
+            rest = np.delete(rest, i)
+        return removed
+
+    def _destroy_time_window(self, routes: Dict[int, List[int]], q: int) -> List[int]:
+        """Rastgele bir teslimatın zaman penceresine en yakın pencereli teslimatlar (rotalar arası yeniden sıralama için)."""
+        rest = np.array([n for route in routes.values() for n in route])
+        if not len(rest):
+            return []
+        ref = rest[random.randrange(len(rest))]
+        gap = (np.abs(self.window_start[rest] - self.window_start[ref])
+               + np.abs(self.window_end[rest] - self.window_end[ref]))
+        return rest[np.argsort(gap, kind="stable")[:q]].tolist()
+
+    # --- onarım operatörleri ---
+
+    def _positions(self, dr_id: int, route: List[int]) -> tuple:
+        """
+        Rotanın ekleme konumları: (önceki düğüm, sonraki düğüm, ayrılış zamanı, sonrakinin varışı,
+        sonrakinin bolluğu, hız, kapasite, rota enerjisi, batarya) dizileri.
+        """
+        arrival, begin, slack = self._schedule(dr_id, route)
+        m = len(route) + 1
+        return (
+            np.array([self.drone_nodes[dr_id]] + route),
+            np.array(route + [self.end]),
+            np.array([self.start_time] + begin),
+            np.array(arrival + [np.inf]),
+            np.array(slack + [np.inf]),
+            np.full(m, self.speeds[dr_id]),
+            np.full(m, self.max_weights[dr_id]),
+            np.full(m, self._route_energy(dr_id, route)),
+            np.full(m, self.battery[dr_id]),
+        )
+
+    def _insertion_costs(self, nodes: np.ndarray, arrays) -> np.ndarray:
+        """
+        (aday, konum) ekleme maliyeti matrisi: beta * ek enerji - alpha; olursuz konumlar inf.
+        Pencere ileri bollukla, batarya rota enerjisi + ek enerjiyle kontrol edilir.
+        """
+        pred, succ, depart, succ_arrival, succ_slack, speed, capacity, route_energy, battery = arrays
+        rate = 1.0 / (speed * 60)
+        d_in = self.dist[pred[np.newaxis, :], nodes[:, np.newaxis]]
+        d_out = self.dist[nodes[:, np.newaxis], succ[np.newaxis, :]]
+        arrive = depart + d_in * rate
+        ok = arrive <= self.window_end[nodes, np.newaxis] + self.EPS
+        begin = np.maximum(arrive, self.window_start[nodes, np.newaxis])
+        delay = begin + d_out * rate - succ_arrival
+        ok &= (delay <= self.EPS) | (delay <= succ_slack + self.EPS)
+        ok &= self.weights[nodes, np.newaxis] <= capacity
+        extra = (self.energy[pred[np.newaxis, :], nodes[:, np.newaxis]]
+                 + self.energy[nodes[:, np.newaxis], succ[np.newaxis, :]]
+                 - self.energy[pred, succ]) / speed
+        ok &= route_energy + extra <= battery + self.EPS
+        return np.where(ok, self.beta * extra - self.alpha, np.inf)
+
+    def _repair(self, routes: Dict[int, List[int]], pending: List[int], k: int) -> None:
+        """
+        Bekleyen teslimatları ekler: k = 1 açgözlü (en ucuz ekleme), k >= 2 regret-k
+        (en iyi k rota arasındaki maliyet farkı en büyük teslimat önce). Amacı iyileştirmeyen ekleme yapılmaz.
+        (teslimat, rota) başına en iyi ekleme maliyeti ve konumu tutulur; her eklemeden sonra yalnızca
+        değişen rotanın sütunu yeniden hesaplanır.
+        """
+        keys = list(routes)
+        pending = np.array(pending, dtype=np.int64)
+        if not len(pending) or not keys:
+            return
+        best = np.empty((len(pending), len(keys)))
+        where = np.empty((len(pending), len(keys)), dtype=np.int64)
+        for r, dr_id in enumerate(keys):
+            self._route_column(pending, dr_id, routes[dr_id], best[:, r], where[:, r])
+        while len(pending):
+            if k == 1:
+                u, r = divmod(int(np.argmin(best)), best.shape[1])
+            else:
+                best_k = np.sort(best, axis=1)[:, :k]
+                first = best_k[:, 0]
+                # Olursuz rotalar büyük bir sabitle sayılır: tek seçeneği kalan teslimat önce eklenir
+                with np.errstate(invalid="ignore"):
+                    gap = best_k[:, 1:] - first[:, np.newaxis]
+                regret = np.where(np.isinf(best_k[:, 1:]), 1e9, gap).sum(axis=1)
+                regret = np.where(first < 0, regret, -np.inf)
+                u = int(np.lexsort((first, -regret))[0])
+                r = int(np.argmin(best[u]))
+            if not best[u, r] < 0:
+                break
+            dr_id = keys[r]
+            routes[dr_id].insert(int(where[u, r]), int(pending[u]))
+            pending = np.delete(pending, u)
+            best = np.delete(best, u, axis=0)
+            where = np.delete(where, u, axis=0)
+            if len(pending):
+                self._route_column(pending, dr_id, routes[dr_id], best[:, r], where[:, r])
+
+    def _route_column(self, pending: np.ndarray, dr_id: int, route: List[int],
+                      best: np.ndarray, where: np.ndarray) -> None:
+        """Bekleyen teslimatların bu rotadaki en iyi ekleme maliyeti ve konumu (best / where'e yazılır)."""
+        costs = self._insertion_costs(pending, self._positions(dr_id, route))
+        where[:] = np.argmin(costs, axis=1)
+        best[:] = costs[np.arange(len(pending)), where]
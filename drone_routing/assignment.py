@@ -0,0 +1,220 @@
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from .models import Drone, DeliveryPoint
+from .graph import Graph
+from .energy_model import compute_energy, battery_capacity_wh
+
+# En düşük maliyetli iki parçalı eşleme ile drone-teslimat ataması
+#  - Uygunluk / maliyet matrisi bir kez kurulur: kapasite, erişilebilirlik, doğrudan uçuş penceresi ve batarya
+#  - Maliyet: drone başlangıcından teslimata enerji (Wh); atanmayan teslimat önceliğiyle orantılı ceza öder
+#  - Çözücüler: Macar algoritması (kesin, O(n^2 m)) ve ε-ölçekli açık artırma (ε-en iyi)
+#  - Kapasite varyantı: her drone capacity adet sütuna çoğaltılır; çok teslimatlı rotalar TSPTW ile sıralanır,
+#    pencere ya da bataryaya sığmayan teslimatlar atamadan çıkarılır
+
+
+def hungarian(cost: np.ndarray) -> np.ndarray:
+    """
+    Dikdörtgen (n <= m) maliyet matrisinde en düşük toplam maliyetli atama: satır başına sütun indeksi.
+    Kısa artırıcı yol (potansiyelli Macar) yöntemi; sütun taraması NumPy ile yapılır. Maliyetler sonlu olmalı.
+    """
+    n, m = cost.shape
+    if n > m:
+        raise ValueError("hungarian: satır sayısı sütun sayısını aşamaz")
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    owner = np.zeros(m + 1, dtype=np.int64)  # sütun -> satır (1 tabanlı, 0 = boş)
+    way = np.zeros(m + 1, dtype=np.int64)
+    for i in range(1, n + 1):
+        owner[0] = i
+        j0 = 0
+        minv = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+        while True:
+            used[j0] = True
+            i0 = owner[j0]
+            free = ~used[1:]
+            reduced = cost[i0 - 1] - u[i0] - v[1:]
+            better = free & (reduced < minv[1:])
+            minv[1:][better] = reduced[better]
+            way[1:][better] = j0
+            masked = np.where(free, minv[1:], np.inf)
+            j1 = int(masked.argmin()) + 1
+            delta = masked[j1 - 1]
+            u[owner[used]] += delta
+            v[used] -= delta
+            minv[1:][free] -= delta
+            j0 = j1
+            if owner[j0] == 0:
+                break
+        while j0:
+            j1 = way[j0]
+            owner[j0] = owner[j1]
+            j0 = j1
+    result = np.empty(n, dtype=np.int64)
+    cols = np.flatnonzero(owner[1:])
+    result[owner[cols + 1] - 1] = cols
+    return result
+
+
+def auction(cost: np.ndarray, eps_final: Optional[float] = None, scale: float = 5.0) -> np.ndarray:
+    """
+    Dikdörtgen (n <= m) maliyet matrisi için ε-ölçekli ileri açık artırma (Bertsekas): satır başına sütun indeksi.
+    Sonuç en iyiden en fazla m * eps_final uzaktadır (varsayılan: maliyet aralığının 1e-6'sı).
+    """
+    n, m = cost.shape
+    if n > m:
+        raise ValueError("auction: satır sayısı sütun sayısını aşamaz")
+    # Kare probleme tamamlanır (sıfır faydalı sahte satırlar): ölçekleme fazları arasında fiyatlar korunabilir
+    benefit = np.zeros((m, m))
+    benefit[:n] = -cost
+    span = float(benefit.max() - benefit.min()) if benefit.size else 0.0
+    if eps_final is None:
+        eps_final = max(span, 1.0) * 1e-6 / m
+    prices = np.zeros(m)
+    eps = max(span / scale, eps_final)
+    while True:
+        assigned = np.full(m, -1, dtype=np.int64)
+        holder = np.full(m, -1, dtype=np.int64)
+        pending = list(range(m))
+        while pending:
+            i = pending.pop()
+            values = benefit[i] - prices
+            if m > 1:
+                top2 = np.argpartition(values, -2)[-2:]
+                j, second = (top2[1], top2[0]) if values[top2[1]] >= values[top2[0]] else (top2[0], top2[1])
+                gap = values[j] - values[second]
+            else:
+                j, gap = 0, 0.0
+            prices[j] += gap + eps
+            prev = holder[j]
+            if prev >= 0:
+                assigned[prev] = -1
+                pending.append(prev)
+            holder[j] = i
+            assigned[i] = j
+        if eps <= eps_final:
+            return assigned[:n]
+        eps = max(eps / scale, eps_final)
+
+
+class AssignmentSolver:
+    """
+    Teslimatları dronelara en düşük maliyetli eşlemeyle atar. {delivery_id: drone_id}
+    method: "hungarian" (kesin) ya da "auction" (ε-en iyi).
+    capacity: drone başına azami teslimat sayısı (1: klasik bire bir eşleme).
+    Amaç sırası: öncelik ağırlıklı teslimat sayısı en büyük, sonra toplam enerji en küçük.
+    Drone başına rotalar self.routes'ta; çok teslimatlı rotalar Graph.solve_tsptw ile sıralanır, sıra olurlu
+    değilse teslimatlar öncelik sırasıyla en ucuz olurlu konuma eklenir. Zaman penceresine ya da bataryaya
+    sığmayan teslimatlar atanmamış sayılır (eşleme yalnızca doğrudan uçuşları kontrol eder).
+    """
+    METHODS = ("hungarian", "auction")
+
+    def __init__(self, graph: Graph, method: str = "hungarian", capacity: int = 1,
+                 use_reachability: bool = True, wind_speed: float = 0.0):
+        if method not in self.METHODS:
+            raise ValueError(f"Bilinmeyen atama yöntemi: {method}")
+        if capacity < 1:
+            raise ValueError("capacity pozitif olmalı")
+        self.graph = graph
+        self.drones: List[Drone] = graph.drones
+        self.deliveries: List[DeliveryPoint] = graph.deliveries
+        self.method = method
+        self.capacity = capacity
+        self.use_reachability = use_reachability
+        self.wind_speed = wind_speed
+        self.routes: Dict[int, List[int]] = {}
+
+    def cost_matrix(self) -> np.ndarray:
+        """(teslimat, drone) doğrudan uçuş enerjisi (Wh); uygun olmayan çiftler inf."""
+        g = self.graph
+        drone_nodes = np.array([g.drone_idx(dr.id) for dr in self.drones], dtype=np.int64)
+        dp_nodes = np.array([g.delivery_idx(dp.id) for dp in self.deliveries], dtype=np.int64)
+        dist = g.dist_matrix[np.ix_(dp_nodes, drone_nodes)]
+        speeds = np.array([dr.speed for dr in self.drones], dtype=float)
+        weights = g.weights[dp_nodes]
+        energy = compute_energy(dist, weights[:, np.newaxis], speeds[np.newaxis, :], self.wind_speed)
+        arrival = g.earliest_start + dist / speeds[np.newaxis, :] / 60
+        battery = np.array([battery_capacity_wh(dr.battery) for dr in self.drones])
+        max_weights = np.array([dr.max_weight for dr in self.drones], dtype=float)
+        feasible = ((weights[:, np.newaxis] <= max_weights[np.newaxis, :])
+                    & (arrival <= g.window_end[dp_nodes, np.newaxis])
+                    & (energy <= battery[np.newaxis, :]))
+        if self.use_reachability:
+            for k, dr in enumerate(self.drones):
+                reach = g.reachable_deliveries(dr.id)
+                feasible[:, k] &= np.array([dp.id in reach for dp in self.deliveries], dtype=bool)
+        return np.where(feasible, energy, np.inf)
+
+    def solve(self) -> Dict[int, int]:
+        """Teslimatların drone atamalarını döner. {delivery_id: drone_id}"""
+        n, d = len(self.deliveries), len(self.drones)
+        self.routes = {dr.id: [] for dr in self.drones}
+        if n == 0:
+            return {}
+        cost = self.cost_matrix()
+        finite = cost[np.isfinite(cost)]
+        # Atanmama cezası öncelikle orantılı ve tüm enerji toplamından büyük: önce sayı / öncelik, sonra enerji
+        big = (float(finite.max()) if finite.size else 0.0) * n + 1.0
+        priorities = np.array([dp.priority for dp in self.deliveries], dtype=float)
+        slots = min(self.capacity, n)
+        forbidden = big * (priorities.max() + 1) * 2
+        # Sütunlar: drone başına slots kopya + teslimat başına bir "atanmadı" sütunu
+        matrix = np.empty((n, d * slots + n))
+        matrix[:, :d * slots] = np.repeat(np.where(np.isfinite(cost), cost, forbidden), slots, axis=1)
+        matrix[:, d * slots:] = (big * priorities)[:, np.newaxis]
+        cols = hungarian(matrix) if self.method == "hungarian" else auction(matrix)
+        assignment: Dict[int, int] = {}
+        for e, col in enumerate(cols.tolist()):
+            if col < d * slots and np.isfinite(cost[e, col // slots]):
+                assignment[self.deliveries[e].id] = self.drones[col // slots].id
+        windows = {dp.id: dp.time_window[0] for dp in self.deliveries}
+        for dp_id, dr_id in sorted(assignment.items(), key=lambda item: windows[item[0]]):
+            self.routes[dr_id].append(dp_id)
+        for dr in self.drones:
+            if len(self.routes[dr.id]) > 1:
+                self.routes[dr.id] = self._sequence(dr, self.routes[dr.id])
+        return {dp_id: dr_id for dr_id, route in self.routes.items() for dp_id in route}
+
+    def _sequence(self, dr: Drone, dp_ids: List[int]) -> List[int]:
+        """
+        Drone'a eşlenen teslimatların olurlu ziyaret sırası: önce TSPTW, olmazsa öncelik (sonra pencere)
+        sırasıyla en az enerjili olurlu konuma ekleme; hiçbir konuma sığmayan teslimat rotaya alınmaz.
+        """
+        order = self.graph.solve_tsptw(dr.id, dp_ids).sequence
+        if order and self._route_energy(dr, order) is not None:
+            return order
+        dps = {dp.id: dp for dp in self.deliveries}
+        route: List[int] = []
+        for dp_id in sorted(dp_ids, key=lambda i: (-dps[i].priority, dps[i].time_window[0])):
+            best, best_energy = None, float('inf')
+            for pos in range(len(route) + 1):
+                trial = route[:pos] + [dp_id] + route[pos:]
+                energy = self._route_energy(dr, trial)
+                if energy is not None and energy < best_energy:
+                    best, best_energy = trial, energy
+            if best is not None:
+                route = best
+        return route
+
+    def _route_energy(self, dr: Drone, route: List[int]) -> Optional[float]:
+        """Rotanın enerjisi (Wh); bir pencere kaçırılıyor ya da batarya aşılıyorsa None."""
+        g = self.graph
+        battery = battery_capacity_wh(dr.battery)
+        prev, now, used = g.drone_idx(dr.id), g.earliest_start, 0.0
+        for dp_id in route:
+            cur = g.delivery_idx(dp_id)
+            dist = float(g.dist_matrix[prev, cur])
+            now += dist / dr.speed / 60
+            used += compute_energy(dist, float(g.weights[cur]), dr.speed, self.wind_speed)
+            if now > g.window_end[cur] or used > battery:
+                return None
+            now = max(now, float(g.window_start[cur]))
+            prev = cur
+        return used
+
+    def total_cost(self, assignment: Dict[int, int]) -> Tuple[int, float]:
+        """(atanan teslimat sayısı, toplam doğrudan uçuş enerjisi)"""
+        cost = self.cost_matrix()
+        row = {dp.id: e for e, dp in enumerate(self.deliveries)}
+        col = {dr.id: k for k, dr in enumerate(self.drones)}
+        return len(assignment), float(sum(cost[row[dp_id], col[dr_id]] for dp_id, dr_id in assignment.items()))
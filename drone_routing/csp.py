@@ -1,38 +1,297 @@
-from typing import Dict, List
+import time
+from typing import Dict, List, Optional, Tuple
+import numpy as np
 from .models import Drone, DeliveryPoint
 from .graph import Graph
+from .energy_model import compute_energy, battery_capacity_wh
+
+# Kısıt programlama ile drone-teslimat ataması (drone başına çok teslimat)
+#  - Değişkenler teslimatlar; alanlar drone bit kümeleri (Python int, bit k = k. drone)
+#  - Kısıtlar: kapasite (tekli), batarya enerjisi ve zaman pencereleri (drone rotası üzerinden)
+#  - Rota kısıtı, mevcut rotaya ileri bollukla olurlu bir ekleme konumu var mı diye kontrol edilir
+#  - İleri kontrol: atama sonrası o drone'u alanında tutan teslimatların eklenebilirliği vektörel yeniden denetlenir
+#  - MRV + derece sıralaması, dal-sınır geri izleme, düğüm / süre sınırı
+# Arama içinde A* çağrılmaz: erişilebilirlik, drone başına tek aramayla önceden hesaplanır.
+
 
 class CSP:
     """
-    Dinamik kısıtlar için basit CSP: her drone en fazla bir teslimat yapar ve no-fly zone ihlali olmayan atamalar bulur.
+    Teslimatları dronelara atar ve drone başına ziyaret sırasını üretir.
+    Bir teslimat atanmadan bırakılabilir; amaç önce teslimat sayısını en büyütmek, sonra toplam enerjiyi en küçültmek.
+    node_limit / time_limit aşılırsa o ana kadarki en iyi çözüm döner (stats["complete"] False olur).
+    use_reachability: drone'un başlangıcından graph.reachable_deliveries aramasıyla (kapasite, zaman penceresi
+    ve batarya kuralları) hiçbir yolla ulaşılamayan teslimatlar alanlardan önceden çıkarılır. No-fly zone'lar
+    yalnızca A* tahminini etkiler, kenar kapatmaz; bu yüzden bu budamaya katılmaz.
     """
-    def __init__(self, graph: Graph):
+    EPS = 1e-9
+
+    def __init__(self, graph: Graph, node_limit: int = 5000, time_limit: Optional[float] = 1.0,
+                 use_reachability: bool = True, wind_speed: float = 0.0):
         self.graph = graph
         self.drones: List[Drone] = graph.drones
         self.deliveries: List[DeliveryPoint] = graph.deliveries
+        self.node_limit = node_limit
+        self.time_limit = time_limit
+        self.use_reachability = use_reachability
+        self.wind_speed = wind_speed
+        self.routes: Dict[int, List[int]] = {}
+        self.stats: Dict[str, float] = {}
 
     def solve(self) -> Dict[int, int]:
         """
         Teslimatların drone atamalarını döner. {delivery_id: drone_id}
+        Ziyaret sıraları self.routes'ta ({drone_id: [delivery_id, ...]}) tutulur.
+        """
+        routes = self.solve_routes()
+        return {dp_id: dr_id for dr_id, route in routes.items() for dp_id in route}
+
+    def solve_routes(self) -> Dict[int, List[int]]:
+        """Drone başına sıralı teslimat rotaları: {drone_id: [delivery_id, ...]}"""
+        started = time.perf_counter()
+        self._setup()
+        self._search(started)
+        self.routes = {dr.id: [self.deliveries[e].id for e in route]
+                       for dr, route in zip(self.drones, self._best_routes)}
+        self.stats.update(delivered=self._best_count, energy=self._best_energy,
+                          elapsed=time.perf_counter() - started)
+        return self.routes
+
+    # --- model kurulumu ---
+
+    def _setup(self) -> None:
+        g = self.graph
+        D, N = len(self.drones), len(self.deliveries)
+        self._drone_node = np.array([g.drone_idx(dr.id) for dr in self.drones], dtype=np.int64)
+        self._dp_node = np.array([g.delivery_idx(dp.id) for dp in self.deliveries], dtype=np.int64)
+        n = len(g.node_ids)
+        # Rota sonu gözcüsü (son satır / sütun): mesafe ve enerji sıfır
+        self._end = n
+        self._dist = np.zeros((n + 1, n + 1))
+        self._dist[:n, :n] = g.dist_matrix
+        self._energy = np.zeros((n + 1, n + 1))
+        self._energy[:n, :n] = compute_energy(g.dist_matrix, g.weights[np.newaxis, :], 1.0, self.wind_speed)
+        self._ws = g.window_start
+        self._we = g.window_end
+        self._speed = np.array([dr.speed for dr in self.drones], dtype=float)
+        self._capacity = np.array([battery_capacity_wh(dr.battery) for dr in self.drones])
+        self._start = g.earliest_start
+        weights = np.array([dp.weight for dp in self.deliveries], dtype=float)
+        max_weights = np.array([dr.max_weight for dr in self.drones], dtype=float)
+        # Tekli kısıtlar: kapasite ve (isteğe bağlı) erişilebilirlik
+        allowed = weights[np.newaxis, :] <= max_weights[:, np.newaxis]
+        if self.use_reachability:
+            for k, dr in enumerate(self.drones):
+                reach = g.reachable_deliveries(dr.id)
+                allowed[k] &= np.array([dp.id in reach for dp in self.deliveries], dtype=bool)
+        # İkili zaman penceresi çatışmaları: iki teslimat aynı drone'da hiçbir sırayla birlikte ziyaret edilemez
+        rate = 1.0 / (self._speed * 60)
+        dp = self._dp_node
+        ws, we = self._ws[dp], self._we[dp]
+        earliest = np.maximum(ws[np.newaxis, :], self._start
+                              + self._dist[self._drone_node[:, np.newaxis], dp[np.newaxis, :]] * rate[:, np.newaxis])
+        travel = self._dist[np.ix_(dp, dp)][np.newaxis, :, :] * rate[:, np.newaxis, np.newaxis]
+        follows = earliest[:, :, np.newaxis] + travel <= we[np.newaxis, np.newaxis, :] + self.EPS
+        conflict = ~(follows | follows.transpose(0, 2, 1))
+        self._conflict = [[self._bits(conflict[k, e]) for e in range(N)] for k in range(D)]
+        any_conflict = conflict.any(axis=0)
+        self._conflict_any = [self._bits(any_conflict[e]) for e in range(N)]
+        self._priority = [dp.priority for dp in self.deliveries]
+        # Alanlar (teslimat -> drone bitleri) ve tutucular (drone -> teslimat bitleri)
+        self._dom = [self._bits(allowed[:, e]) for e in range(N)]
+        self._holders = [self._bits(allowed[k]) for k in range(D)]
+        self._live = self._bits(np.array([d != 0 for d in self._dom], dtype=bool)) if N else 0
+        self._trail: List[Tuple[int, int]] = []
+        self._routes: List[List[int]] = [[] for _ in range(D)]
+        self._route_energy = [0.0] * D
+        self._sched = [([], [], []) for _ in range(D)]
+        # drone başına en ucuz olurlu ekleme: maliyet (enerji artışı) ve konum; olursuz ise inf
+        self._ins_cost = np.full((D, N), np.inf)
+        self._ins_pos = np.zeros((D, N), dtype=np.int64)
+        for k in range(D):
+            self._revise(k)
+        self._best_routes: List[List[int]] = [[] for _ in range(D)]
+        self._best_count, self._best_energy = 0, 0.0
+        self.stats = {"nodes": 0, "complete": True}
+
+    @staticmethod
+    def _bits(mask: np.ndarray) -> int:
+        """Bool dizisini bit kümesine çevirir (bit i = mask[i])."""
+        return int.from_bytes(np.packbits(mask, bitorder="little").tobytes(), "little")
+
+    @staticmethod
+    def _members(bits: int):
+        while bits:
+            low = bits & -bits
+            yield low.bit_length() - 1
+            bits ^= low
+
+    # --- kısıt yayılımı ---
+
+    def _set_dom(self, e: int, value: int) -> None:
+        """Alanı değiştirir; eski değer geri alma izine yazılır, tutucular ve canlı küme güncellenir."""
+        old = self._dom[e]
+        if old == value:
+            return
+        self._trail.append((e, old))
+        self._dom[e] = value
+        for k in self._members(old & ~value):
+            self._holders[k] &= ~(1 << e)
+        if not value:
+            self._live &= ~(1 << e)
+
+    def _undo(self, mark: int) -> None:
+        while len(self._trail) > mark:
+            e, old = self._trail.pop()
+            for k in self._members(old & ~self._dom[e]):
+                self._holders[k] |= 1 << e
+            if old:
+                self._live |= 1 << e
+            self._dom[e] = old
+
+    def _revise(self, k: int) -> None:
+        """
+        k drone'unu alanında tutan teslimatların k'nın güncel rotasına eklenebilirliğini denetler (ileri kontrol);
+        pencere ya da batarya nedeniyle eklenemeyenlerin alanından k çıkarılır.
+        """
+        es = np.fromiter(self._members(self._holders[k]), dtype=np.int64)
+        if not len(es):
+            return
+        cost, pos = self._insertion(k, es)
+        self._ins_cost[k, es] = cost
+        self._ins_pos[k, es] = pos
+        for e in es[np.isinf(cost)].tolist():
+            self._set_dom(e, self._dom[e] & ~(1 << k))
+
+    def _insertion(self, k: int, es: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """es teslimatlarının k rotasına en ucuz olurlu ekleme maliyeti ve konumu (vektörel, ileri bolluk ile)."""
+        route = [int(n) for n in self._dp_node[self._routes[k]]]
+        arrival, begin, slack = self._sched[k]
+        pred = np.array([self._drone_node[k]] + route)
+        succ = np.array(route + [self._end])
+        depart = np.array([self._start] + begin)
+        succ_arrival = np.array(arrival + [np.inf])
+        succ_slack = np.array(slack + [np.inf])
+        rate = 1.0 / (self._speed[k] * 60)
+        nodes = self._dp_node[es]
+        arrive = depart + self._dist[pred[np.newaxis, :], nodes[:, np.newaxis]] * rate
+        ok = arrive <= self._we[nodes, np.newaxis] + self.EPS
+        start = np.maximum(arrive, self._ws[nodes, np.newaxis])
+        delay = start + self._dist[nodes[:, np.newaxis], succ[np.newaxis, :]] * rate - succ_arrival
+        ok &= (delay <= self.EPS) | (delay <= succ_slack + self.EPS)
+        extra = (self._energy[pred[np.newaxis, :], nodes[:, np.newaxis]]
+                 + self._energy[nodes[:, np.newaxis], succ[np.newaxis, :]]
+                 - self._energy[pred, succ]) / self._speed[k]
+        ok &= self._route_energy[k] + extra <= self._capacity[k] + self.EPS
+        extra = np.where(ok, extra, np.inf)
+        pos = extra.argmin(axis=1)
+        return extra[np.arange(len(es)), pos], pos
+
+    def _schedule(self, k: int) -> None:
+        """k rotasının varış, hizmet başlangıcı ve ileri bolluk listeleri."""
+        ws, we = self._ws, self._we
+        rate = 1.0 / (self._speed[k] * 60)
+        prev, now = int(self._drone_node[k]), self._start
+        arrival, begin = [], []
+        nodes = [int(n) for n in self._dp_node[self._routes[k]]]
+        for n in nodes:
+            arr = now + self._dist[prev, n] * rate
+            now = max(arr, ws[n])
+            arrival.append(arr)
+            begin.append(now)
+            prev = n
+        slack = [0.0] * len(nodes)
+        nxt = float('inf')
+        for i in range(len(nodes) - 1, -1, -1):
+            nxt = (begin[i] - arrival[i]) + min(we[nodes[i]] - begin[i], nxt)
+            slack[i] = nxt
+        self._sched[k] = (arrival, begin, slack)
+
+    # --- arama ---
+
+    def _select(self) -> int:
+        """MRV: en küçük alan; eşitlikte canlı teslimatlarla en çok çatışan (derece), sonra yüksek öncelik."""
+        best, best_key = -1, None
+        for e in self._members(self._live):
+            key = (self._dom[e].bit_count(), -(self._conflict_any[e] & self._live).bit_count(), -self._priority[e])
+            if best_key is None or key < best_key:
+                best, best_key = e, key
+        return best
+
+    def _values(self, e: int) -> List[int]:
+        """Değer sırası: ekleme maliyeti en düşük drone önce; -1 teslimatı atamadan bırakır."""
+        drones = sorted(self._members(self._dom[e]), key=lambda k: self._ins_cost[k, e])
+        return drones + [-1]
+
+    def _assign(self, e: int, k: int):
+        """e'yi k rotasına ekler ve ileri kontrol yapar; geri alma için gereken durumu döner."""
+        saved = (k, self._routes[k][:], self._route_energy[k], self._sched[k],
+                 self._ins_cost[k].copy(), self._ins_pos[k].copy())
+        self._routes[k].insert(int(self._ins_pos[k, e]), e)
+        self._route_energy[k] += float(self._ins_cost[k, e])
+        self._set_dom(e, 0)
+        self._schedule(k)
+        # k'da e ile pencere çatışması olanlar doğrudan elenir, kalanlar rota üzerinden denetlenir
+        for f in self._members(self._holders[k] & self._conflict[k][e]):
+            self._set_dom(f, self._dom[f] & ~(1 << k))
+        self._revise(k)
+        return saved
+
+    def _unassign(self, saved) -> None:
+        k, route, energy, sched, cost, pos = saved
+        self._routes[k] = route
+        self._route_energy[k] = energy
+        self._sched[k] = sched
+        self._ins_cost[k] = cost
+        self._ins_pos[k] = pos
+
+    def _search(self, started: float) -> None:
+        """
+        Açık yığınlı geri izleme. Sınır: atanan + canlı teslimat sayısı en iyiyi geçemiyorsa
+        (ya da eşitse ve enerji zaten en iyiden fazlaysa) dal budanır.
         """
-        # Önceliğe göre sıralanmış teslimatlar (yüksek öncelik önce)
-        sorted_deliveries = sorted(self.deliveries, key=lambda d: -d.priority)
-        assignment: Dict[int, int] = {}
-        used_drones = set()
-
-        for dp in sorted_deliveries:
-            for dr in self.drones:
-                if dr.id in used_drones:
-                    continue
-                # Ağırlık kapasitesi kontrolü
-                if dp.weight > dr.max_weight:
-                    continue
-                # Rota var mı ve no-fly ihlal yok mu?
-                start_key = f"drone_{dr.id}"
-                goal_key = f"dp_{dp.id}"
-                path, cost = self.graph.find_path(start_key, goal_key)
-                if path:
-                    assignment[dp.id] = dr.id
-                    used_drones.add(dr.id)
+        count, energy = 0, 0.0
+        # yığın çerçevesi: [teslimat, değerler, sıradaki değer indeksi, iz işareti, geri alma durumu, sayı, enerji]
+        stack: List[list] = []
+        first = True
+        while True:
+            bound = count + self._live.bit_count()
+            prune = not first and (bound < self._best_count or
+                                   (bound == self._best_count and energy >= self._best_energy - self.EPS))
+            if not prune and not self._live:
+                # yaprak: tüm teslimatlar kararlaştırıldı
+                self._best_count, self._best_energy = count, energy
+                self._best_routes = [route[:] for route in self._routes]
+                first = False
+                prune = True
+            if not prune:
+                e = self._select()
+                stack.append([e, self._values(e), 0, len(self._trail), None, count, energy])
+            # sıradaki değeri dene; tükenen çerçeveler geri alınır
+            while stack:
+                frame = stack[-1]
+                if frame[4] is not None:
+                    self._unassign(frame[4])
+                    frame[4] = None
+                self._undo(frame[3])
+                count, energy = frame[5], frame[6]
+                if frame[2] < len(frame[1]):
                     break
-        return assignment 
\ No newline at end of file
+                stack.pop()
+            if not stack:
+                return
+            self.stats["nodes"] += 1
+            if (self.stats["nodes"] > self.node_limit or
+                    (self.time_limit is not None and time.perf_counter() - started > self.time_limit)):
+                self.stats["complete"] = False
+                # en iyi çözüm henüz yoksa mevcut kısmi dal açgözlü biçimde tamamlanır
+                if not first:
+                    return
+            e, values = frame[0], frame[1]
+            k = values[frame[2]]
+            frame[2] += 1
+            if k < 0:
+                self._set_dom(e, 0)
+            else:
+                frame[4] = self._assign(e, k)
+                count += 1
+                energy += self._route_energy[k] - frame[4][2]
@@ -1,64 +1,243 @@
 import random
-from typing import List, Tuple
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Sequence, Tuple, Union
+import numpy as np
 from .models import Drone, DeliveryPoint, NoFlyZone
 
+# NumPy tabanlı, tekrarlanabilir senaryo üretici
+#  - seed verilirse aynı senaryo üretilir; verilmezse tohum Python random durumundan alınır (random.seed ile uyumlu)
+#  - Yerleşimler: "uniform", "clustered" (kentsel sıcak noktalar + arka plan) ve "depot" (depolardan uzaklaştıkça seyrelen)
+#  - Teslimatlar sabit BLOCK boyutlu bloklarda, blok başına bağımsız tohumla üretilir: iter_deliveries milyonlarca
+#    teslimatı parça parça, tümünü bellekte tutmadan verir ve çıktı parça boyutundan bağımsızdır
+#  - Zaman penceresi ve no-fly zone yoğunluk profilleri
+
+BLOCK = 65536  # teslimat üretim bloğu (tohum birimi)
+
+# profil -> (pencere uzunluğu aralığı (dakika)); başlangıç dağılımı _time_windows'ta
+WINDOW_PROFILES = {
+    "hourly": (60, 60),     # 09:00-16:00 arası tam saat başlangıç, 1 saat
+    "business": (30, 120),  # 09:00-17:00 arası herhangi bir dakika
+    "peak": (30, 90),       # öğle (12:00) ve akşam (18:00) yoğunlukları
+    "tight": (15, 30),      # 09:00-17:00 arası kısa pencereler
+}
+
+# profil -> bölge kenar uzunluğu aralığı (alan kenarına oranla); profiller yalnızca boyutu belirler,
+# bölge sayısı generate_no_fly_zones'un k parametresidir
+ZONE_PROFILES = {
+    "small": (0.02, 0.08),
+    "medium": (0.05, 0.2),
+    "large": (0.1, 0.3),
+}
+
+LAYOUTS = ("uniform", "clustered", "depot")
+
+
+@dataclass
+class Layout:
+    kind: str = "uniform"                  # "uniform", "clustered" ya da "depot"
+    centers: Optional[np.ndarray] = None   # (k, 2) sıcak nokta / depo konumları; None ise tohumdan üretilir
+    n_centers: int = 5
+    spread: float = 0.05                   # küme standart sapması / depo ortalama yarıçapı (alanın kısa kenarına oranla)
+    background: float = 0.2                # clustered: alana düzgün dağılan teslimat oranı
+
+    def __post_init__(self):
+        if self.kind not in LAYOUTS:
+            raise ValueError(f"Bilinmeyen yerleşim: {self.kind}")
+
+
+@dataclass
+class DeliveryArrays:
+    """Teslimat parçasının sütun dizileri; to_objects ile DeliveryPoint listesine çevrilir."""
+    ids: np.ndarray          # (k,) int64
+    pos: np.ndarray          # (k, 2) float64
+    weight: np.ndarray       # (k,) float64
+    priority: np.ndarray     # (k,) int64
+    time_window: np.ndarray  # (k, 2) int64, dakika
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, index: slice) -> "DeliveryArrays":
+        return DeliveryArrays(self.ids[index], self.pos[index], self.weight[index],
+                              self.priority[index], self.time_window[index])
+
+    @staticmethod
+    def concat(parts: Sequence["DeliveryArrays"]) -> "DeliveryArrays":
+        return DeliveryArrays(*(np.concatenate([getattr(p, name) for p in parts])
+                                for name in ("ids", "pos", "weight", "priority", "time_window")))
+
+    def to_objects(self) -> List[DeliveryPoint]:
+        return [DeliveryPoint(id=i, pos=(x, y), weight=w, priority=p, time_window=(ws, we))
+                for i, (x, y), w, p, (ws, we) in zip(self.ids.tolist(), self.pos.tolist(), self.weight.tolist(),
+                                                     self.priority.tolist(), self.time_window.tolist())]
+
+
+def _seed_sequence(seed: Optional[int]) -> np.random.SeedSequence:
+    """Kök tohum dizisi; seed yoksa Python random durumundan 128 bit alınır."""
+    return np.random.SeedSequence(random.getrandbits(128) if seed is None else seed)
+
+
+def _child_rng(root: np.random.SeedSequence, *key: int) -> np.random.Generator:
+    """Kök tohumdan bağımsız alt akış: (0,) yerleşim, (1, blok) teslimatlar, (2,) drone, (3,) bölge."""
+    return np.random.default_rng(np.random.SeedSequence(root.entropy, spawn_key=key))
+
+
+def make_layout(kind: str = "uniform", area_size: Tuple[float, float] = (1000.0, 1000.0),
+                seed: Optional[int] = None, **params) -> Layout:
+    """
+    Merkezleri üretilmiş bir yerleşim döner. Aynı seed ile üretilen drone, teslimat ve bölgeler zaten aynı
+    merkezleri paylaşır; farklı tohumlu üreticiler arasında paylaşmak için sonucu doğrudan geçirin.
+    """
+    return _resolve_layout(Layout(kind, **params), area_size, _seed_sequence(seed))
+
+
+def _resolve_layout(layout: Union[str, Layout], area_size: Tuple[float, float],
+                    root: np.random.SeedSequence) -> Layout:
+    if isinstance(layout, str):
+        layout = Layout(layout)
+    if layout.kind != "uniform" and layout.centers is None:
+        rng = _child_rng(root, 0)
+        centers = rng.uniform((0.1, 0.1), (0.9, 0.9), (layout.n_centers, 2)) * np.asarray(area_size)
+        layout = Layout(layout.kind, centers, layout.n_centers, layout.spread, layout.background)
+    return layout
+
+
+def _positions(rng: np.random.Generator, k: int, area_size: Tuple[float, float], layout: Layout) -> np.ndarray:
+    """Yerleşime göre (k, 2) konum; alan dışına taşanlar kenara kırpılır, 2 ondalığa yuvarlanır."""
+    area = np.asarray(area_size, dtype=float)
+    pos = rng.uniform(0.0, 1.0, (k, 2)) * area
+    if layout.kind != "uniform" and len(layout.centers):
+        scale = layout.spread * area.min()
+        centers = np.asarray(layout.centers, dtype=float)[rng.integers(0, len(layout.centers), k)]
+        if layout.kind == "clustered":
+            local = centers + rng.normal(0.0, scale, (k, 2))
+            pos = np.where((rng.random(k) < layout.background)[:, np.newaxis], pos, local)
+        else:
+            radius = rng.exponential(scale, k)
+            angle = rng.uniform(0.0, 2 * np.pi, k)
+            pos = centers + np.column_stack((radius * np.cos(angle), radius * np.sin(angle)))
+    return np.round(np.clip(pos, 0.0, area), 2)
+
+
+def _time_windows(rng: np.random.Generator, k: int, profile: str) -> np.ndarray:
+    """Profile göre (k, 2) dakika cinsinden zaman pencereleri."""
+    if profile not in WINDOW_PROFILES:
+        raise ValueError(f"Bilinmeyen zaman penceresi profili: {profile}")
+    low, high = WINDOW_PROFILES[profile]
+    if profile == "hourly":
+        start = rng.integers(9, 17, k) * 60
+    elif profile == "peak":
+        start = np.where(rng.random(k) < 0.5, rng.normal(12 * 60, 45, k), rng.normal(18 * 60, 60, k))
+        start = np.clip(np.round(start), 8 * 60, 21 * 60).astype(np.int64)
+    else:
+        start = rng.integers(9 * 60, 17 * 60, k)
+    length = rng.integers(low, high + 1, k)
+    return np.column_stack((start, start + length)).astype(np.int64)
+
+
+def _delivery_block(rng: np.random.Generator, k: int, first_id: int, area_size: Tuple[float, float],
+                    layout: Layout, window_profile: str) -> DeliveryArrays:
+    pos = _positions(rng, k, area_size, layout)
+    weight = np.round(rng.uniform(0.1, 3.0, k), 2)
+    priority = rng.integers(1, 6, k)
+    windows = _time_windows(rng, k, window_profile)
+    return DeliveryArrays(np.arange(first_id, first_id + k, dtype=np.int64), pos, weight, priority, windows)
+
+
+def iter_deliveries(m: int,
+                    area_size: Tuple[float, float] = (1000.0, 1000.0),
+                    chunk_size: int = BLOCK,
+                    layout: Union[str, Layout] = "uniform",
+                    window_profile: str = "hourly",
+                    seed: Optional[int] = None,
+                    start_id: int = 1) -> Iterator[DeliveryArrays]:
+    """
+    m teslimatı en fazla chunk_size büyüklüğünde DeliveryArrays parçaları olarak üretir (ID'ler start_id'den).
+    Bellekte en fazla bir blok + bir parça tutulur; aynı seed ile sonuç chunk_size'tan bağımsızdır.
+    """
+    if chunk_size <= 0:
+        raise ValueError("chunk_size pozitif olmalı")
+    root = _seed_sequence(seed)
+    layout = _resolve_layout(layout, area_size, root)
+    pending: List[DeliveryArrays] = []
+    buffered = 0
+    for b in range(-(-m // BLOCK)):
+        k = min(BLOCK, m - b * BLOCK)
+        pending.append(_delivery_block(_child_rng(root, 1, b), k, start_id + b * BLOCK,
+                                       area_size, layout, window_profile))
+        buffered += k
+        while buffered >= chunk_size:
+            merged = DeliveryArrays.concat(pending) if len(pending) > 1 else pending[0]
+            yield merged[:chunk_size]
+            rest = merged[chunk_size:]
+            pending, buffered = ([rest] if len(rest) else []), len(rest)
+    if buffered:
+        yield DeliveryArrays.concat(pending) if len(pending) > 1 else pending[0]
+
 
 def generate_drones(n: int,
-                    area_size: Tuple[float, float] = (1000.0, 1000.0)) -> List[Drone]:
+                    area_size: Tuple[float, float] = (1000.0, 1000.0),
+                    layout: Union[str, Layout] = "uniform",
+                    seed: Optional[int] = None) -> List[Drone]:
     """
     n adet drone oluşturur. start_pos, max_weight, battery, speed rastgeledir.
     area_size: (max_x, max_y)
+    layout="depot" ise dronelar depolardan sırayla başlar, diğer yerleşimlerde alana düzgün dağılır.
     """
-    drones: List[Drone] = []
-    for i in range(1, n + 1):
-        max_w = round(random.uniform(1.0, 5.0), 2)
-        battery = random.randint(2000, 10000)
-        speed = round(random.uniform(5.0, 15.0), 2)
-        x = round(random.uniform(0, area_size[0]), 2)
-        y = round(random.uniform(0, area_size[1]), 2)
-        drones.append(Drone(id=i, max_weight=max_w, battery=battery, speed=speed, start_pos=(x, y)))
-    return drones
+    root = _seed_sequence(seed)
+    layout = _resolve_layout(layout, area_size, root)
+    rng = _child_rng(root, 2)
+    max_w = np.round(rng.uniform(1.0, 5.0, n), 2)
+    battery = rng.integers(2000, 10001, n)
+    speed = np.round(rng.uniform(5.0, 15.0, n), 2)
+    pos = np.round(rng.uniform(0.0, 1.0, (n, 2)) * np.asarray(area_size, dtype=float), 2)
+    if layout.kind == "depot" and len(layout.centers):
+        pos = np.round(np.asarray(layout.centers, dtype=float)[np.arange(n) % len(layout.centers)], 2)
+    return [Drone(id=i, max_weight=w, battery=b, speed=s, start_pos=(x, y))
+            for i, w, b, s, (x, y) in zip(range(1, n + 1), max_w.tolist(), battery.tolist(),
+                                          speed.tolist(), pos.tolist())]
 
 
 def generate_deliveries(m: int,
-                        area_size: Tuple[float, float] = (1000.0, 1000.0)) -> List[DeliveryPoint]:
+                        area_size: Tuple[float, float] = (1000.0, 1000.0),
+                        layout: Union[str, Layout] = "uniform",
+                        window_profile: str = "hourly",
+                        seed: Optional[int] = None) -> List[DeliveryPoint]:
     """
     m adet teslimat noktası oluşturur. pos, weight, priority ve time_window rastgeledir.
+    Büyük senaryolar için iter_deliveries kullanın; aynı seed ile aynı teslimatları üretir.
     """
     deliveries: List[DeliveryPoint] = []
-    for i in range(1, m + 1):
-        x = round(random.uniform(0, area_size[0]), 2)
-        y = round(random.uniform(0, area_size[1]), 2)
-        weight = round(random.uniform(0.1, 3.0), 2)
-        priority = random.randint(1, 5)
-        # time window baslangici 9-16 arasi, 1 saatlik pencere
-        start_h = random.randint(9, 16)
-        time_window = (f"{start_h:02d}:00", f"{start_h+1:02d}:00")
-        deliveries.append(DeliveryPoint(id=i, pos=(x, y), weight=weight, priority=priority, time_window=time_window))
+    for chunk in iter_deliveries(m, area_size, BLOCK, layout, window_profile, seed):
+        deliveries.extend(chunk.to_objects())
     return deliveries
 
 
 def generate_no_fly_zones(k: int,
-                          area_size: Tuple[float, float] = (1000.0, 1000.0)) -> List[NoFlyZone]:
+                          area_size: Tuple[float, float] = (1000.0, 1000.0),
+                          layout: Union[str, Layout] = "uniform",
+                          profile: str = "medium",
+                          seed: Optional[int] = None) -> List[NoFlyZone]:
     """
     k adet no-fly zone (dikdortgen) oluşturur. coordinates ve active_time rastgeledir.
+    profile bölge boyutlarını ("small", "medium", "large"), layout konumlarını belirler
+    (clustered / depot: sıcak noktalar / depolar çevresinde yoğunlaşır).
     """
-    zones: List[NoFlyZone] = []
-    for i in range(1, k + 1):
-        # dikdortgen merkez ve boyut
-        cx = random.uniform(0, area_size[0])
-        cy = random.uniform(0, area_size[1])
-        w = random.uniform(area_size[0] * 0.05, area_size[0] * 0.2)
-        h = random.uniform(area_size[1] * 0.05, area_size[1] * 0.2)
-        x1, y1 = cx - w/2, cy - h/2
-        x2, y2 = cx + w/2, cy - h/2
-        x3, y3 = cx + w/2, cy + h/2
-        x4, y4 = cx - w/2, cy + h/2
-        coords = [(round(x1,2), round(y1,2)), (round(x2,2), round(y2,2)),
-                  (round(x3,2), round(y3,2)), (round(x4,2), round(y4,2))]
-        # aktif zaman araligi 9-17 arasi 1-2 saat arasinda
-        start_h = random.randint(9, 16)
-        length = random.randint(1, 2)
-        active_time = (f"{start_h:02d}:00", f"{start_h+length:02d}:00")
-        zones.append(NoFlyZone(id=i, coordinates=coords, active_time=active_time))
-    return zones 
\ No newline at end of file
+    if profile not in ZONE_PROFILES:
+        raise ValueError(f"Bilinmeyen bölge profili: {profile}")
+    root = _seed_sequence(seed)
+    layout = _resolve_layout(layout, area_size, root)
+    rng = _child_rng(root, 3)
+    area = np.asarray(area_size, dtype=float)
+    low, high = ZONE_PROFILES[profile]
+    # dikdortgen merkez ve boyut
+    centers = _positions(rng, k, area_size, layout)
+    size = rng.uniform(low, high, (k, 2)) * area
+    corners = np.stack([centers + size * np.array(sign) / 2
+                        for sign in ((-1, -1), (1, -1), (1, 1), (-1, 1))], axis=1)
+    corners = np.round(corners, 2)
+    # aktif zaman araligi 9-17 arasi 1-2 saat arasinda
+    start = rng.integers(9, 17, k) * 60
+    length = rng.integers(1, 3, k) * 60
+    return [NoFlyZone(id=i, coordinates=[tuple(c) for c in coords], active_time=(s, s + l))
+            for i, coords, s, l in zip(range(1, k + 1), corners.tolist(), start.tolist(), length.tolist())]
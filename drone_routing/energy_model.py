@@ -1,19 +1,33 @@
-import math
+from typing import Union
+import numpy as np
 
 # Basit enerji tüketimi modeli ile yük, hız, rüzgâr ve irtifa etkileri
 
-def compute_energy(distance: float,
-                   payload_weight: float,
-                   speed: float,
-                   wind_speed: float = 0.0,
-                   elevation_gain: float = 0.0) -> float:
+ArrayLike = Union[float, np.ndarray]
+
+# Batarya nominal gerilimi (V): 4S LiPo paket
+BATTERY_VOLTAGE = 14.8
+
+
+def battery_capacity_wh(battery_mah: float, voltage: float = BATTERY_VOLTAGE) -> float:
+    """mAh cinsinden batarya kapasitesini Wh'a çevirir: mAh * V / 1000."""
+    return battery_mah * voltage / 1000.0
+
+
+def compute_energy(distance: ArrayLike,
+                   payload_weight: ArrayLike,
+                   speed: ArrayLike,
+                   wind_speed: ArrayLike = 0.0,
+                   elevation_gain: ArrayLike = 0.0) -> ArrayLike:
     """
     Mesafe (m), yük (kg), hız (m/s), rüzgâr hızı (m/s) ve irtifa kazanımı (m) parametrelerine göre
     tahmini enerji tüketimi (Wh) döner.
+    Parametreler skaler ya da birbirine yayınlanabilen NumPy dizileri olabilir (ör. tüm kenarlar için
+    mesafe matrisi + hedef yük satırı); skaler girdilerde float, aksi halde dizi döner.
     Formül:
       P_hover = 200.0  # sabit hover gücü (W)
       P_payload = 20.0 * payload_weight  # yük artış gücü (W)
-      P_wind = 50.0 * abs(wind_speed)  # rüzgâr cezası (W)
+      P_wind = 50.0 * np.abs(wind_speed)  # rüzgâr cezası (W)
       P_climb = 9.81 * payload_weight * climb_rate / 3600  # irtifa tırmanışı (W)
       time_h = distance / speed / 3600  # saat cinsine çevir
       E = (P_hover + P_payload + P_wind) * time_h + P_climb * (elevation_gain / climb_rate)
@@ -31,4 +45,4 @@ def compute_energy(distance: float,
     time_h = distance / speed / 3600.0
     # Enerji (Wh)
     E = (P_hover + P_payload + P_wind) * time_h + P_climb * (elevation_gain / climb_rate)
-    return E 
\ No newline at end of file
+    return float(E) if np.ndim(E) == 0 else E 
\ No newline at end of file
@@ -1,13 +1,81 @@
 import random
-from typing import List, Dict, Tuple
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Iterator, List, Dict, Optional, Sequence, Tuple, Union
+import numpy as np
 from .graph import Graph
 from .models import Drone, DeliveryPoint
 from .energy_model import compute_energy
+from .wind import WindField
+from .cache import LRUCache
+from .local_search import LocalSearch
+
+# İşçi süreçlerde paylaşılan GA örneği (havuz başlatılırken bir kez gönderilir)
+_worker_ga: Optional["GeneticAlgorithm"] = None
+
+
+def _init_worker(ga: "GeneticAlgorithm") -> None:
+    global _worker_ga
+    _worker_ga = ga
+
+
+def _evaluate_chunk(chunk, ga: Optional["GeneticAlgorithm"] = None):
+    """ga verilmezse işçinin paylaşılan örneği kullanılır."""
+    ga = _worker_ga if ga is None else ga
+    if isinstance(chunk, np.ndarray):
+        return ga.evaluate_batch(chunk)
+    return [ga._evaluate(ind) for ind in chunk]
+
+
+def _improve_chunk(chunk, ga: Optional["GeneticAlgorithm"] = None):
+    ga = _worker_ga if ga is None else ga
+    if isinstance(chunk, np.ndarray):
+        ga._two_opt_batch(chunk)
+    else:
+        for ind in chunk:
+            ga._apply_local_search(ind)
+    return chunk
+
+
+class _GraphSnapshot:
+    """İşçi süreçlere Graph yerine gönderilen, fitness ve local search için gereken diziler."""
+    __slots__ = ("dist_matrix", "window_start", "window_end", "weights", "earliest_start", "version")
+
+    def __init__(self, graph: Graph):
+        for name in self.__slots__:
+            setattr(self, name, getattr(graph, name))
+
+    def __getstate__(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+
+
+@dataclass
+class GAProgress:
+    generation: int                          # 0'dan başlayan nesil numarası
+    best_solution: Dict[int, List[int]]      # şimdiye kadarki en iyi birey
+    best_fitness: float
+    improved: bool                           # bu nesilde en iyi iyileşti mi
+    generation_time: float                   # bu neslin süresi (s)
+    elapsed: float                           # başlangıçtan bu yana geçen süre (s)
+    stop_reason: Optional[str] = None        # son adımda: "generations", "time_limit", "patience" ya da "callback"
+
 
 class GeneticAlgorithm:
     """
     Genetik Algoritma ile teslimat rotalarını optimize eden sınıf.
     Birey temsili: her drone için teslimat ID listesi {drone_id: [delivery_id, ...]}
+    encoding="array" ile alternatif temsil: tüm teslimatların dev tur permütasyonu + drone kesim noktaları,
+    popülasyon (P, N + D) tamsayı dizisinde tutulur ve fitness tüm popülasyon için NumPy ile hesaplanır.
+    Satır düzeni: [0:N] teslimat sırası (self.deliveries indeksleri), [N:N+D] artan kesim noktaları;
+    drone k'nın rotası perm[cuts[k-1]:cuts[k]], son kesimden sonrası atanmamış teslimatlardır.
+    wind_field verilirse seyahat süreleri ve enerjiler alanın drone hızındaki kenar tablolarından okunur.
+    Graf değişirse (add_delivery, update_drone_position, ...) tablolar ve rota önbellekleri bir sonraki
+    değerlendirmede yeniden kurulur; süren bir çalıştırmanın popülasyonu ise eski teslimat kümesine aittir.
     """
     def __init__(self,
                  graph: Graph,
@@ -18,11 +86,17 @@ class GeneticAlgorithm:
                  alpha: float = 10.0,  # teslimat sayısı ağırlığı
                  beta: float = 1.0,    # enerji tüketimi ağırlığı
                  gamma: float = 100.0, # kural ihlali ağırlığı
-                 wind_speed: float = 0.0  # ortam rüzgâr hızı (m/s)
+                 wind_speed: float = 0.0,  # ortam rüzgâr hızı (m/s)
+                 wind_field: Optional[WindField] = None,  # verilirse wind_speed yerine ızgara rüzgâr alanı
+                 encoding: str = "dict",   # "dict" ya da "array"
+                 workers: int = 0,         # >1 ise fitness ve local search süreç havuzunda paralel
+                 route_cache_size: int = 4096,  # rota katkı önbelleğinin azami girdi sayısı
+                 time_limit: Optional[float] = None,  # saniye; sonraki nesil sığmayacaksa durur
+                 patience: Optional[int] = None       # bu kadar nesil iyileşme olmazsa durur
                  ):
+        if encoding not in ("dict", "array"):
+            raise ValueError(f"Bilinmeyen kodlama: {encoding}")
         self.graph = graph
-        self.drones: List[Drone] = graph.drones
-        self.deliveries: List[DeliveryPoint] = graph.deliveries
         self.population_size = population_size
         self.generations = generations
         self.crossover_rate = crossover_rate
@@ -31,6 +105,57 @@ class GeneticAlgorithm:
         self.beta = beta
         self.gamma = gamma
         self.wind_speed = wind_speed
+        self.encoding = encoding
+        self.workers = workers
+        self.time_limit = time_limit
+        self.patience = patience
+        self.wind_field = wind_field
+        # (drone_id, rota) -> (teslimat sayısı, enerji, ihlal); çaprazlama rotaları aynen taşıdığı için isabet oranı yüksektir
+        self.route_cache: LRUCache = LRUCache(route_cache_size)
+        self.improved_cache: LRUCache = LRUCache(route_cache_size)
+        self._bind_graph()
+
+    def _bind_graph(self) -> None:
+        """
+        Graftan türetilen tabloları kurar ve rota önbelleklerini boşaltır. Graf değişince (graph.version)
+        değerlendirme ve onarım girişlerinde _sync_graph ile yeniden çağrılır; önbellekteki katkılar eski
+        mesafe / pencere / teslimat kümesine ait olduğundan tutulmaz.
+        """
+        graph = self.graph
+        wind_speed, wind_field = self.wind_speed, self.wind_field
+        self._graph_version = graph.version
+        self.drones: List[Drone] = graph.drones
+        self.deliveries: List[DeliveryPoint] = graph.deliveries
+        self.route_cache.clear()
+        self.improved_cache.clear()
+        # Rota içi local search (2-opt + Or-opt, zaman penceresi korumalı); sonuç rota başına önbelleklenir
+        self.local_search = LocalSearch(graph)
+        # Mesafe ve teslimat verileri graf dizilerinden indeksle okunur: id -> düğüm indeksi
+        self._drone_idx = {dr.id: graph.drone_idx(dr.id) for dr in self.drones}
+        self._dp_idx = {dp.id: graph.delivery_idx(dp.id) for dp in self.deliveries}
+        self._ws = graph.window_start.tolist()
+        self._we = graph.window_end.tolist()
+        # Dizi kodlaması için: gen (teslimat sırası) / drone sırası -> düğüm indeksi
+        self._dp_nodes = np.array([self._dp_idx[dp.id] for dp in self.deliveries], dtype=np.int64)
+        self._drone_nodes = np.array([self._drone_idx[dr.id] for dr in self.drones], dtype=np.int64)
+        self._drone_speeds = np.array([dr.speed for dr in self.drones], dtype=float)
+        # Kenar enerjisi 1 m/s için bir kez hesaplanır (rüzgâr dahil); drone enerjisi = matris / hız
+        self._edge_energy = (graph.energy_matrix if wind_speed == 0 else
+                             compute_energy(graph.dist_matrix, graph.weights[np.newaxis, :], 1.0, wind_speed))
+        # Rüzgâr alanında süre ve enerji drone hızına doğrusal değil: drone başına (N, N) tablolar (alan önbelleğinden)
+        self._drone_travel = self._drone_energy = None
+        if wind_field is not None:
+            tables = [wind_field.edge_tables(graph, dr.speed) for dr in self.drones]
+            self._drone_travel = np.stack([travel for travel, _ in tables]) if tables else None
+            self._drone_energy = np.stack([energy for _, energy in tables]) if tables else None
+        self._drone_order = {dr.id: k for k, dr in enumerate(self.drones)}
+        self._drone_battery = graph.battery_wh[self._drone_nodes]
+        self._battery = {dr.id: float(b) for dr, b in zip(self.drones, self._drone_battery)}
+        self._gene = {dp.id: g for g, dp in enumerate(self.deliveries)}
+
+    def _sync_graph(self) -> None:
+        if self.graph.version != self._graph_version:
+            self._bind_graph()
 
     def _initialize_population(self) -> List[Dict[int, List[int]]]:
         population = []
@@ -49,46 +174,167 @@ class GeneticAlgorithm:
             population.append(individual)
         return population
 
+    def repair_seed(self, seed: Dict[int, Union[int, List[int]]]) -> Dict[int, List[int]]:
+        """
+        Tohum çözümü güncel örneğe uyarlar. Kabul edilen biçimler: GA çözümü {drone_id: [delivery_id, ...]}
+        ya da CSP ataması {delivery_id: drone_id}. Artık olmayan drone/teslimatlar, tekrarlar ve
+        kapasiteyi aşan atamalar atılır; tohumda olmayan teslimatlar en ucuz eklemeyle yerleştirilir.
+        """
+        self._sync_graph()
+        weights = {dp.id: dp.weight for dp in self.deliveries}
+        capacity = {dr.id: dr.max_weight for dr in self.drones}
+        if seed and all(isinstance(v, (int, np.integer)) for v in seed.values()):
+            # CSP ataması: drone başına rota, pencere başlangıcına göre sıralı
+            routes: Dict[int, List[int]] = {}
+            for dp_id, dr_id in seed.items():
+                routes.setdefault(int(dr_id), []).append(int(dp_id))
+            for route in routes.values():
+                route.sort(key=lambda dp_id: self._ws[self._dp_idx[dp_id]] if dp_id in self._dp_idx else 0.0)
+        else:
+            routes = {int(dr_id): [int(dp_id) for dp_id in route] for dr_id, route in seed.items()}
+        individual: Dict[int, List[int]] = {dr.id: [] for dr in self.drones}
+        seen = set()
+        for dr_id, route in routes.items():
+            if dr_id not in individual:
+                continue
+            for dp_id in route:
+                if dp_id in weights and dp_id not in seen and weights[dp_id] <= capacity[dr_id]:
+                    seen.add(dp_id)
+                    individual[dr_id].append(dp_id)
+        # yeni teslimatlar: öncelik sırasıyla
+        missing = [dp for dp in self.deliveries if dp.id not in seen]
+        missing.sort(key=lambda dp: (-dp.priority, self._we[self._dp_idx[dp.id]]))
+        for dp in missing:
+            self._insert_cheapest(individual, dp)
+        return individual
+
+    def greedy_solution(self) -> Dict[int, List[int]]:
+        """Boş plandan en ucuz eklemeyle kurulan açgözlü çözüm (tohum olarak kullanılabilir)."""
+        return self.repair_seed({})
+
+    def _insert_cheapest(self, individual: Dict[int, List[int]], dp: DeliveryPoint, candidates: int = 3) -> bool:
+        """
+        Teslimatı ek mesafesi en küçük konuma yerleştirir. En ucuz birkaç aday sırayla denenir;
+        fitness'ı artıran ilk aday kabul edilir, yoksa teslimat atanmaz.
+        """
+        dist = self.graph.dist_matrix
+        cur = self._dp_idx[dp.id]
+        options = []
+        for dr in self.drones:
+            if dp.weight > dr.max_weight:
+                continue
+            route = individual[dr.id]
+            nodes = [self._drone_idx[dr.id]] + [self._dp_idx[dp_id] for dp_id in route]
+            for pos in range(len(route) + 1):
+                prev = nodes[pos]
+                added = dist[prev, cur]
+                if pos < len(route):
+                    succ = nodes[pos + 1]
+                    added += dist[cur, succ] - dist[prev, succ]
+                options.append((float(added), dr.id, pos))
+        options.sort()
+        drones = {dr.id: dr for dr in self.drones}
+        for _, dr_id, pos in options[:candidates]:
+            route = individual[dr_id]
+            before = self._route_contribution(drones[dr_id], tuple(route))
+            candidate = route[:pos] + [dp.id] + route[pos:]
+            after = self._route_contribution(drones[dr_id], tuple(candidate))
+            gain = (self.alpha * (after[0] - before[0]) - self.beta * (after[1] - before[1])
+                    - self.gamma * (after[2] - before[2]))
+            if gain > 0:
+                individual[dr_id] = candidate
+                return True
+        return False
+
+    def _seeded_population(self, seeds: Sequence[Dict[int, Union[int, List[int]]]]) -> List[Dict[int, List[int]]]:
+        """
+        Onarılmış tohumlar aynen, kalan bireylerin çoğu tohumların 1-3 mutasyonlu kopyalarıdır;
+        çeşitlilik için popülasyonun dörtte biri rastgele kalır.
+        """
+        repaired = [self.repair_seed(seed) for seed in seeds][:self.population_size]
+        population = [{dr_id: route[:] for dr_id, route in ind.items()} for ind in repaired]
+        perturbed = self.population_size - len(population) - self.population_size // 4
+        for i in range(max(perturbed, 0)):
+            individual = {dr_id: route[:] for dr_id, route in repaired[i % len(repaired)].items()}
+            for _ in range(random.randint(1, 3)):
+                self._mutate(individual)
+            population.append(individual)
+        rest = self.population_size - len(population)
+        if rest > 0:
+            population.extend(self._initialize_population()[:rest])
+        return population
+
     def _evaluate(self, individual: Dict[int, List[int]]) -> float:
         """
         Fitness değerlendirmesi: alpha * teslimat_sayısı - beta * enerji - gamma * ihlal
+        Drone rotalarının katkıları route_cache'ten okunur, yalnızca değişen rotalar hesaplanır.
         """
-        # time window entegrasyonu için başlangıç zamanını al (dakika)
-        earliest_start = min(self.graph._time_to_min(dp.time_window[0]) for dp in self.deliveries)
+        self._sync_graph()
         delivered_count = 0
         energy = 0.0
         violations = 0
-        # her drone için rota maliyetini hesapla
         for dr in self.drones:
-            route = individual.get(dr.id, [])
-            prev_pos = dr.start_pos
-            current_time = earliest_start
-            for dp_id in route:
-                dp = next(d for d in self.deliveries if d.id == dp_id)
-                # mesafe ve seyahat süresi (saat -> dakika)
-                dist = self.graph._distance(prev_pos, dp.pos)
-                travel_time = (dist / dr.speed) * (1/60)
-                arrival_time = current_time + travel_time
-                ws = self.graph._time_to_min(dp.time_window[0])
-                we = self.graph._time_to_min(dp.time_window[1])
-                # pencere kontrolü
-                if arrival_time > we:
-                    violations += 1
-                    break
-                if arrival_time < ws:
-                    arrival_time = ws
-                # gerçekçi enerji tüketimi
-                # elevation_gain = 0 (varsayılan)
-                energy += compute_energy(distance=dist,
-                                         payload_weight=dp.weight,
-                                         speed=dr.speed,
-                                         wind_speed=self.wind_speed)
-                delivered_count += 1
-                current_time = arrival_time
-                prev_pos = dp.pos
+            route = individual.get(dr.id)
+            if not route:
+                continue
+            delivered, route_energy, route_violations = self._route_contribution(dr, tuple(route))
+            delivered_count += delivered
+            energy += route_energy
+            violations += route_violations
         fitness = self.alpha * delivered_count - self.beta * energy - self.gamma * violations
         return fitness
 
+    def _route_contribution(self, dr: Drone, route: Tuple[int, ...]) -> Tuple[int, float, int]:
+        """
+        Tek drone rotasının (teslimat sayısı, enerji, ihlal) katkısı; önbellekli.
+        Penceresi kaçırılan ya da bataryayı aştıran ilk teslimat ihlal sayılır ve rotanın kalanı kesilir.
+        """
+        key = (dr.id, route)
+        cached = self.route_cache.get(key)
+        if cached is not None:
+            return cached
+        # time window entegrasyonu için başlangıç zamanını al (dakika)
+        dist_matrix = self.graph.dist_matrix
+        edge_energy = self._edge_energy
+        battery = self._battery[dr.id]
+        k = self._drone_order[dr.id]
+        delivered_count = 0
+        energy = 0.0
+        violations = 0
+        prev = self._drone_idx[dr.id]
+        current_time = self.graph.earliest_start
+        for dp_id in route:
+            cur = self._dp_idx[dp_id]
+            # mesafe ve seyahat süresi (saat -> dakika)
+            if self._drone_travel is None:
+                dist = float(dist_matrix[prev, cur])
+                travel_time = (dist / dr.speed) * (1/60)
+                # gerçekçi enerji tüketimi: önceden hesaplanmış kenar enerjisi (elevation_gain = 0)
+                leg_energy = float(edge_energy[prev, cur]) / dr.speed
+            else:
+                travel_time = float(self._drone_travel[k, prev, cur])
+                leg_energy = float(self._drone_energy[k, prev, cur])
+            arrival_time = current_time + travel_time
+            ws = self._ws[cur]
+            we = self._we[cur]
+            # pencere ve batarya kontrolü
+            if arrival_time > we or energy + leg_energy > battery:
+                violations += 1
+                break
+            if arrival_time < ws:
+                arrival_time = ws
+            energy += leg_energy
+            delivered_count += 1
+            current_time = arrival_time
+            prev = cur
+        contribution = (delivered_count, energy, violations)
+        self.route_cache.put(key, contribution)
+        return contribution
+
+    def cache_stats(self) -> Dict[str, float]:
+        """Rota katkı önbelleğinin isabet / ıska istatistikleri (süreç havuzunda yalnızca ana süreç)."""
+        return self.route_cache.stats()
+
     def _tournament_selection(self, population: List[Dict[int, List[int]]],
                               fitnesses: List[float], k: int = 3) -> Dict[int, List[int]]:
         """K-tournament seçimi"""
@@ -142,68 +388,426 @@ class GeneticAlgorithm:
         """
         Belirli bir dronun rotasındaki toplam mesafeyi hesaplar.
         """
-        dr = next(d for d in self.drones if d.id == dr_id)
-        prev_pos = dr.start_pos
+        dist = self.graph.dist_matrix
+        prev = self._drone_idx[dr_id]
         total = 0.0
         for dp_id in route:
-            dp = next(d for d in self.deliveries if d.id == dp_id)
-            total += self.graph._distance(prev_pos, dp.pos)
-            prev_pos = dp.pos
-        return total
-
-    def _two_opt_route(self, dr_id: int, route: List[int]) -> List[int]:
-        """
-        2-opt algoritmasıyla tek bir rota üzerinde iyileştirme yapar.
-        """
-        best = route[:]
-        improved = True
-        while improved:
-            improved = False
-            for i in range(len(best) - 1):
-                for j in range(i + 2, len(best)):
-                    new_route = best[:i+1] + best[i+1:j+1][::-1] + best[j+1:]
-                    if self._route_distance(dr_id, new_route) < self._route_distance(dr_id, best):
-                        best = new_route
-                        improved = True
-                        break
-                if improved:
-                    break
-        return best
+            cur = self._dp_idx[dp_id]
+            total += dist[prev, cur]
+            prev = cur
+        return float(total)
 
     def _apply_local_search(self, individual: Dict[int, List[int]]) -> None:
         """
-        Her dronun rotasına 2-opt local search uygular.
+        Her dronun rotasına rota içi local search (2-opt, Or-opt) uygular.
+        Drone ataması GA'ya bırakılır, rotalar arası hamle yapılmaz; daha önce iyileştirilmiş rotalar önbellekten gelir.
         """
+        self._sync_graph()
+        pending: Dict[int, List[int]] = {}
         for dr_id, route in individual.items():
-            if len(route) > 2:
-                individual[dr_id] = self._two_opt_route(dr_id, route)
+            if len(route) < 2:
+                continue
+            cached = self.improved_cache.get((dr_id, tuple(route)))
+            if cached is not None:
+                individual[dr_id] = list(cached)
+            else:
+                pending[dr_id] = route
+        if not pending:
+            return
+        for dr_id, route in self.local_search.improve(pending, inter_route=False).items():
+            self.improved_cache.put((dr_id, tuple(pending[dr_id])), tuple(route))
+            individual[dr_id] = route
+
+    def __getstate__(self):
+        """İşçilere graf nesnesi yerine yalnızca gerekli dizilerin anlık görüntüsü gönderilir."""
+        state = self.__dict__.copy()
+        state["graph"] = _GraphSnapshot(self.graph)
+        # kenar tabloları zaten state'te; alanın önbelleği (zayıf referanslar) gönderilmez
+        state["wind_field"] = None
+        return state
 
-    def run(self) -> Tuple[Dict[int, List[int]], float]:
-        """Genetik algoritmayı çalıştırır ve en iyi bireyi döner"""
-        population = self._initialize_population()
+    def _pool(self) -> Optional[Executor]:
+        """workers > 1 ise GA örneğini her işçiye bir kez yükleyen süreç havuzu."""
+        if self.workers <= 1:
+            return None
+        return ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=(self,))
+
+    def _chunked(self, pool: Optional[Executor], fn, items):
+        """
+        fn'i ardışık parçalara uygular ve sonuçları sırayla birleştirir; havuz yoksa tek parça bu örnekle
+        işlenir (süreç genelindeki _worker_ga'ya dokunulmaz, aynı süreçte birden çok GA güvenle çalışır).
+        İşçiler rastgelelik kullanmaz, sonuçlar işçi sayısından bağımsızdır.
+        """
+        if pool is None:
+            return fn(items, self)
+        if isinstance(items, np.ndarray):
+            return np.concatenate(list(pool.map(fn, np.array_split(items, self.workers))))
+        size = -(-len(items) // self.workers)
+        chunks = [items[i:i + size] for i in range(0, len(items), size)]
+        return [x for part in pool.map(fn, chunks) for x in part]
+
+    def run(self,
+            time_limit: Optional[float] = None,
+            patience: Optional[int] = None,
+            callback: Optional[Callable[[GAProgress], Optional[bool]]] = None,
+            seeds: Optional[Sequence[Dict[int, Union[int, List[int]]]]] = None) -> Tuple[Dict[int, List[int]], float]:
+        """
+        Genetik algoritmayı çalıştırır ve en iyi bireyi döner.
+        callback her nesilden sonra GAProgress ile çağrılır; False dönerse çalıştırma durur.
+        seeds: sıcak başlangıç için önceki çözümler (bkz. repair_seed).
+        """
         best_ind, best_fit = None, float('-inf')
-        for _ in range(self.generations):
-            fitnesses = [self._evaluate(ind) for ind in population]
-            # elitizm
-            for ind, fit in zip(population, fitnesses):
-                if fit > best_fit:
-                    best_fit = fit
-                    best_ind = ind
-            new_pop = []
-            while len(new_pop) < self.population_size:
-                p1 = self._tournament_selection(population, fitnesses)
-                p2 = self._tournament_selection(population, fitnesses)
-                if random.random() < self.crossover_rate:
-                    c1, c2 = self._crossover(p1, p2)
+        steps = self.iter_run(time_limit, patience, seeds)
+        try:
+            for progress in steps:
+                best_ind, best_fit = progress.best_solution, progress.best_fitness
+                if callback is not None and callback(progress) is False:
+                    progress.stop_reason = "callback"
+                    break
+        finally:
+            # erken çıkışta süreç havuzu hemen kapatılır
+            steps.close()
+        return best_ind, best_fit
+
+    def iter_run(self, time_limit: Optional[float] = None, patience: Optional[int] = None,
+                 seeds: Optional[Sequence[Dict[int, Union[int, List[int]]]]] = None) -> Iterator[GAProgress]:
+        """
+        Her nesilden sonra o ana kadarki en iyi bireyi GAProgress olarak verir (anytime kullanım).
+        Durma koşulları: generations, time_limit (bir sonraki nesil süre sınırını aşacaksa) ve
+        patience (art arda iyileşmeyen nesil sayısı); son adımın stop_reason alanı doludur.
+        Parametreler verilmezse kurucudaki değerler kullanılır.
+        """
+        time_limit = self.time_limit if time_limit is None else time_limit
+        patience = self.patience if patience is None else patience
+        started = time.perf_counter()
+        pool = self._pool()
+        try:
+            population = self.initial_population(seeds)
+            best_ind, best_fit = None, float('-inf')
+            best_dict = None
+            fitnesses = None
+            stale = 0
+            for gen in range(self.generations):
+                gen_start = time.perf_counter()
+                if gen:
+                    population = self.next_generation(population, fitnesses, pool)
+                fitnesses = self.evaluate_population(population, pool)
+                # elitizm
+                prev_fit = best_fit
+                best_ind, best_fit = self._track_best(population, fitnesses, best_ind, best_fit)
+                improved = best_fit > prev_fit
+                if improved:
+                    best_dict = self.as_dict(best_ind)
+                    stale = 0
                 else:
-                    c1, c2 = p1.copy(), p2.copy()
-                if random.random() < self.mutation_rate:
-                    self._mutate(c1)
-                if random.random() < self.mutation_rate:
-                    self._mutate(c2)
-                # Local search uygulama
-                self._apply_local_search(c1)
-                self._apply_local_search(c2)
-                new_pop.extend([c1, c2])
-            population = new_pop[:self.population_size]
-        return best_ind, best_fit 
\ No newline at end of file
+                    stale += 1
+                now = time.perf_counter()
+                progress = GAProgress(gen, best_dict, best_fit, improved, now - gen_start, now - started)
+                if gen == self.generations - 1:
+                    progress.stop_reason = "generations"
+                elif time_limit is not None and progress.elapsed + progress.generation_time > time_limit:
+                    progress.stop_reason = "time_limit"
+                elif patience is not None and stale >= patience:
+                    progress.stop_reason = "patience"
+                yield progress
+                if progress.stop_reason is not None:
+                    return
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+    # --- Nesil adımları (run, ada modeli ve dış döngüler için) ---
+
+    def initial_population(self, seeds: Optional[Sequence[Dict[int, Union[int, List[int]]]]] = None):
+        """
+        Başlangıç popülasyonu: sözlük listesi ya da (P, N + D) genom dizisi.
+        seeds verilirse popülasyon onarılmış tohumlardan ve onların pertürbasyonlarından kurulur.
+        """
+        self._sync_graph()
+        if self.encoding == "array":
+            self._rng = np.random.default_rng(random.getrandbits(64))
+        population = self._seeded_population(seeds) if seeds else self._initialize_population()
+        return self.encode(population) if self.encoding == "array" else population
+
+    def evaluate_population(self, population, pool: Optional[Executor] = None):
+        return self._chunked(pool, _evaluate_chunk, population)
+
+    def next_generation(self, population, fitnesses, pool: Optional[Executor] = None):
+        """Seçim, çaprazlama, mutasyon ve local search ile bir sonraki nesil."""
+        if self.encoding == "array":
+            return self._next_generation_array(population, fitnesses, pool)
+        return self._next_generation_dict(population, fitnesses, pool)
+
+    def as_dict(self, individual) -> Optional[Dict[int, List[int]]]:
+        """Bireyi (sözlük ya da genom satırı) {drone_id: [delivery_id, ...]} biçiminde döner."""
+        if individual is None or isinstance(individual, dict):
+            return individual
+        return self.decode(individual)
+
+    @staticmethod
+    def _track_best(population, fitnesses, best_ind, best_fit: float):
+        top = int(np.argmax(fitnesses))
+        if fitnesses[top] > best_fit:
+            best = population[top]
+            return (best.copy() if isinstance(best, np.ndarray) else best), float(fitnesses[top])
+        return best_ind, best_fit
+
+    def _next_generation_dict(self, population: List[Dict[int, List[int]]], fitnesses: List[float],
+                              pool: Optional[Executor]) -> List[Dict[int, List[int]]]:
+        new_pop = []
+        while len(new_pop) < self.population_size:
+            p1 = self._tournament_selection(population, fitnesses)
+            p2 = self._tournament_selection(population, fitnesses)
+            if random.random() < self.crossover_rate:
+                c1, c2 = self._crossover(p1, p2)
+            else:
+                # rota listeleri de kopyalanır: mutasyon ebeveyni (ve en iyi bireyi) değiştirmez
+                c1 = {dr_id: route[:] for dr_id, route in p1.items()}
+                c2 = {dr_id: route[:] for dr_id, route in p2.items()}
+            if random.random() < self.mutation_rate:
+                self._mutate(c1)
+            if random.random() < self.mutation_rate:
+                self._mutate(c2)
+            new_pop.extend([c1, c2])
+        # Local search uygulama (rastgelelik kullanmaz, toplu ve paralel yapılabilir)
+        return self._chunked(pool, _improve_chunk, new_pop[:self.population_size])
+
+    # --- Dizi kodlaması: dev tur + kesim noktaları ---
+
+    def encode(self, individuals: Union[Dict[int, List[int]], Sequence[Dict[int, List[int]]]]) -> np.ndarray:
+        """Sözlük birey(ler)ini (P, N + D) genom dizisine çevirir; atanmamış teslimatlar sona eklenir."""
+        if isinstance(individuals, dict):
+            individuals = [individuals]
+        n, d = len(self.deliveries), len(self.drones)
+        genomes = np.empty((len(individuals), n + d), dtype=np.int64)
+        for r, ind in enumerate(individuals):
+            perm: List[int] = []
+            for k, dr in enumerate(self.drones):
+                perm.extend(self._gene[dp_id] for dp_id in ind.get(dr.id, []))
+                genomes[r, n + k] = len(perm)
+            assigned = set(perm)
+            perm.extend(g for g in range(n) if g not in assigned)
+            genomes[r, :n] = perm
+        return genomes
+
+    def decode(self, genome: np.ndarray) -> Dict[int, List[int]]:
+        """Tek genom satırını {drone_id: [delivery_id, ...]} sözlüğüne çevirir."""
+        n = len(self.deliveries)
+        perm, cuts = genome[:n].tolist(), genome[n:].tolist()
+        individual: Dict[int, List[int]] = {}
+        start = 0
+        for dr, end in zip(self.drones, cuts):
+            individual[dr.id] = [self.deliveries[g].id for g in perm[start:end]]
+            start = end
+        return individual
+
+    def _segments(self, genomes: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Her konum için (drone segmenti, segment başı mı, ilk düğümden önceki drone düğümü)."""
+        n = len(self.deliveries)
+        cuts = genomes[:, n:]
+        # segment = konumdan küçük-eşit kesim sayısı; D ise teslimat atanmamıştır
+        marks = np.bincount((np.arange(len(genomes))[:, np.newaxis] * (n + 1) + cuts).ravel(),
+                            minlength=len(genomes) * (n + 1)).reshape(-1, n + 1)
+        seg = np.cumsum(marks[:, :n], axis=1)
+        first = np.ones(seg.shape, dtype=bool)
+        first[:, 1:] = seg[:, 1:] != seg[:, :-1]
+        start_nodes = self._drone_nodes[np.minimum(seg, len(self.drones) - 1)]
+        return seg, first, start_nodes
+
+    def evaluate_batch(self, genomes: Union[np.ndarray, Sequence[Dict[int, List[int]]]]) -> np.ndarray:
+        """
+        Tüm popülasyonun fitness değerleri (_evaluate ile aynı kurallar), Python döngüsü olmadan.
+        Bekleme dahil varış zamanları segment içi önek toplamı + kümülatif maksimumla bulunur:
+          t_k = R_k + max(başlangıç, max_{j<=k}(ws_j - R_j)),  R = segment içi seyahat önek toplamı
+        Batarya kontrolü için segment içi enerji önek toplamı drone kapasitesiyle karşılaştırılır.
+        Sözlük listesi de kabul edilir.
+        """
+        self._sync_graph()
+        if not isinstance(genomes, np.ndarray):
+            genomes = self.encode(genomes)
+        count, n, d = len(genomes), len(self.deliveries), len(self.drones)
+        if count == 0 or n == 0 or d == 0:
+            return np.zeros(count)
+        graph = self.graph
+        start = graph.earliest_start
+        seg, first, start_nodes = self._segments(genomes)
+        active = seg < d
+        nodes = self._dp_nodes[genomes[:, :n]]
+        prev_nodes = np.where(first, start_nodes, np.roll(nodes, 1, axis=1))
+        drone = np.minimum(seg, d - 1)
+        if self._drone_travel is None:
+            dist = graph.dist_matrix[prev_nodes, nodes]
+            speed = self._drone_speeds[drone]
+            travel = (dist / speed) * (1/60)
+            energy = self._edge_energy[prev_nodes, nodes] / speed
+        else:
+            travel = self._drone_travel[drone, prev_nodes, nodes]
+            energy = self._drone_energy[drone, prev_nodes, nodes]
+        ws = graph.window_start[nodes]
+        we = graph.window_end[nodes]
+        battery = self._drone_battery[drone]
+
+        pos = np.broadcast_to(np.arange(n), seg.shape)
+        seg_start = np.maximum.accumulate(np.where(first, pos, 0), axis=1)
+        prefix = np.cumsum(travel, axis=1)
+        rel = prefix - np.take_along_axis(prefix - travel, seg_start, axis=1)
+        # Segment içi kümülatif maksimum: her segmente öncekilerden büyük bir kaydırma eklenir
+        slack = ws - rel
+        span = float(slack.max() - slack.min()) + 1.0
+        run_max = np.maximum.accumulate(slack + seg * span, axis=1) - seg * span
+        prev_max = np.where(first, -np.inf, np.roll(run_max, 1, axis=1))
+        arrival_time = rel + np.maximum(start, prev_max)
+        energy_prefix = np.cumsum(energy, axis=1)
+        used = energy_prefix - np.take_along_axis(energy_prefix - energy, seg_start, axis=1)
+        # İlk pencere ya da batarya ihlalinden sonra rotanın kalanı sayılmaz
+        late = active & ((arrival_time > we) | (used > battery))
+        last_late = np.maximum.accumulate(np.where(late, pos, -1), axis=1)
+        prev_late = np.where(first, -1, np.roll(last_late, 1, axis=1))
+        broken = prev_late >= seg_start
+        delivered = active & ~late & ~broken
+        violations = (late & ~broken).sum(axis=1)
+        total_energy = np.where(delivered, energy, 0.0).sum(axis=1)
+        return self.alpha * delivered.sum(axis=1) - self.beta * total_energy - self.gamma * violations
+
+    def _tournament_batch(self, fitnesses: np.ndarray, size: int, rng: np.random.Generator, k: int = 3) -> np.ndarray:
+        """size adet K-tournament seçimi; kazananların satır indeksleri."""
+        contenders = rng.integers(len(fitnesses), size=(size, k))
+        return contenders[np.arange(size), fitnesses[contenders].argmax(axis=1)]
+
+    def _crossover_batch(self, parents1: np.ndarray, parents2: np.ndarray,
+                         rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        _crossover'ın dizi karşılığı: her drone rotası rastgele ebeveynden alınır; iki drona düşen teslimat
+        drone sırasında ilk rotada kalır, hiçbirine düşmeyen atanmamış kuyruğa gider.
+        Çocuklar gen başına (drone, ebeveyndeki konum) anahtarına göre sıralanarak kurulur.
+        """
+        n, d = len(self.deliveries), len(self.drones)
+        m = len(parents1)
+        rows = np.arange(m)[:, np.newaxis]
+
+        def layout(parents: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+            """gen -> (segment, konum) tabloları."""
+            seg, _, _ = self._segments(parents)
+            label = np.empty((m, n), dtype=np.int64)
+            where = np.empty((m, n), dtype=np.int64)
+            label[rows, parents[:, :n]] = seg
+            where[rows, parents[:, :n]] = np.arange(n)
+            return label, where
+
+        label1, where1 = layout(parents1)
+        label2, where2 = layout(parents2)
+        from_first = rng.random((m, d + 1)) < 0.5
+        from_first[:, d] = True  # atanmamış kuyruk sırası birinci ebeveynden
+
+        def child(take_first: np.ndarray) -> np.ndarray:
+            k1 = np.where(take_first[rows, label1], label1, d)
+            k2 = np.where(~take_first[rows, label2], label2, d)
+            drone = np.minimum(k1, k2)
+            src_pos = np.where(k1 <= k2, where1, where2 + n)
+            perm = np.argsort(drone * (2 * n) + src_pos, axis=1, kind="stable")
+            counts = (drone[:, :, np.newaxis] == np.arange(d)).sum(axis=1)
+            return np.hstack([perm, np.cumsum(counts, axis=1)])
+
+        return child(from_first), child(~from_first)
+
+    def _mutate_batch(self, genomes: np.ndarray, mask: np.ndarray, rng: np.random.Generator) -> None:
+        """_mutate'in dizi karşılığı: seçili satırlarda bir teslimatı rastgele drona taşır ya da bırakır."""
+        n, d = len(self.deliveries), len(self.drones)
+        for r in np.flatnonzero(mask).tolist():
+            perm, cuts = genomes[r, :n], genomes[r, n:]
+            assigned = int(cuts[-1]) if d else 0
+            if assigned == 0:
+                continue
+            # çıkar
+            i = int(rng.integers(assigned))
+            gene = perm[i]
+            perm[i:-1] = perm[i + 1:].copy()
+            cuts[cuts > i] -= 1
+            # yeniden ata: drone k'nın rotasının sonuna ya da atanmamış kuyruğa (k == d)
+            k = int(rng.integers(d + 1))
+            at = int(cuts[k]) if k < d else n - 1
+            perm[at + 1:] = perm[at:-1].copy()
+            perm[at] = gene
+            if k < d:
+                cuts[k:] += 1
+
+    def _two_opt_batch(self, genomes: np.ndarray, rows: Optional[np.ndarray] = None, candidates: int = 8) -> None:
+        """
+        Seçili bireylerin rotalarında 2-opt: aynı rotadaki tüm (a, b) konum çiftlerinin mesafe kazancı tek seferde
+        hesaplanır (bellek rota uzunluklarının kareleri toplamıyla orantılı, N² değil), birey başına en çok kazandıran `candidates` ters çevirme evaluate_batch ile değerlendirilir.
+        Pencere / batarya ihlali ya da enerji artışı fitness'ı düşürdüğünden yalnızca fitness'ı artıran ilk
+        (en büyük kazançlı) ters çevirme uygulanır; iyileşme kalmayana kadar tekrarlanır.
+        """
+        n, d = len(self.deliveries), len(self.drones)
+        rows = np.arange(len(genomes)) if rows is None else np.asarray(rows)
+        if n < 2 or d == 0:
+            return
+        dm = self.graph.dist_matrix
+        pos = np.arange(n)
+        fitness = self.evaluate_batch(genomes[rows]) if len(rows) else np.zeros(0)
+        for _ in range(n * n):
+            if len(rows) == 0:
+                return
+            sub = genomes[rows]
+            seg, first, start_nodes = self._segments(sub)
+            nodes = self._dp_nodes[sub[:, :n]]
+            prev_nodes = np.where(first, start_nodes, np.roll(nodes, 1, axis=1))
+            next_nodes = np.roll(nodes, -1, axis=1)
+            has_next = np.zeros(seg.shape, dtype=bool)
+            has_next[:, :-1] = ~first[:, 1:]
+            # Aynı rotadaki a < b çiftleri (birey, a, b sırasında), yoğun (P, N, N) dizi kurulmadan:
+            # her a için b, a + 1'den rotanın son konumuna kadar
+            last = ~has_next
+            seg_end = np.minimum.accumulate(np.where(last, pos, n)[:, ::-1], axis=1)[:, ::-1]
+            r, a = np.nonzero(seg < d)
+            count = seg_end[r, a] - a
+            offset = np.arange(count.sum()) - np.repeat(np.cumsum(count) - count, count)
+            r, a = np.repeat(r, count), np.repeat(a, count)
+            b = a + 1 + offset
+            # a..b konumlarını ters çevir: (pn[a], a) ve (b, nx[b]) kenarları yerine (pn[a], b) ve (a, nx[b])
+            gain = (dm[prev_nodes[r, a], nodes[r, a]] - dm[prev_nodes[r, a], nodes[r, b]]
+                    + np.where(has_next[r, b], dm[nodes[r, b], next_nodes[r, b]] - dm[nodes[r, a], next_nodes[r, b]], 0.0))
+            # Birey başına kazancı en büyük adaylar (birey, azalan kazanç sırasında)
+            keep = gain > 1e-9
+            r, a, b, gain = r[keep], a[keep], b[keep], gain[keep]
+            order = np.lexsort((-gain, r))
+            r, a, b = r[order], a[order], b[order]
+            _, row_start, row_count = np.unique(r, return_index=True, return_counts=True)
+            rank = np.arange(len(r)) - np.repeat(row_start, row_count)
+            top = rank < candidates
+            r, a, b = r[top], a[top], b[top]
+            if len(r) == 0:
+                return
+            # Aday genomlar: a..b ters çevrilmiş permütasyon + aynı kesimler
+            inside = (pos >= a[:, np.newaxis]) & (pos <= b[:, np.newaxis])
+            src = np.where(inside, (a + b)[:, np.newaxis] - pos, pos)
+            trial = sub[r].copy()
+            trial[:, :n] = np.take_along_axis(sub[r, :n], src, axis=1)
+            trial_fitness = self.evaluate_batch(trial)
+            better = np.flatnonzero(trial_fitness > fitness[r] + 1e-9)
+            improving, first_hit = np.unique(r[better], return_index=True)
+            if len(improving) == 0:
+                return
+            chosen = better[first_hit]
+            genomes[rows[improving]] = trial[chosen]
+            fitness = trial_fitness[chosen]
+            rows = rows[improving]
+
+    def _next_generation_array(self, population: np.ndarray, fitnesses: np.ndarray,
+                               pool: Optional[Executor]) -> np.ndarray:
+        """Dizi kodlamasıyla bir nesil; rastgelelik initial_population'da random modülünden tohumlanır."""
+        rng = self._rng
+        size = self.population_size
+        if len(self.drones) == 0 or len(self.deliveries) == 0:
+            # evrilecek atama yok (evaluate_batch de tüm bireyler için 0 döner)
+            return population[np.arange(size) % len(population)]
+        pairs = (size + 1) // 2
+        p1 = population[self._tournament_batch(fitnesses, pairs, rng)]
+        p2 = population[self._tournament_batch(fitnesses, pairs, rng)]
+        c1, c2 = self._crossover_batch(p1, p2, rng)
+        no_cross = rng.random(pairs) >= self.crossover_rate
+        c1[no_cross], c2[no_cross] = p1[no_cross], p2[no_cross]
+        children = np.vstack([c1, c2])
+        self._mutate_batch(children, rng.random(len(children)) < self.mutation_rate, rng)
+        # Local search uygulama
+        return self._chunked(pool, _improve_chunk, children[:size])
@@ -1,56 +1,277 @@
+import dataclasses
 import math
-from typing import Dict, List, Tuple
-from .models import Drone, DeliveryPoint, NoFlyZone
+import os
+from concurrent.futures import ProcessPoolExecutor
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Optional, Tuple
+import numpy as np
+from .models import Drone, DeliveryPoint, NoFlyZone, parse_time, split_window
+from .nodes import NodeKeyIndex, NodeKeyList, NodeMap, NodeStore
+from .spatial import CrossingMatrix, ZoneGridIndex
+from .intervals import IntervalTree
+from .cache import LRUCache
+from .energy_model import compute_energy
+from . import tsptw
+
+TSPTW_CACHE_SIZE = 4096  # önbellekte tutulan azami TSPTW sonucu
+
+
+class _AdjacencyView(Mapping):
+    """
+    Komşuluk listesinin dizi tabanlı görünümü: node_key -> list of (neighbor_key, cost).
+    Listeler saklanmaz, her erişimde Graph'ın matrislerinden üretilir.
+    """
+    def __init__(self, graph: "Graph"):
+        self._graph = graph
+
+    def __getitem__(self, key: str) -> List[Tuple[str, float]]:
+        g = self._graph
+        i = g.store.index(key)
+        cols = np.flatnonzero(g.capacity_mask[i])
+        costs = g.cost_matrix[i, cols]
+        return [(g.store.key(j), c) for j, c in zip(cols.tolist(), costs.tolist())]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._graph.node_keys)
+
+    def __len__(self) -> int:
+        return len(self._graph.store)
+
 
 class Graph:
     """
     Düğümler ve kenarlar üzerinden teslimat rotası planlaması için graf yapısı.
+    Düğümler NodeStore'da ardışık tamsayı indeksleriyle tutulur; 'drone_{id}' / 'dp_{id}'
+    string anahtarlı API (nodes, node_index, node_keys, adjacency) bunun üzerinde ince bir katmandır.
     """
+    # Düğüm başına (N, ...) ve düğüm çifti başına (N, N) tutulan diziler
+    _NODE_ARRAYS = tuple(NodeStore.FIELDS)
+    _PAIR_ARRAYS = ("dist_matrix", "cost_matrix", "capacity_mask", "energy_matrix")
+
     def __init__(self,
                  drones: List[Drone],
                  deliveries: List[DeliveryPoint],
                  no_fly_zones: List[NoFlyZone]):
+        # Her yapısal değişiklikte artan sürüm numarası (türetilmiş önbellekler için)
+        self.version = 0
+        # TSPTW sonuç önbelleği: (drone, başlangıç konumu, hız, teslimat kümesi, ayarlar, batarya) -> sonuç
+        # (TSPTW doğrudan uçuş süreleriyle çözülür, no-fly zone'lar sonucu etkilemez)
+        self.tsptw_cache: LRUCache = LRUCache(TSPTW_CACHE_SIZE)
         self.drones = drones
         self.deliveries = deliveries
         self.no_fly_zones = no_fly_zones
-        # Düğümler: anahtar olarak 'drone_{id}' ve 'dp_{id}' kullanılır
-        self.nodes: Dict[str, Drone or DeliveryPoint] = self._init_nodes()
-        # Komşuluk listesi: node_key -> list of (neighbor_key, cost)
-        self.adjacency: Dict[str, List[Tuple[str, float]]] = {}
+        # Komşuluk listesi: node_key -> list of (neighbor_key, cost), matrisler üzerinde görünüm
+        self.adjacency: Mapping = _AdjacencyView(self)
         self.build_graph()
         # Ceza sabiti: no-fly zone ihlalinde ek maliyet
         self.NO_FLY_PENALTY = 10000
 
-    def _init_nodes(self) -> Dict[str, Drone or DeliveryPoint]:
-        nodes: Dict[str, Drone or DeliveryPoint] = {}
-        for dr in self.drones:
-            nodes[f"drone_{dr.id}"] = dr
-        for dp in self.deliveries:
-            nodes[f"dp_{dp.id}"] = dp
-        return nodes
+    @property
+    def no_fly_zones(self) -> List[NoFlyZone]:
+        return self._no_fly_zones
+
+    @no_fly_zones.setter
+    def no_fly_zones(self, zones: List[NoFlyZone]) -> None:
+        """Bölgeler değiştiğinde uzamsal indeks yeniden kurulur, kesişim matrisi bölge bazlı güncellenir."""
+        self._no_fly_zones = zones
+        self.zone_index = ZoneGridIndex(zones)
+        # Aktif zaman aralıkları (dakika; gece yarısını aşan pencereler iki aralık) ve aralık ağacı
+        intervals = [(start, end, k) for k, z in enumerate(zones) for start, end in split_window(z.active_time)]
+        self.zone_interval_start = np.array([iv[0] for iv in intervals], dtype=float)
+        self.zone_interval_end = np.array([iv[1] for iv in intervals], dtype=float)
+        self.zone_interval_zone = np.array([iv[2] for iv in intervals], dtype=np.int64)
+        self.zone_windows = IntervalTree([(start, end, r) for r, (start, end, _) in enumerate(intervals)])
+        if getattr(self, "crossing", None) is not None:
+            self.crossing.set_zones(zones, self.zone_index)
+        self.version += 1
+
+    # --- string anahtar uyumluluk katmanı ---
+
+    @property
+    def nodes(self) -> Mapping:
+        """Düğümler: anahtar olarak 'drone_{id}' ve 'dp_{id}' kullanılır."""
+        return NodeMap(self.store)
+
+    @property
+    def node_index(self) -> Mapping:
+        return NodeKeyIndex(self.store)
+
+    @property
+    def node_keys(self) -> NodeKeyList:
+        return NodeKeyList(self.store)
+
+    def drone_idx(self, drone_id: int) -> int:
+        """Drone düğümünün indeksi; yoksa ValueError."""
+        try:
+            return self.store.drone_index[drone_id]
+        except KeyError:
+            raise ValueError(f"Drone {drone_id} bulunamadı") from None
+
+    def delivery_idx(self, dp_id: int) -> int:
+        """Teslimat düğümünün indeksi; yoksa ValueError."""
+        try:
+            return self.store.delivery_index[dp_id]
+        except KeyError:
+            raise ValueError(f"Teslimat {dp_id} bulunamadı") from None
 
     def build_graph(self) -> None:
         """
         Her düğüm için geçerli komşuları ve maliyetleri hesaplayarak grafı oluşturur.
         Drone başlangıçlarından yalnızca teslimat noktasına, teslimat düğümlerinden diğer teslimat düğümlerine izin verir.
         Ağırlık kapasitesini aşan kenarlar elenir.
+        Tüm düğüm çiftleri NumPy ile tek seferde hesaplanır:
+          dist_matrix[i, j]   : Öklidyen mesafe
+          cost_matrix[i, j]   : dist * hedef ağırlığı + hedef öncelik cezası
+          capacity_mask[i, j] : i -> j kenarı geçerli mi
+          energy_matrix[i, j] : 1 m/s hızda, hedef yüküyle kenar enerjisi (Wh); drone için hızına bölünür
         """
+        self.store = NodeStore(self.drones, self.deliveries)
+        self._buffers: Dict[str, np.ndarray] = {}
+        self._capacity = len(self.store)
+        for name in self._NODE_ARRAYS:
+            setattr(self, name, getattr(self.store, name))
+        self._update_earliest_start()
+
+        # Mesafe matrisi
+        xs, ys = self.positions[:, 0], self.positions[:, 1]
+        self.dist_matrix = np.hypot(np.subtract.outer(xs, xs), np.subtract.outer(ys, ys))
         # Teslimat önceliklerinden maksimum değeri al
+        self.max_priority = max((dp.priority for dp in self.deliveries), default=5)
+        # Ceza = (max_priority - dst.priority) * 100, yalnızca teslimat hedefleri için
+        self.priority_penalty[:] = np.where(self.is_delivery, (self.max_priority - self.priorities) * 100, 0.0)
+        self.cost_matrix = self.dist_matrix * self.weights + self.priority_penalty
+        # Hedef mutlaka teslimat noktası olmalı; drone'dan teslimata ağırlık kapasitesi kontrolü.
+        # Teslimat düğümünden teslimat düğümüne: önceki paket teslim edildiği için kapasite kontrolü yok
+        self.capacity_mask = self.is_delivery[np.newaxis, :] & (self.weights[np.newaxis, :] <= self.max_weights[:, np.newaxis])
+        np.fill_diagonal(self.capacity_mask, False)
+        # Enerji hızla ters orantılı: drone kenar enerjisi = energy_matrix / hız (bkz. edge_energy)
+        self.energy_matrix = compute_energy(self.dist_matrix, self.weights[np.newaxis, :], 1.0)
+        # Artımlı güncellemeler için çift dizileri kapasiteli tamponlarda tutulur, öznitelikler bunların görünümüdür
+        for name in self._PAIR_ARRAYS:
+            self._buffers[name] = getattr(self, name)
+        # Segment-bölge kesişim matrisi: düğüm indeksleri değiştiği için sıfırdan ve tembel kurulur
+        self.crossing = CrossingMatrix(
+            self.positions,
+            lambda a, b, zi: self._segment_crosses_polygon(a, b, self._no_fly_zones[zi].coordinates))
+        self.crossing.set_zones(self._no_fly_zones, self.zone_index)
+        self.tsptw_cache.clear()
+        self.version += 1
+
+    # --- Artımlı güncelleme API'si: her olay yalnızca etkilenen satır/sütunları yazar (O(N)) ---
+
+    def _refresh_views(self) -> None:
+        """Dizi özniteliklerini tamponların etkin [:n] kısmına yeniden bağlar."""
+        n = len(self.store)
+        for name in self._NODE_ARRAYS:
+            setattr(self, name, getattr(self.store, name))
+        for name in self._PAIR_ARRAYS:
+            setattr(self, name, self._buffers[name][:n, :n])
+        self.crossing.positions = self.positions
+        self.crossing.n = n
+
+    def _reserve(self, size: int) -> None:
+        """Çift tamponlarını gerekirse iki katına büyütür (amortize O(N) ekleme)."""
+        if size <= self._capacity:
+            return
+        cap = max(size, 2 * self._capacity, 8)
+        old = self._capacity
+        for name in self._PAIR_ARRAYS:
+            buf = self._buffers[name]
+            grown = np.zeros((cap, cap), dtype=buf.dtype)
+            grown[:old, :old] = buf[:old, :old]
+            self._buffers[name] = grown
+        self._capacity = cap
+        self.crossing.reserve(cap)
+
+    def _update_edges(self, i: int) -> None:
+        """i düğümüne giren ve çıkan kenarların mesafe, maliyet, kapasite ve enerji değerlerini yeniden hesaplar."""
+        n = len(self.store)
+        delta = self.positions - self.positions[i]
+        d = np.hypot(delta[:, 0], delta[:, 1])
+        dist, cost, mask, energy = (self._buffers[name] for name in self._PAIR_ARRAYS)
+        dist[i, :n] = d
+        dist[:n, i] = d
+        energy[i, :n] = compute_energy(d, self.weights, 1.0)
+        energy[:n, i] = compute_energy(d, self.weights[i], 1.0)
+        cost[i, :n] = d * self.weights + self.priority_penalty
+        cost[:n, i] = d * self.weights[i] + self.priority_penalty[i]
+        mask[i, :n] = self.is_delivery & (self.weights <= self.max_weights[i])
+        mask[:n, i] = self.is_delivery[i] & (self.weights[i] <= self.max_weights)
+        mask[i, i] = False
+        self.crossing.reset_node(i)
+
+    def _move_pairs(self, src: int, dst: int) -> None:
+        """src düğümünün çift dizisi satır/sütunlarını dst indeksine taşır (silmede son düğümle yer değiştirme)."""
+        n = len(self.store)
+        for name in self._PAIR_ARRAYS:
+            buf = self._buffers[name]
+            buf[dst, :n] = buf[src, :n]
+            buf[:n, dst] = buf[:n, src]
+        self.crossing.move_node(src, dst, n)
+
+    def _update_earliest_start(self) -> None:
+        self.earliest_start = float(self.window_start[self.is_delivery].min()) if self.is_delivery.any() else 0.0
+
+    def _update_priority_scale(self) -> None:
+        """Maksimum öncelik değiştiyse öncelik cezası ve maliyet matrisi baştan hesaplanır (nadir, O(N^2))."""
         max_priority = max((dp.priority for dp in self.deliveries), default=5)
-        for src_key, src_node in self.nodes.items():
-            self.adjacency[src_key] = []
-            for dst_key, dst_node in self.nodes.items():
-                if src_key == dst_key:
-                    continue
-                # Hedef mutlaka teslimat noktası olmalı
-                if not isinstance(dst_node, DeliveryPoint):
-                    continue
-                # Drone'dan teslimata: ağırlık kapasitesi kontrolü
-                if isinstance(src_node, Drone) and dst_node.weight > src_node.max_weight:
-                    continue
-                # Teslimat düğümünden teslimat düğümüne: önceki paket teslim edildiği için kapasite kontrolü yok
-                cost = self._compute_cost(src_node, dst_node, max_priority)
-                self.adjacency[src_key].append((dst_key, cost))
+        if max_priority == self.max_priority:
+            return
+        self.max_priority = max_priority
+        self.priority_penalty[:] = np.where(self.is_delivery, (max_priority - self.priorities) * 100, 0.0)
+        self.cost_matrix[:] = self.dist_matrix * self.weights + self.priority_penalty
+
+    def add_delivery(self, dp: DeliveryPoint) -> None:
+        """Yeni teslimat noktasını ekler; yalnızca yeni düğümün satır ve sütunu hesaplanır."""
+        if dp.id in self.store.delivery_index:
+            raise ValueError(f"Teslimat {dp.id} zaten mevcut")
+        self._reserve(len(self.store) + 1)
+        i = self.store.append(dp)
+        self.deliveries.append(dp)
+        self._refresh_views()
+        self.priority_penalty[i] = (self.max_priority - dp.priority) * 100
+        self._update_edges(i)
+        self._update_priority_scale()
+        self._update_earliest_start()
+        self.version += 1
+
+    def remove_delivery(self, dp_id: int) -> None:
+        """Teslimat noktasını siler; son düğüm boşalan indekse taşınır."""
+        i = self.delivery_idx(dp_id)
+        dp = self.store.objects[i]
+        self.deliveries[:] = [d for d in self.deliveries if d is not dp]
+        last = len(self.store) - 1
+        if i != last:
+            self._move_pairs(last, i)
+        self.store.remove(i)
+        self._refresh_views()
+        self._update_priority_scale()
+        self._update_earliest_start()
+        self.tsptw_cache.invalidate(lambda key: dp_id in key[3])
+        self.version += 1
+
+    def update_drone_position(self, drone_id: int, pos: Tuple[float, float]) -> None:
+        """Drone başlangıç konumunu günceller; yalnızca drone düğümünün kenarları yeniden hesaplanır."""
+        i = self.drone_idx(drone_id)
+        dr = self.store.objects[i]
+        dr.start_pos = (float(pos[0]), float(pos[1]))  # type: ignore
+        self.positions[i] = dr.start_pos  # type: ignore
+        self._update_edges(i)
+        self.tsptw_cache.invalidate(lambda key: key[0] == drone_id)
+        self.version += 1
+
+    def add_zone(self, zone: NoFlyZone) -> None:
+        """No-fly zone ekler; kesişim matrisinde yalnızca yeni bölgenin biti tembel hesaplanır."""
+        if any(z.id == zone.id for z in self._no_fly_zones):
+            raise ValueError(f"No-fly zone {zone.id} zaten mevcut")
+        self.no_fly_zones = self._no_fly_zones + [zone]
+
+    def remove_zone(self, zone_id: int) -> None:
+        """No-fly zone siler; diğer bölgelerin önbelleğe alınmış kesişimleri korunur."""
+        zones = [z for z in self._no_fly_zones if z.id != zone_id]
+        if len(zones) == len(self._no_fly_zones):
+            raise ValueError(f"No-fly zone {zone_id} bulunamadı")
+        self.no_fly_zones = zones
 
     def _compute_cost(self,
                       src_node: Drone or DeliveryPoint,
@@ -74,9 +295,8 @@ class Graph:
 
     @staticmethod
     def _time_to_min(t_str: str) -> float:
-        """Zaman string'ini (HH:MM) dakika cinsinden dönüştürür."""
-        h, m = map(int, t_str.split(':'))
-        return h * 60 + m
+        """Zaman string'ini (HH:MM) dakika cinsinden dönüştürür; modeller zaten dakika taşır."""
+        return parse_time(t_str)
 
     def _point_in_polygon(self, point: Tuple[float, float], polygon: List[Tuple[float, float]]) -> bool:
         """
@@ -130,179 +350,294 @@ class Graph:
                 return True
         return False
 
-    def heuristic(self, node_key: str, goal_key: str) -> float:
+    def heuristic(self, node_key: str, goal_key: str,
+                  depart_time: Optional[float] = None, speed: Optional[float] = None) -> float:
         """
         A* tahmin fonksiyonu: mesafe + no-fly zone cezası.
+        depart_time (dakika) verilirse yalnızca segmentin uçuş aralığında aktif olan bölgeler cezalandırılır.
+        speed verilmezse drone düğümünün hızı, teslimat düğümünde en yavaş drone hızı kullanılır.
         """
-        node = self.nodes[node_key]
-        goal = self.nodes[goal_key]
-        src_pos = node.start_pos if isinstance(node, Drone) else node.pos  # type: ignore
-        dst_pos = goal.pos
-        h = self._distance(src_pos, dst_pos)
-        # No-fly cezası
-        for zone in self.no_fly_zones:
-            if self._segment_crosses_polygon(src_pos, dst_pos, zone.coordinates):
-                h += self.NO_FLY_PENALTY
+        i, j = self.store.index(node_key), self.store.index(goal_key)
+        if depart_time is None:
+            return self._heuristic_idx(i, j)
+        if speed is None:
+            speed = self.speeds[i] if not self.is_delivery[i] else np.nanmin(self.speeds)
+        arrive = depart_time + self.dist_matrix[i, j] / speed / 60
+        return float(self._heuristic_many(np.array([i]), j, np.array([depart_time]), np.array([arrive]))[0])
+
+    def _heuristic_idx(self, i: int, j: int) -> float:
+        """heuristic'in düğüm indeksleriyle, zamandan bağımsız çalışan hali."""
+        h = float(self.dist_matrix[i, j])
+        # No-fly cezası: kesilen bölge sayısı kesişim matrisinden okunur
+        h += self.NO_FLY_PENALTY * self.crossing.crossing_bits(i, j).bit_count()
         return h
 
+    def _heuristic_many(self, rows: np.ndarray, j: int,
+                        t_depart: Optional[np.ndarray] = None,
+                        t_arrive: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        rows düğümlerinden j hedefine heuristic değerleri (vektörel).
+        Zamanlar verilirse bir bölge yalnızca [t_depart, t_arrive] aktif penceresiyle çakışıyorsa sayılır;
+        aday bölgeler aralık ağacından tüm satırların ortak zaman diliminde aktif olanlarla sınırlanır.
+        """
+        h = self.dist_matrix[rows, j]
+        if t_depart is None:
+            return h + self.NO_FLY_PENALTY * self.crossing.crossing_counts(rows, j)
+        if len(rows) == 0 or not self._no_fly_zones:
+            return h
+        found = np.array(self.zone_windows.query(float(t_depart.min()), float(t_arrive.max())), dtype=np.int64)
+        if len(found) == 0:
+            return h
+        # Aralık -> bölge: bir bölge aralıklarından herhangi biri satırın zamanıyla çakışıyorsa bir kez sayılır
+        active, owner = np.unique(self.zone_interval_zone[found], return_inverse=True)
+        overlap = ((self.zone_interval_start[found] <= t_arrive[:, np.newaxis])
+                   & (self.zone_interval_end[found] >= t_depart[:, np.newaxis]))
+        timed = np.zeros((len(active), len(rows)), dtype=bool)
+        np.logical_or.at(timed, owner, overlap.T)
+        hits = self.crossing.zone_hits(rows, j, active) & timed.T
+        return h + self.NO_FLY_PENALTY * hits.sum(axis=1)
+
     def find_path(self, start_key: str, goal_key: str) -> Tuple[List[str], float]:
         """
         A* ile en kısa maliyetli yolu bulur.
+        Varışta penceresi kapanmış ya da drone bataryasını aşan kenarlar genişletilmez.
         """
+        if not start_key.startswith("drone_"):
+            raise ValueError("find_path başlangıcı bir drone düğümü olmalı")
+        path, cost = self._find_path_idx(self.store.index(start_key), self.store.index(goal_key))
+        return [self.store.key(i) for i in path], cost
+
+    def _find_path_idx(self, start: int, goal: int) -> Tuple[List[int], float]:
+        """find_path'in düğüm indeksleriyle çalışan çekirdeği."""
         import heapq
-        from collections import defaultdict
 
-        # Zaman penceresi entegrasyonu için başlangıç zamanı
-        earliest_start = min(self._time_to_min(dp.time_window[0]) for dp in self.deliveries)
-        g_time = defaultdict(lambda: float('inf'))
-        g_time[start_key] = earliest_start
         # Drone hızını al
-        if start_key.startswith("drone_"):
-            dr_id = int(start_key.split("_")[1])
-            drone_speed = next(d.speed for d in self.drones if d.id == dr_id)
-        else:
-            raise ValueError("find_path başlangıcı bir drone düğümü olmalı")
+        drone_speed = self.speeds[start]
+        battery = self.battery_wh[start]
+        n = len(self.store)
+        # Zaman penceresi entegrasyonu için başlangıç zamanı
+        g_time = np.full(n, np.inf)
+        g_time[start] = self.earliest_start
+        # Yol boyunca harcanan enerji (Wh); batarya kapasitesini aşan kenarlar budanır
+        g_energy = np.full(n, np.inf)
+        g_energy[start] = 0.0
 
         open_set = []
-        g_score = defaultdict(lambda: float('inf'))
+        g_score = np.full(n, np.inf)
         came_from = {}
-        g_score[start_key] = 0
-        f_score = {start_key: self.heuristic(start_key, goal_key)}
-        heapq.heappush(open_set, (f_score[start_key], start_key))
+        g_score[start] = 0
+        t0 = np.array([self.earliest_start])
+        h0 = self._heuristic_many(np.array([start]), goal, t0, t0 + self.dist_matrix[start, goal] / drone_speed / 60)
+        heapq.heappush(open_set, (float(h0[0]), start))
 
         closed_set = set()
 
         while open_set:
             _, current = heapq.heappop(open_set)
-            if current == goal_key:
+            if current == goal:
                 # Yolun yeniden oluşturulması
                 path = []
                 node = current
                 while node in came_from:
                     path.append(node)
                     node = came_from[node]
-                path.append(start_key)
-                return path[::-1], g_score[current]
+                path.append(start)
+                return path[::-1], float(g_score[current])
             if current in closed_set:
                 continue
             closed_set.add(current)
 
-            for neighbor, cost in self.adjacency[current]:
-                # maliyet
-                tentative_g = g_score[current] + cost
-                # zaman ve konum hesaplama
-                src_node = self.nodes[current]
-                dst_node = self.nodes[neighbor]
-                src_pos = src_node.start_pos if isinstance(src_node, Drone) else src_node.pos  # type: ignore
-                dst_pos = dst_node.pos
-                # seyahat süresi (dakika cinsinden)
-                travel_time = (self._distance(src_pos, dst_pos) / drone_speed) / 60
-                arrival_time = g_time[current] + travel_time
-                # zaman penceresi kontrolü
-                if isinstance(dst_node, DeliveryPoint):
-                    ws = self._time_to_min(dst_node.time_window[0])
-                    we = self._time_to_min(dst_node.time_window[1])
-                    if arrival_time > we:
-                        continue
-                    if arrival_time < ws:
-                        arrival_time = ws
-                # güncelleme
-                if tentative_g < g_score[neighbor]:
-                    came_from[neighbor] = current
-                    g_score[neighbor] = tentative_g
-                    g_time[neighbor] = arrival_time
-                    f = tentative_g + self.heuristic(neighbor, goal_key)
-                    heapq.heappush(open_set, (f, neighbor))
+            neighbors = np.flatnonzero(self.capacity_mask[current])
+            # maliyet
+            tentative_g = g_score[current] + self.cost_matrix[current, neighbors]
+            # seyahat süresi (dakika cinsinden)
+            arrival_time = g_time[current] + (self.dist_matrix[current, neighbors] / drone_speed) / 60
+            energy = g_energy[current] + self.energy_matrix[current, neighbors] / drone_speed
+            # zaman penceresi kontrolü: hedefler her zaman teslimat noktasıdır
+            ok = arrival_time <= self.window_end[neighbors]
+            ok &= energy <= battery
+            ok &= tentative_g < g_score[neighbors]
+            arrival_time = np.maximum(arrival_time, self.window_start[neighbors])
+            # güncelleme
+            neighbors, tentative_g, arrival_time = neighbors[ok], tentative_g[ok], arrival_time[ok]
+            g_score[neighbors] = tentative_g
+            g_time[neighbors] = arrival_time
+            g_energy[neighbors] = energy[ok]
+            # neighbor -> goal segmenti, komşudan ayrılış anından itibaren uçulur
+            t_arrive = arrival_time + (self.dist_matrix[neighbors, goal] / drone_speed) / 60
+            f = tentative_g + self._heuristic_many(neighbors, goal, arrival_time, t_arrive)
+            for neighbor, f_val in zip(neighbors.tolist(), f.tolist()):
+                came_from[neighbor] = current
+                heapq.heappush(open_set, (f_val, neighbor))
 
         return [], float('inf')
 
-    def solve_tsp_tw_for_drone(self, drone_id: int, dp_ids: List[int]) -> Tuple[List[int], float, float]:
+    def search_from(self, start_key: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Drone başlangıcından tüm düğümlere zaman penceresi duyarlı etiket-yerleştirme (Dijkstra) araması.
+        find_path ile aynı kenar maliyeti, pencere ve batarya kurallarını kullanır, ancak tek aramada tüm hedefleri çözer.
+        Heuristic'siz A* ile aynı maliyetleri verir; find_path'in mesafe + no-fly cezası tahmini kabul edilebilir
+        (alt sınır) olmadığından onun maliyetleri bunlardan büyük olabilir, küçük olamaz.
+        Geri döner (düğüm indeksine göre): g_score (ulaşılamazsa inf), varış zamanı (dakika), önceki düğüm (-1).
+        """
+        if not start_key.startswith("drone_"):
+            raise ValueError("search_from başlangıcı bir drone düğümü olmalı")
+        return self._search_from_idx(self.store.index(start_key))
+
+    def _search_from_idx(self, start: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        search_from'un düğüm indeksleriyle çalışan çekirdeği. Sıradaki düğüm find_path'teki gibi ikili yığından
+        alınır (eşit maliyette küçük indeks önce); komşular yoğun matris satırından vektörel güncellenir.
+        """
+        import heapq
+
+        drone_speed = self.speeds[start]
+        battery = self.battery_wh[start]
+        n = len(self.store)
+        g_score = np.full(n, np.inf)
+        g_time = np.full(n, np.inf)
+        g_energy = np.full(n, np.inf)
+        came_from = np.full(n, -1, dtype=np.int64)
+        done = np.zeros(n, dtype=bool)
+        g_score[start] = 0.0
+        g_time[start] = self.earliest_start
+        g_energy[start] = 0.0
+        open_set = [(0.0, start)]
+        while open_set:
+            cost, current = heapq.heappop(open_set)
+            if done[current] or cost > g_score[current]:
+                continue
+            done[current] = True
+            neighbors = np.flatnonzero(self.capacity_mask[current] & ~done)
+            tentative_g = g_score[current] + self.cost_matrix[current, neighbors]
+            arrival_time = g_time[current] + (self.dist_matrix[current, neighbors] / drone_speed) / 60
+            energy = g_energy[current] + self.energy_matrix[current, neighbors] / drone_speed
+            ok = (arrival_time <= self.window_end[neighbors]) & (tentative_g < g_score[neighbors])
+            ok &= energy <= battery
+            neighbors = neighbors[ok]
+            g_score[neighbors] = tentative_g[ok]
+            g_time[neighbors] = np.maximum(arrival_time[ok], self.window_start[neighbors])
+            g_energy[neighbors] = energy[ok]
+            came_from[neighbors] = current
+            for neighbor, g in zip(neighbors.tolist(), tentative_g[ok].tolist()):
+                heapq.heappush(open_set, (g, neighbor))
+        return g_score, g_time, came_from
+
+    def extract_path(self, came_from: np.ndarray, goal_key: str) -> List[str]:
+        """search_from çıktısından başlangıçtan goal_key'e düğüm yolunu kurar; yol yoksa boş liste."""
+        node = self.store.index(goal_key)
+        path = []
+        while node != -1:
+            path.append(self.store.key(node))
+            node = int(came_from[node])
+        return path[::-1] if len(path) > 1 else []
+
+    def reachable_deliveries(self, drone_id: int) -> Dict[int, float]:
+        """
+        Drone'dan ulaşılabilen tüm teslimatlar ve yol maliyetleri: {delivery_id: cost}.
+        Teslimat başına A* yerine tek bir search_from çağrısı kullanır.
+        """
+        g_score, _, _ = self._search_from_idx(self.drone_idx(drone_id))
+        reach = np.flatnonzero(self.is_delivery & np.isfinite(g_score))
+        return dict(zip(self.node_ids[reach].tolist(), g_score[reach].tolist()))
+
+    def edge_energy(self, drone_id: int) -> np.ndarray:
+        """Drone için (N, N) kenar enerjisi matrisi (Wh): i -> j uçuşu, j'nin yüküyle, drone hızında."""
+        return self.energy_matrix / self.speeds[self.drone_idx(drone_id)]
+
+    def solve_tsp_tw_for_drone(self, drone_id: int, dp_ids: List[int], **options) -> Tuple[List[int], float, float]:
         """
         Verilen drone ve teslimat ID'leri için TSPTW çözer.
         Geri döner: sıralı teslimat ID listesi, toplam seyahat süresi (dakika), toplam bekleme süresi (dakika).
+        Çözüm yok ise ([], inf, inf). Hangi çözücünün kullanıldığı için solve_tsptw'ye bakınız.
+        """
+        return self.solve_tsptw(drone_id, dp_ids, **options).as_tuple()
+
+    def solve_tsptw(self, drone_id: int, dp_ids: List[int],
+                    exact_max_stops: int = tsptw.EXACT_MAX_STOPS,
+                    memory_limit: int = tsptw.MEMORY_LIMIT_BYTES,
+                    time_budget: float = tsptw.TIME_BUDGET_S) -> tsptw.TSPTWResult:
         """
-        n = len(dp_ids)
-        if n == 0:
-            return [], 0.0, 0.0
-        # Başlangıç düğümü
-        start_key = f"drone_{drone_id}"
-        if start_key not in self.nodes:
-            raise ValueError(f"Drone {drone_id} bulunamadı")
-        start_node = self.nodes[start_key]  # type: ignore
-        start_pos = start_node.start_pos
+        solve_tsp_tw_for_drone'un ayrıntılı hali: sonuçta kullanılan mod ("exact" / "heuristic")
+        ve çözücü istatistikleri de döner. Sıra teslimat ID'leri cinsindendir.
+        Sonuçlar tsptw_cache'te tutulur; teslimat silme ve drone konumu değişiklikleri ilgili girdileri
+        geçersiz kılar (çözücü bölgeleri kullanmadığından bölge değişiklikleri önbelleği etkilemez).
+        exact_max_stops: kesin DP için azami durak sayısı, üzerinde ekleme + yerel arama kullanılır
+        memory_limit: DP tablolarının azami boyutu (bayt); aşılırsa sezgisel çözücüye düşülür
+        time_budget: sezgisel yerel aramanın süre bütçesi (s)
+        """
+        if not dp_ids:
+            return tsptw.TSPTWResult([], 0.0, 0.0, "exact")
+        options = {"exact_max_stops": exact_max_stops, "memory_limit": memory_limit, "time_budget": time_budget}
+        key = self._tsptw_key(drone_id, dp_ids, options)
+        cached = self.tsptw_cache.get(key)
+        if cached is not None:
+            return dataclasses.replace(cached, sequence=list(cached.sequence), stats=dict(cached.stats))
+        result = tsptw.solve_task(self._tsptw_snapshot(drone_id, dp_ids, options))
+        return self._store_tsptw(key, dp_ids, result)
+
+    def solve_fleet_tsptw(self, assignment: Dict[int, List[int]],
+                          max_workers: Optional[int] = None,
+                          exact_max_stops: int = tsptw.EXACT_MAX_STOPS,
+                          memory_limit: int = tsptw.MEMORY_LIMIT_BYTES,
+                          time_budget: float = tsptw.TIME_BUDGET_S) -> Dict[int, tsptw.TSPTWResult]:
+        """
+        Filo için TSPTW: assignment {drone_id: [dp_id, ...]} -> {drone_id: TSPTWResult}.
+        Önbellekte olmayan drone problemleri bir süreç havuzuna dağıtılır; işçilere Graph yerine
+        yalnızca (seyahat alt matrisi, pencereler, başlangıç zamanı) anlık görüntüsü gönderilir.
+        max_workers: havuz boyutu (varsayılan CPU sayısı); 1 ise süreç havuzu kullanılmaz.
+        """
+        options = {"exact_max_stops": exact_max_stops, "memory_limit": memory_limit, "time_budget": time_budget}
+        results: Dict[int, tsptw.TSPTWResult] = {}
+        pending: List[Tuple[int, List[int], tuple]] = []
+        tasks = []
+        for drone_id, dp_ids in assignment.items():
+            if not dp_ids:
+                results[drone_id] = tsptw.TSPTWResult([], 0.0, 0.0, "exact")
+                continue
+            key = self._tsptw_key(drone_id, dp_ids, options)
+            cached = self.tsptw_cache.get(key)
+            if cached is not None:
+                results[drone_id] = dataclasses.replace(cached, sequence=list(cached.sequence),
+                                                        stats=dict(cached.stats))
+                continue
+            pending.append((drone_id, list(dp_ids), key))
+            tasks.append(self._tsptw_snapshot(drone_id, dp_ids, options))
+        workers = min(max_workers or os.cpu_count() or 1, len(tasks))
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                solved = list(pool.map(tsptw.solve_task, tasks))
+        else:
+            solved = [tsptw.solve_task(task) for task in tasks]
+        for (drone_id, dp_ids, key), result in zip(pending, solved):
+            results[drone_id] = self._store_tsptw(key, dp_ids, result)
+        return {drone_id: results[drone_id] for drone_id in assignment}
+
+    def _tsptw_key(self, drone_id: int, dp_ids: List[int], options: dict) -> tuple:
+        """TSPTW önbellek anahtarı: (drone, başlangıç konumu, hız, teslimat kümesi, ayarlar, batarya)."""
+        i = self.drone_idx(drone_id)
+        return (drone_id, tuple(self.positions[i].tolist()), float(self.speeds[i]),
+                frozenset(dp_ids), tuple(options.values()), float(self.battery_wh[i]))
+
+    def _tsptw_snapshot(self, drone_id: int, dp_ids: List[int], options: dict) -> tuple:
+        """
+        Çözücü girdisi: (seyahat süresi matrisi, ws, we, başlangıç zamanı, ayarlar); 0=start, 1..n=dp.
+        Ayarlara kenar enerjisi alt matrisi ve drone batarya kapasitesi eklenir.
+        """
+        idx = [self.drone_idx(drone_id)] + [self.delivery_idx(i) for i in dp_ids]
+        # Zaman pencereleri
+        ws = self.window_start[idx[1:]]
+        we = self.window_end[idx[1:]]
         # Erken başlangıç zamanı
-        earliest_start = min(self._time_to_min(self.nodes[f"dp_{i}"].time_window[0]) for i in dp_ids)
-        # Koordinatlar: 0=start, 1..n=dp
-        coords = [start_pos] + [self.nodes[f"dp_{i}"].pos for i in dp_ids]
-        # Drone hızı
-        speed = next(d.speed for d in self.drones if d.id == drone_id)
+        earliest_start = float(ws.min())
         # Seyahat süresi matrisi (dakika)
-        travel_time = [[0.0]*(n+1) for _ in range(n+1)]
-        for u in range(n+1):
-            for v in range(n+1):
-                if u == v: continue
-                dist = self._distance(coords[u], coords[v])
-                travel_time[u][v] = dist / speed / 60
-        # Zaman pencereleri
-        ws = [self._time_to_min(self.nodes[f"dp_{i}"].time_window[0]) for i in dp_ids]
-        we = [self._time_to_min(self.nodes[f"dp_{i}"].time_window[1]) for i in dp_ids]
-        # DP tabloları
-        dp_table = [dict() for _ in range(1<<n)]
-        parent = [dict() for _ in range(1<<n)]
-        # Başlangıç durumları
-        for j in range(n):
-            t0 = earliest_start + travel_time[0][j+1]
-            if t0 > we[j]: continue
-            arrival = max(t0, ws[j])
-            mask = 1<<j
-            dp_table[mask][j] = arrival
-            parent[mask][j] = -1
-        # DP iterasyonu
-        for mask in range(1<<n):
-            for j, arr_time in dp_table[mask].items():
-                if not (mask & (1<<j)): continue
-                for k in range(n):
-                    if mask & (1<<k): continue
-                    arr = arr_time + travel_time[j+1][k+1]
-                    if arr > we[k]: continue
-                    arr_w = max(arr, ws[k])
-                    new_mask = mask | (1<<k)
-                    if arr_w < dp_table[new_mask].get(k, float('inf')):
-                        dp_table[new_mask][k] = arr_w
-                        parent[new_mask][k] = j
-        full_mask = (1<<n) - 1
-        # En iyi son düğüm
-        best_j, best_t = None, float('inf')
-        for j, t in dp_table[full_mask].items():
-            if t < best_t:
-                best_t = t
-                best_j = j
-        if best_j is None:
-            return [], float('inf'), float('inf')
-        # Yolun yeniden oluşturulması
-        seq = []
-        mask, j = full_mask, best_j
-        while j != -1:
-            seq.append(dp_ids[j])
-            prev_j = parent[mask][j]
-            mask ^= (1<<j)
-            j = prev_j
-        seq.reverse()
-        # Toplam seyahat ve bekleme süreleri
-        current = earliest_start
-        total_travel = 0.0
-        total_wait = 0.0
-        prev_pos = start_pos
-        for di in seq:
-            dst = self.nodes[f"dp_{di}"]
-            d = self._distance(prev_pos, dst.pos)
-            tt = d / speed / 60
-            arr = current + tt
-            w_start = self._time_to_min(dst.time_window[0])
-            wait = max(0, w_start - arr)
-            total_wait += wait
-            if arr < w_start: arr = w_start
-            total_travel += tt
-            current = arr
-            prev_pos = dst.pos
-        return seq, total_travel, total_wait 
\ No newline at end of file
+        travel_time = self.dist_matrix[np.ix_(idx, idx)] / self.speeds[idx[0]] / 60
+        energy = self.energy_matrix[np.ix_(idx, idx)] / self.speeds[idx[0]]
+        options = dict(options, energy=energy, battery=float(self.battery_wh[idx[0]]))
+        return travel_time, ws, we, earliest_start, options
+
+    def _store_tsptw(self, key: tuple, dp_ids: List[int], result: tsptw.TSPTWResult) -> tsptw.TSPTWResult:
+        """Durak indekslerini teslimat ID'lerine çevirir ve sonucu önbelleğe yazar."""
+        result.sequence = [dp_ids[k] for k in result.sequence]
+        self.tsptw_cache.put(key, dataclasses.replace(result, sequence=list(result.sequence)))
+        return result
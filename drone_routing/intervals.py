@@ -0,0 +1,85 @@
+from typing import Generic, List, Optional, Tuple, TypeVar
+
+# Zaman aralıkları için statik merkezli aralık ağacı (centered interval tree)
+
+T = TypeVar("T")
+
+
+class _Node(Generic[T]):
+    __slots__ = ("center", "by_start", "by_end", "left", "right")
+
+    def __init__(self, center: float,
+                 by_start: List[Tuple[float, float, T]],
+                 by_end: List[Tuple[float, float, T]]):
+        self.center = center
+        self.by_start = by_start  # başlangıca göre artan
+        self.by_end = by_end      # bitişe göre azalan
+        self.left: Optional["_Node[T]"] = None
+        self.right: Optional["_Node[T]"] = None
+
+
+class IntervalTree(Generic[T]):
+    """
+    Kapalı [start, end] aralıklarını saklar; bir sorgu aralığıyla çakışanları
+    O(log n + k) sürede döner. Aralık listesi değiştiğinde ağaç yeniden kurulur.
+    start > end olan aralıkta ValueError (gece yarısını aşan pencereler önceden bölünmelidir, bkz. models.split_window).
+    """
+    def __init__(self, intervals: List[Tuple[float, float, T]]):
+        for start, end, _ in intervals:
+            if start > end:
+                raise ValueError(f"Geçersiz aralık: [{start}, {end}] (başlangıç bitişten büyük)")
+        self.size = len(intervals)
+        self.root = self._build(list(intervals))
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _build(self, intervals: List[Tuple[float, float, T]]) -> Optional[_Node[T]]:
+        if not intervals:
+            return None
+        points = sorted(p for iv in intervals for p in iv[:2])
+        center = points[len(points) // 2]
+        left, right, here = [], [], []
+        for iv in intervals:
+            if iv[1] < center:
+                left.append(iv)
+            elif iv[0] > center:
+                right.append(iv)
+            else:
+                here.append(iv)
+        node = _Node(center,
+                     sorted(here, key=lambda iv: iv[0]),
+                     sorted(here, key=lambda iv: iv[1], reverse=True))
+        node.left = self._build(left)
+        node.right = self._build(right)
+        return node
+
+    def query(self, lo: float, hi: float) -> List[T]:
+        """[lo, hi] ile çakışan aralıkların yüklerini döner."""
+        found: List[T] = []
+        node = self.root
+        stack = [node] if node is not None else []
+        while stack:
+            node = stack.pop()
+            if hi < node.center:
+                # Merkezi içeren aralıklar yalnızca başlangıçları hi'den küçükse çakışır
+                for start, _, item in node.by_start:
+                    if start > hi:
+                        break
+                    found.append(item)
+                if node.left is not None:
+                    stack.append(node.left)
+            elif lo > node.center:
+                for _, end, item in node.by_end:
+                    if end < lo:
+                        break
+                    found.append(item)
+                if node.right is not None:
+                    stack.append(node.right)
+            else:
+                found.extend(item for _, _, item in node.by_start)
+                if node.left is not None:
+                    stack.append(node.left)
+                if node.right is not None:
+                    stack.append(node.right)
+        return found
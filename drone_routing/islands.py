@@ -0,0 +1,153 @@
+import math
+import multiprocessing as mp
+import random
+import time
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from .graph import Graph
+from .ga import GeneticAlgorithm
+
+# Ada modeli GA: her ada ayrı süreçte kendi popülasyonunu evrimleştirir,
+# her migration_interval nesilde en iyi bireyler komşu adalara göç eder.
+# Göç ana süreç üzerinden yönlendirilir (yıldız bağlantı, halka / rastgele topoloji).
+
+
+def _island_main(conn, ga: GeneticAlgorithm, seed: int, migrants: int) -> None:
+    """
+    Ada süreci: ("run", nesil sayısı, göçmenler, süre bütçesi) mesajıyla o kadar nesil ilerler (bütçe saniye
+    cinsindendir, None ise sınırsız; aşılınca başlamış nesil tamamlanıp durulur) ve
+    (elitler, en iyi birey, en iyi fitness, nesil sayısı, adanın kendi çalışma süresi) döner; ("stop",) ile çıkar.
+    Göçmenler popülasyonun en kötü bireylerinin yerine konur. Çalışma süresi mesaj beklemeyi içermez.
+    """
+    started = time.perf_counter()
+    random.seed(seed)
+    population = ga.initial_population()
+    fitnesses = ga.evaluate_population(population)
+    best_ind, best_fit = ga._track_best(population, fitnesses, None, float('-inf'))
+    done = 0
+    busy = time.perf_counter() - started
+    while True:
+        msg = conn.recv()
+        if msg[0] == "stop":
+            break
+        started = time.perf_counter()
+        _, generations, immigrants, budget = msg
+        deadline = None if budget is None else started + budget
+        if immigrants:
+            worst = np.argsort(fitnesses)[:len(immigrants)].tolist()
+            incoming = ga.encode(immigrants) if isinstance(population, np.ndarray) else immigrants
+            for slot, ind in zip(worst, incoming):
+                population[slot] = ind
+            fitnesses = ga.evaluate_population(population)
+            best_ind, best_fit = ga._track_best(population, fitnesses, best_ind, best_fit)
+        for _ in range(generations):
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            population = ga.next_generation(population, fitnesses)
+            fitnesses = ga.evaluate_population(population)
+            best_ind, best_fit = ga._track_best(population, fitnesses, best_ind, best_fit)
+            done += 1
+        order = np.argsort(fitnesses)[::-1][:migrants].tolist()
+        elites = [ga.as_dict(population[i]) for i in order]
+        busy += time.perf_counter() - started
+        conn.send((elites, ga.as_dict(best_ind), best_fit, done, busy))
+    conn.close()
+
+
+class IslandModel:
+    """
+    Birden çok GA popülasyonunu ayrı süreçlerde çalıştırır.
+    island_params: ada başına GeneticAlgorithm parametre sözlükleri (ortak ga_params'ı ezer);
+    verilmezse mutasyon oranı adalar arasında 0.1 - 0.4 aralığına yayılır.
+    topology: "ring" (ada i -> i+1) ya da "random" (her göçte rastgele başka bir ada).
+    time_limit: saniye; her göç döneminde adalara kalan süre gönderilir ve adalar nesil aralarında durur
+    (başlamış nesil ve süre dolduktan sonraki göç mesajlaşması tamamlanır, yani sınır nesil düzeyindedir).
+    """
+    def __init__(self,
+                 graph: Graph,
+                 islands: int = 4,
+                 generations: int = 100,
+                 migration_interval: int = 10,
+                 migrants: int = 2,
+                 topology: str = "ring",
+                 island_params: Optional[List[Dict[str, Any]]] = None,
+                 time_limit: Optional[float] = None,
+                 **ga_params):
+        if topology not in ("ring", "random"):
+            raise ValueError(f"Bilinmeyen topoloji: {topology}")
+        if islands < 1 or migration_interval < 1:
+            raise ValueError("islands ve migration_interval pozitif olmalı")
+        self.graph = graph
+        self.islands = islands
+        self.generations = generations
+        self.migration_interval = migration_interval
+        self.migrants = migrants
+        self.topology = topology
+        self.time_limit = time_limit
+        if island_params is None:
+            rates = np.linspace(0.1, 0.4, islands) if islands > 1 else [ga_params.get("mutation_rate", 0.2)]
+            island_params = [{"mutation_rate": float(rate)} for rate in rates]
+        if len(island_params) != islands:
+            raise ValueError("island_params uzunluğu ada sayısına eşit olmalı")
+        self.island_params = [{**ga_params, **params, "workers": 0} for params in island_params]
+
+    def run(self) -> Tuple[Dict[int, List[int]], float, List[Dict[str, Any]]]:
+        """
+        Adaları çalıştırır. Geri döner: (global en iyi birey, fitness, ada istatistikleri).
+        İstatistiklerde elapsed adanın kendi ölçtüğü çalışma süresi, wall_time tüm çalıştırmanın süresidir.
+        Tohumlar random modülünden türetilir; random.seed ile çalıştırma tekrarlanabilir.
+        """
+        seeds = [random.getrandbits(32) for _ in range(self.islands)]
+        route_rng = random.Random(random.getrandbits(32))
+        started = time.perf_counter()
+        procs, conns = [], []
+        for params, seed in zip(self.island_params, seeds):
+            ga = GeneticAlgorithm(self.graph, **params)
+            parent, child = mp.Pipe()
+            proc = mp.Process(target=_island_main, args=(child, ga, seed, self.migrants), daemon=True)
+            proc.start()
+            child.close()
+            procs.append(proc)
+            conns.append(parent)
+        stats = [{"island": i, "seed": seeds[i], "params": self.island_params[i],
+                  "best_fitness": float('-inf'), "generations": 0, "elapsed": 0.0, "history": []}
+                 for i in range(self.islands)]
+        best_ind, best_fit = None, float('-inf')
+        inbox: List[List[Dict[int, List[int]]]] = [[] for _ in range(self.islands)]
+        try:
+            remaining = self.generations
+            for _ in range(math.ceil(self.generations / self.migration_interval)):
+                budget = None
+                if self.time_limit is not None:
+                    budget = self.time_limit - (time.perf_counter() - started)
+                    if budget <= 0:
+                        break
+                step = min(self.migration_interval, remaining)
+                remaining -= step
+                for conn, immigrants in zip(conns, inbox):
+                    conn.send(("run", step, immigrants, budget))
+                inbox = [[] for _ in range(self.islands)]
+                for i, conn in enumerate(conns):
+                    elites, island_best, island_fit, done, busy = conn.recv()
+                    stats[i].update(best_fitness=island_fit, generations=done, elapsed=busy)
+                    stats[i]["history"].append(island_fit)
+                    if island_fit > best_fit:
+                        best_ind, best_fit = island_best, island_fit
+                    if self.islands > 1 and self.migrants > 0:
+                        if self.topology == "ring":
+                            target = (i + 1) % self.islands
+                        else:
+                            target = route_rng.choice([j for j in range(self.islands) if j != i])
+                        inbox[target].extend(elites)
+        finally:
+            for conn in conns:
+                try:
+                    conn.send(("stop",))
+                except (BrokenPipeError, OSError):
+                    pass
+            for proc in procs:
+                proc.join(timeout=5)
+        wall_time = time.perf_counter() - started
+        for s in stats:
+            s["wall_time"] = wall_time
+        return best_ind, best_fit, stats
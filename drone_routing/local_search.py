@@ -0,0 +1,341 @@
+from collections import deque
+from typing import Deque, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from .graph import Graph
+
+# Rota iyileştirme motoru: 2-opt, Or-opt, rotalar arası relocate / swap.
+#  - Hamle maliyetleri yalnızca değişen kenarlardan O(1) hesaplanır (amaç: toplam mesafe)
+#  - Adaylar her düğümün k en yakın teslimat komşusundan üretilir
+#  - Don't-look bitleri: iyileşme bulunamayan düğümler, rotaları değişene kadar atlanır
+#  - Zaman penceresi kontrolü: ileri bolluk (forward slack) ile, rotayı baştan simüle etmeden
+#  - Batarya kontrolü: rota enerjisi tutulur, hamlenin değiştirdiği kenarların enerji farkıyla karşılaştırılır
+
+
+class _Route:
+    """Tek drone rotası: düğüm indeksleri, varış / hizmet başlangıç zamanları, ileri bolluk ve enerji."""
+    __slots__ = ("key", "drone", "speed", "max_weight", "battery", "nodes", "arrival", "begin", "slack", "energy")
+
+    def __init__(self, key: int, drone: int, speed: float, max_weight: float, battery: float, nodes: List[int]):
+        self.key = key
+        self.drone = drone
+        self.speed = speed
+        self.max_weight = max_weight
+        self.battery = battery
+        self.nodes = nodes
+        self.arrival: List[float] = []
+        self.begin: List[float] = []
+        self.slack: List[float] = []
+        self.energy = 0.0
+
+
+class LocalSearch:
+    """
+    Drone rotalarını {drone_id: [delivery_id, ...]} biçiminde alır ve iyileştirir.
+    Zaman penceresi olurlu bir rota olursuz hale getirilmez; ağırlık kapasitesi aşan rotalar arası hamle yapılmaz.
+    Rota enerjisini bataryanın üzerine çıkaran (ya da zaten aşılmışsa artıran) hamle yapılmaz.
+    Rotalar start_time'da (varsayılan: graph.earliest_start) drone başlangıcından çıkar.
+    """
+    EPS = 1e-9
+
+    def __init__(self, graph: Graph, k_neighbors: int = 8, start_time: Optional[float] = None,
+                 max_moves: int = 100_000):
+        self.dist = graph.dist_matrix
+        # 1 m/s kenar enerjisi (Wh); rota hızına bölünerek kullanılır
+        self.energy = graph.energy_matrix
+        self.battery = graph.battery_wh.tolist()
+        self.window_start = graph.window_start.tolist()
+        self.window_end = graph.window_end.tolist()
+        self.weights = graph.weights.tolist()
+        self.max_weights = graph.max_weights.tolist()
+        self.speeds = graph.speeds.tolist()
+        self.drone_nodes = dict(graph.store.drone_index)
+        self.delivery_nodes = dict(graph.store.delivery_index)
+        self.node_ids = graph.node_ids.tolist()
+        self.start_time = graph.earliest_start if start_time is None else start_time
+        self.max_moves = max_moves
+        # Her düğüm için k en yakın teslimat düğümü (yakından uzağa)
+        dp_nodes = np.flatnonzero(graph.is_delivery)
+        k = min(k_neighbors, max(len(dp_nodes) - 1, 0))
+        self.neighbors: List[List[int]] = [[] for _ in range(len(self.node_ids))]
+        if k > 0:
+            d = self.dist[:, dp_nodes].copy()
+            d[dp_nodes, np.arange(len(dp_nodes))] = np.inf
+            part = np.argpartition(d, k - 1, axis=1)[:, :k]
+            order = np.take_along_axis(d, part, axis=1).argsort(axis=1)
+            self.neighbors = dp_nodes[np.take_along_axis(part, order, axis=1)].tolist()
+        self.stats = {"2opt": 0, "or_opt": 0, "relocate": 0, "swap": 0}
+
+    # --- dış API ---
+
+    def improve(self, routes: Dict[int, List[int]], inter_route: bool = True) -> Dict[int, List[int]]:
+        """Rotaları iyileştirir; inter_route=False ise yalnızca rota içi hamleler (2-opt, Or-opt) yapılır."""
+        self._routes: Dict[int, _Route] = {}
+        self._where: Dict[int, Tuple[int, int]] = {}
+        for drone_id, route in routes.items():
+            drone = self.drone_nodes[drone_id]
+            r = _Route(drone_id, drone, self.speeds[drone], self.max_weights[drone], self.battery[drone],
+                       [self.delivery_nodes[dp_id] for dp_id in route])
+            self._routes[drone_id] = r
+            self._refresh(r)
+        self._inter = inter_route
+        # Rota içi modda tek düğümlü rotalarda hamle yoktur
+        queue: Deque[int] = deque(n for r in self._routes.values() if inter_route or len(r.nodes) > 1
+                                  for n in r.nodes)
+        queued = set(queue)
+        moves = 0
+        while queue and moves < self.max_moves:
+            u = queue.popleft()
+            queued.discard(u)
+            if u not in self._where:
+                continue
+            changed = self._try_moves(u)
+            if not changed:
+                continue  # don't-look biti: rotası değişene kadar kuyruğa girmez
+            moves += 1
+            for key in changed:
+                for n in self._routes[key].nodes:
+                    if n not in queued:
+                        queued.add(n)
+                        queue.append(n)
+        return {key: [self.node_ids[n] for n in r.nodes] for key, r in self._routes.items()}
+
+    def improve_route(self, drone_id: int, route: List[int]) -> List[int]:
+        """Tek rotayı (ör. TSPTW çıktısı) rota içi hamlelerle iyileştirir."""
+        return self.improve({drone_id: route}, inter_route=False)[drone_id]
+
+    # --- rota durumu ---
+
+    def _travel(self, r: _Route, a: int, b: int) -> float:
+        return self.dist[a, b] / r.speed / 60
+
+    def _refresh(self, r: _Route) -> None:
+        """Zamanları, ileri bolluğu ve rota enerjisini yeniden hesaplar (O(len)).
+        slack[i]: i'ye varışın, rotanın kalanında pencere ihlali olmadan gecikebileceği azami süre."""
+        ws, we = self.window_start, self.window_end
+        prev, time = r.drone, self.start_time
+        r.arrival, r.begin = [], []
+        path = [r.drone] + r.nodes
+        r.energy = float(self.energy[path[:-1], path[1:]].sum()) / r.speed
+        for pos, n in enumerate(r.nodes):
+            arr = time + self._travel(r, prev, n)
+            time = max(arr, ws[n])
+            r.arrival.append(arr)
+            r.begin.append(time)
+            self._where[n] = (r.key, pos)
+            prev = n
+        slack = [0.0] * len(r.nodes)
+        nxt = float('inf')
+        for i in range(len(r.nodes) - 1, -1, -1):
+            nxt = (r.begin[i] - r.arrival[i]) + min(we[r.nodes[i]] - r.begin[i], nxt)
+            slack[i] = nxt
+        r.slack = slack
+
+    def _depart(self, r: _Route, pos: int) -> Tuple[int, float]:
+        """pos konumundaki düğüm (pos = -1: drone başlangıcı) ve ayrılış zamanı."""
+        if pos < 0:
+            return r.drone, self.start_time
+        return r.nodes[pos], r.begin[pos]
+
+    def _fits(self, r: _Route, pred: int, seq: Sequence[int], succ: int) -> bool:
+        """
+        seq düğümleri pred konumundaki düğümden sonra, succ konumundaki düğümden önce ziyaret edilirse olurlu mu?
+        seq simüle edilir, succ ve sonrası için ileri bolluk kullanılır (O(len(seq))).
+        """
+        ws, we = self.window_start, self.window_end
+        prev, time = self._depart(r, pred)
+        for n in seq:
+            arr = time + self._travel(r, prev, n)
+            if arr > we[n]:
+                return False
+            time = max(arr, ws[n])
+            prev = n
+        if succ >= len(r.nodes):
+            return True
+        delay = time + self._travel(r, prev, r.nodes[succ]) - r.arrival[succ]
+        return delay <= self.EPS or delay <= r.slack[succ] + self.EPS
+
+    def _charge_ok(self, r: _Route, delta: float) -> bool:
+        """Rota enerjisi delta kadar değişince batarya kısıtı bozulmuyor mu (azalan enerji her zaman kabul)."""
+        return delta <= self.EPS or r.energy + delta <= r.battery + self.EPS
+
+    def _d(self, a: int, b: Optional[int]) -> float:
+        return 0.0 if b is None else self.dist[a, b]
+
+    def _e(self, r: _Route, a: int, b: Optional[int]) -> float:
+        """a -> b kenar enerjisi r'nin hızında; b yoksa (rota sonu) 0."""
+        return 0.0 if b is None else self.energy[a, b] / r.speed
+
+    # --- hamleler ---
+
+    def _try_moves(self, u: int) -> List[int]:
+        """u düğümünden başlayan ilk iyileştiren hamleyi uygular; değişen rota anahtarlarını döner."""
+        key = self._where[u][0]
+        if len(self._routes[key].nodes) > 1:
+            # Rota içi hamleler için u'nun aynı rotadaki komşuları ve konumları
+            local = [(v, w[1]) for v in self.neighbors[u]
+                     if (w := self._where.get(v)) is not None and w[0] == key]
+            changed = self._two_opt(u, local) or self._or_opt(u, local)
+            if changed:
+                return changed
+        return self._relocate(u) or self._swap(u)
+
+    def _two_opt(self, u: int, local: List[Tuple[int, int]]) -> List[int]:
+        """t1 -> t2 ve t3 -> t4 kenarları yerine t1 -> t3 ve t2 -> t4: t2..t3 arası ters çevrilir."""
+        key, i = self._where[u]
+        r = self._routes[key]
+        nodes = r.nodes
+        # u t1 olarak; rotanın ilk düğümü için drone başlangıcı da t1 olarak denenir
+        for pos1 in ((i, -1) if i == 0 else (i,)):
+            t1 = nodes[pos1] if pos1 >= 0 else r.drone
+            if pos1 + 1 >= len(nodes):
+                continue
+            t2 = nodes[pos1 + 1]
+            if pos1 >= 0:
+                candidates = local
+            else:
+                candidates = [(v, w[1]) for v in self.neighbors[t1]
+                              if (w := self._where.get(v)) is not None and w[0] == key]
+            for t3, j in candidates:
+                if j <= pos1 + 1:
+                    continue
+                t4 = nodes[j + 1] if j + 1 < len(nodes) else None
+                delta = self.dist[t1, t3] + self._d(t2, t4) - self.dist[t1, t2] - self._d(t3, t4)
+                if delta >= -self.EPS:
+                    continue
+                seq = nodes[pos1 + 1:j + 1][::-1]
+                if not self._fits(r, pos1, seq, j + 1):
+                    continue
+                # Kenar enerjisi hedef yüküne bağlı ve yönlü: ters çevrilen iç kenarlar da yeniden sayılır
+                inner = np.array(seq)
+                delta_e = (self._e(r, t1, t3) + self._e(r, t2, t4) - self._e(r, t1, t2) - self._e(r, t3, t4)
+                           + (self.energy[inner[:-1], inner[1:]].sum()
+                              - self.energy[inner[1:], inner[:-1]].sum()) / r.speed)
+                if not self._charge_ok(r, delta_e):
+                    continue
+                nodes[pos1 + 1:j + 1] = seq
+                self._refresh(r)
+                self.stats["2opt"] += 1
+                return [key]
+        return []
+
+    def _or_opt(self, u: int, local: List[Tuple[int, int]]) -> List[int]:
+        """u ile başlayan 1-3 düğümlük segmenti aynı rotada komşu bir düğümün önüne / arkasına taşır."""
+        if not local:
+            return []
+        key, i = self._where[u]
+        r = self._routes[key]
+        nodes = r.nodes
+        n = len(nodes)
+        for length in (1, 2, 3):
+            if i + length > n:
+                break
+            seg = nodes[i:i + length]
+            prev = nodes[i - 1] if i > 0 else r.drone
+            nxt = nodes[i + length] if i + length < n else None
+            removal = self.dist[prev, seg[0]] + self._d(seg[-1], nxt) - self._d(prev, nxt)
+            removal_e = self._e(r, prev, seg[0]) + self._e(r, seg[-1], nxt) - self._e(r, prev, nxt)
+            for v, j in local:
+                if i <= j < i + length:
+                    continue
+                # segment (q, s) kenarı arasına: önce v'nin arkası (q=v), sonra önü (s=v)
+                for q in (j, j - 1):
+                    s = q + 1
+                    if i - 1 <= q < i + length:
+                        continue  # segmentin kendi konumu
+                    qn = nodes[q] if q >= 0 else r.drone
+                    sn = nodes[s] if s < n and not (i <= s < i + length) else None
+                    if s < n and sn is None:
+                        continue
+                    delta = self.dist[qn, seg[0]] + self._d(seg[-1], sn) - self._d(qn, sn) - removal
+                    if delta >= -self.EPS or not self._fits(r, q, seg, s):
+                        continue
+                    delta_e = (self._e(r, qn, seg[0]) + self._e(r, seg[-1], sn) - self._e(r, qn, sn)
+                               - removal_e)
+                    if not self._charge_ok(r, delta_e):
+                        continue
+                    rest = nodes[:i] + nodes[i + length:]
+                    at = q + 1 if q < i else q + 1 - length
+                    r.nodes = rest[:at] + seg + rest[at:]
+                    self._refresh(r)
+                    self.stats["or_opt"] += 1
+                    return [key]
+        return []
+
+    def _removal_gain(self, r: _Route, i: int) -> float:
+        nodes = r.nodes
+        prev = nodes[i - 1] if i > 0 else r.drone
+        nxt = nodes[i + 1] if i + 1 < len(nodes) else None
+        return self.dist[prev, nodes[i]] + self._d(nodes[i], nxt) - self._d(prev, nxt)
+
+    def _relocate(self, u: int) -> List[int]:
+        """u'yu başka bir drone'un rotasına, komşusunun önüne / arkasına (ya da boş rotaya) taşır."""
+        if not self._inter:
+            return []
+        key, i = self._where[u]
+        a = self._routes[key]
+        gain = self._removal_gain(a, i)
+        # Silmenin enerji etkisi: hedef yükü farklı olduğundan prev -> next kenarı enerjiyi artırabilir
+        prev_a = a.nodes[i - 1] if i > 0 else a.drone
+        next_a = a.nodes[i + 1] if i + 1 < len(a.nodes) else None
+        removal_e = self._e(a, prev_a, next_a) - self._e(a, prev_a, u) - self._e(a, u, next_a)
+        if not self._charge_ok(a, removal_e):
+            return []
+        candidates: List[Tuple[_Route, int]] = []
+        for v in self.neighbors[u]:
+            where = self._where.get(v)
+            if where is not None and where[0] != key:
+                candidates.append((self._routes[where[0]], where[1]))
+        candidates.extend((b, -1) for b in self._routes.values() if not b.nodes and b.key != key)
+        for b, j in candidates:
+            if self.weights[u] > b.max_weight:
+                continue
+            for q in ((j, j - 1) if b.nodes else (-1,)):
+                qn = b.nodes[q] if q >= 0 else b.drone
+                sn = b.nodes[q + 1] if q + 1 < len(b.nodes) else None
+                delta = self.dist[qn, u] + self._d(u, sn) - self._d(qn, sn) - gain
+                # Silme yalnızca sonraki varışları erkene çeker; a rotası olurlu kalır
+                if delta >= -self.EPS or not self._fits(b, q, (u,), q + 1):
+                    continue
+                if not self._charge_ok(b, self._e(b, qn, u) + self._e(b, u, sn) - self._e(b, qn, sn)):
+                    continue
+                del a.nodes[i]
+                b.nodes.insert(q + 1, u)
+                self._refresh(a)
+                self._refresh(b)
+                self.stats["relocate"] += 1
+                return [a.key, b.key]
+        return []
+
+    def _swap(self, u: int) -> List[int]:
+        """u ile başka rotadaki komşusu v'nin yerini değiştirir."""
+        if not self._inter:
+            return []
+        key, i = self._where[u]
+        a = self._routes[key]
+        for v in self.neighbors[u]:
+            where = self._where.get(v)
+            if where is None or where[0] == key:
+                continue
+            b, j = self._routes[where[0]], where[1]
+            if self.weights[u] > b.max_weight or self.weights[v] > a.max_weight:
+                continue
+            ap = a.nodes[i - 1] if i > 0 else a.drone
+            an = a.nodes[i + 1] if i + 1 < len(a.nodes) else None
+            bp = b.nodes[j - 1] if j > 0 else b.drone
+            bn = b.nodes[j + 1] if j + 1 < len(b.nodes) else None
+            delta = (self.dist[ap, v] + self._d(v, an) + self.dist[bp, u] + self._d(u, bn)
+                     - self.dist[ap, u] - self._d(u, an) - self.dist[bp, v] - self._d(v, bn))
+            if delta >= -self.EPS:
+                continue
+            if not self._fits(a, i - 1, (v,), i + 1) or not self._fits(b, j - 1, (u,), j + 1):
+                continue
+            delta_a = self._e(a, ap, v) + self._e(a, v, an) - self._e(a, ap, u) - self._e(a, u, an)
+            delta_b = self._e(b, bp, u) + self._e(b, u, bn) - self._e(b, bp, v) - self._e(b, v, bn)
+            if not self._charge_ok(a, delta_a) or not self._charge_ok(b, delta_b):
+                continue
+            a.nodes[i], b.nodes[j] = v, u
+            self._refresh(a)
+            self._refresh(b)
+            self.stats["swap"] += 1
+            return [a.key, b.key]
+        return []
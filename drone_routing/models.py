@@ -1,7 +1,50 @@
 from dataclasses import dataclass
-from typing import Tuple, List
+from typing import Tuple, List, Union
 
-@dataclass
+# Zaman değerleri "HH:MM" string'i ya da gece yarısından itibaren dakika olarak verilebilir;
+# modeller oluşturulurken tamsayı dakikaya çevrilir, sıcak döngüler yeniden ayrıştırma yapmaz.
+# Modellerden üretilen çıktılar (dataclasses.asdict, senaryo dosyaları) bu yüzden dakika taşır;
+# "HH:MM" gösterimi gerekiyorsa format_window kullanılır.
+TimeValue = Union[str, int, float]
+DAY_MINUTES = 24 * 60
+
+
+def parse_time(value: TimeValue) -> int:
+    """"HH:MM" string'ini ya da sayısal dakikayı tamsayı dakikaya dönüştürür."""
+    if isinstance(value, str):
+        h, m = map(int, value.split(':'))
+        return h * 60 + m
+    return int(value)
+
+
+def parse_window(window: Tuple[TimeValue, TimeValue]) -> Tuple[int, int]:
+    """(başlangıç, bitiş) zaman aralığını dakika çiftine dönüştürür."""
+    return parse_time(window[0]), parse_time(window[1])
+
+
+def format_time(minutes: int) -> str:
+    """Dakikayı "HH:MM" string'ine çevirir (parse_time'ın tersi; gün sınırında 24 saat modülüyle)."""
+    h, m = divmod(int(minutes) % DAY_MINUTES, 60)
+    return f"{h:02d}:{m:02d}"
+
+
+def format_window(window: Tuple[int, int]) -> Tuple[str, str]:
+    """(başlangıç, bitiş) dakika çiftini ("HH:MM", "HH:MM") çiftine çevirir."""
+    return format_time(window[0]), format_time(window[1])
+
+
+def split_window(window: Tuple[int, int]) -> List[Tuple[int, int]]:
+    """
+    Dakika penceresini kapalı aralıklara böler. Gece yarısını aşan pencere (ör. 22:00-02:00, başlangıç > bitiş)
+    önceki günden taşan [başlangıç - 1440, bitiş] ve ertesi güne taşan [başlangıç, bitiş + 1440] olur.
+    """
+    start, end = window
+    if start <= end:
+        return [(start, end)]
+    return [(start - DAY_MINUTES, end), (start, end + DAY_MINUTES)]
+
+
+@dataclass(slots=True)
 class Drone:
     id: int  # Drone'un benzersiz kimlik numarası
     max_weight: float  # Taşıyabileceği maksimum ağırlık (kg)
@@ -9,16 +52,25 @@ class Drone:
     speed: float  # Hızı (m/s)
     start_pos: Tuple[float, float]  # Başlangıç koordinatları (x, y)
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class DeliveryPoint:
     id: int  # Teslimat noktasının benzersiz kimlik numarası
     pos: Tuple[float, float]  # Koordinatlar (x, y)
     weight: float  # Paketin ağırlığı (kg)
     priority: int  # Öncelik seviyesi (1-5)
-    time_window: Tuple[str, str]  # Kabul edilebilir zaman aralığı, örn. ("09:00", "10:00")
+    time_window: Tuple[int, int]  # Kabul edilebilir zaman aralığı (dakika); ("09:00", "10:00") da kabul edilir
+
+    def __post_init__(self):
+        object.__setattr__(self, "pos", tuple(self.pos))
+        object.__setattr__(self, "time_window", parse_window(self.time_window))
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class NoFlyZone:
     id: int  # Bölgenin benzersiz kimlik numarası
-    coordinates: List[Tuple[float, float]]  # Köşe noktaları listesi
-    active_time: Tuple[str, str]  # Aktif olduğu zaman aralığı, örn. ("09:30", "11:00") 
\ No newline at end of file
+    coordinates: Tuple[Tuple[float, float], ...]  # Köşe noktaları; liste da verilebilir, tuple'a çevrilir
+    active_time: Tuple[int, int]  # Aktif olduğu zaman aralığı (dakika); ("09:30", "11:00") da kabul edilir
+
+    def __post_init__(self):
+        # frozen sınıf tamamen değişmez ve hash'lenebilir olsun diye köşeler de tuple olarak saklanır
+        object.__setattr__(self, "coordinates", tuple((float(x), float(y)) for x, y in self.coordinates))
+        object.__setattr__(self, "active_time", parse_window(self.active_time))
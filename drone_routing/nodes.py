@@ -0,0 +1,199 @@
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+import numpy as np
+from .models import Drone, DeliveryPoint
+from .energy_model import battery_capacity_wh
+
+# Drone ve teslimat düğümleri için tamsayı indeksli, paralel tipli dizilerden oluşan düğüm tablosu
+
+Node = Union[Drone, DeliveryPoint]
+
+
+class NodeStore:
+    """
+    Düğümler 0..n-1 ardışık indekslerle saklanır; her öznitelik ayrı bir tipli dizidir.
+    Diziler kapasiteli tamponlardır, öznitelik erişimi etkin [:n] görünümünü döner.
+    'drone_{id}' / 'dp_{id}' string anahtarları yalnızca uyumluluk katmanında üretilir.
+    """
+    # alan adı -> (dtype, eleman şekli)
+    FIELDS: Dict[str, Tuple[type, Tuple[int, ...]]] = {
+        "node_ids": (np.int64, ()),
+        "is_delivery": (np.bool_, ()),
+        "positions": (np.float64, (2,)),
+        "weights": (np.float64, ()),
+        "priorities": (np.int16, ()),
+        "max_weights": (np.float64, ()),
+        "speeds": (np.float64, ()),
+        "window_start": (np.float64, ()),
+        "window_end": (np.float64, ()),
+        # batarya kapasitesi (Wh); teslimat düğümleri için sınırsız
+        "battery_wh": (np.float64, ()),
+        # türetilmiş: (max_priority - priority) * 100, Graph tarafından güncellenir
+        "priority_penalty": (np.float64, ()),
+    }
+
+    def __init__(self, drones: List[Drone], deliveries: List[DeliveryPoint]):
+        self.objects: List[Node] = list(drones) + list(deliveries)
+        self.drone_index: Dict[int, int] = {dr.id: i for i, dr in enumerate(drones)}
+        self.delivery_index: Dict[int, int] = {dp.id: len(drones) + k for k, dp in enumerate(deliveries)}
+        n = len(self.objects)
+        self._buffers: Dict[str, np.ndarray] = {
+            "node_ids": np.array([nd.id for nd in self.objects], dtype=np.int64),
+            "is_delivery": np.array([False] * len(drones) + [True] * len(deliveries), dtype=bool),
+            "positions": np.array([dr.start_pos for dr in drones] + [dp.pos for dp in deliveries],
+                                  dtype=np.float64).reshape(-1, 2),
+            "weights": np.array([0.0] * len(drones) + [dp.weight for dp in deliveries], dtype=np.float64),
+            "priorities": np.array([0] * len(drones) + [dp.priority for dp in deliveries], dtype=np.int16),
+            "max_weights": np.array([dr.max_weight for dr in drones] + [np.inf] * len(deliveries), dtype=np.float64),
+            "speeds": np.array([dr.speed for dr in drones] + [np.nan] * len(deliveries), dtype=np.float64),
+            # Zaman pencereleri (dakika); drone düğümleri için sınırsız
+            "window_start": np.array([-np.inf] * len(drones) + [dp.time_window[0] for dp in deliveries],
+                                     dtype=np.float64),
+            "window_end": np.array([np.inf] * len(drones) + [dp.time_window[1] for dp in deliveries],
+                                   dtype=np.float64),
+            "battery_wh": np.array([battery_capacity_wh(dr.battery) for dr in drones] + [np.inf] * len(deliveries),
+                                   dtype=np.float64),
+            "priority_penalty": np.zeros(n, dtype=np.float64),
+        }
+        self.capacity = n
+
+    def __len__(self) -> int:
+        return len(self.objects)
+
+    def __getattr__(self, name: str) -> np.ndarray:
+        if name in NodeStore.FIELDS:
+            return self._buffers[name][:len(self.objects)]
+        raise AttributeError(name)
+
+    # --- string anahtar uyumluluk katmanı ---
+
+    def key(self, i: int) -> str:
+        return self.key_of(self.objects[i])
+
+    def index(self, key: str) -> int:
+        """'drone_{id}' ya da 'dp_{id}' anahtarının indeksini döner; yoksa KeyError."""
+        kind, _, node_id = key.partition("_")
+        table = self.drone_index if kind == "drone" else self.delivery_index if kind == "dp" else None
+        if table is None or not node_id.lstrip("-").isdigit() or int(node_id) not in table:
+            raise KeyError(key)
+        return table[int(node_id)]
+
+    def find(self, key: str) -> Optional[int]:
+        try:
+            return self.index(key)
+        except KeyError:
+            return None
+
+    # --- yapısal değişiklikler ---
+
+    def reserve(self, size: int) -> None:
+        """Tamponları gerekirse iki katına büyütür."""
+        if size <= self.capacity:
+            return
+        cap = max(size, 2 * self.capacity, 8)
+        for name, buf in self._buffers.items():
+            grown = np.zeros((cap,) + buf.shape[1:], dtype=buf.dtype)
+            grown[:self.capacity] = buf[:self.capacity]
+            self._buffers[name] = grown
+        self.capacity = cap
+
+    def set(self, i: int, node: Node) -> None:
+        """i indeksli düğümün dizi değerlerini yazar (priority_penalty hariç)."""
+        b = self._buffers
+        is_dp = isinstance(node, DeliveryPoint)
+        b["node_ids"][i] = node.id
+        b["is_delivery"][i] = is_dp
+        b["positions"][i] = node.pos if is_dp else node.start_pos  # type: ignore
+        b["weights"][i] = node.weight if is_dp else 0.0  # type: ignore
+        b["priorities"][i] = node.priority if is_dp else 0  # type: ignore
+        b["max_weights"][i] = np.inf if is_dp else node.max_weight  # type: ignore
+        b["speeds"][i] = np.nan if is_dp else node.speed  # type: ignore
+        b["window_start"][i] = node.time_window[0] if is_dp else -np.inf  # type: ignore
+        b["window_end"][i] = node.time_window[1] if is_dp else np.inf  # type: ignore
+        b["battery_wh"][i] = np.inf if is_dp else battery_capacity_wh(node.battery)  # type: ignore
+
+    def append(self, node: Node) -> int:
+        i = len(self.objects)
+        table = self.delivery_index if isinstance(node, DeliveryPoint) else self.drone_index
+        if node.id in table:
+            raise ValueError(f"{self.key_of(node)} zaten mevcut")
+        self.reserve(i + 1)
+        self.objects.append(node)
+        table[node.id] = i
+        self.set(i, node)
+        return i
+
+    def remove(self, i: int) -> int:
+        """
+        i indeksli düğümü siler; son düğüm i'ye taşınır. Taşınan düğümün eski indeksini döner
+        (i son düğümse i döner). Çift dizilerinin aynı taşımayı yapması çağırana aittir.
+        """
+        last = len(self.objects) - 1
+        node = self.objects[i]
+        table = self.delivery_index if isinstance(node, DeliveryPoint) else self.drone_index
+        del table[node.id]
+        if i != last:
+            moved = self.objects[last]
+            self.objects[i] = moved
+            for buf in self._buffers.values():
+                buf[i] = buf[last]
+            (self.delivery_index if isinstance(moved, DeliveryPoint) else self.drone_index)[moved.id] = i
+        self.objects.pop()
+        return last
+
+    @staticmethod
+    def key_of(node: Node) -> str:
+        return f"dp_{node.id}" if isinstance(node, DeliveryPoint) else f"drone_{node.id}"
+
+
+class NodeKeyIndex(Mapping):
+    """Uyumluluk: node_key -> indeks eşlemesi (NodeStore üzerinde görünüm)."""
+    def __init__(self, store: NodeStore):
+        self._store = store
+
+    def __getitem__(self, key: str) -> int:
+        return self._store.index(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return (self._store.key(i) for i in range(len(self._store)))
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and self._store.find(key) is not None
+
+
+class NodeMap(Mapping):
+    """Uyumluluk: node_key -> Drone/DeliveryPoint eşlemesi (NodeStore üzerinde görünüm)."""
+    def __init__(self, store: NodeStore):
+        self._store = store
+
+    def __getitem__(self, key: str) -> Node:
+        return self._store.objects[self._store.index(key)]
+
+    def __iter__(self) -> Iterator[str]:
+        return (self._store.key(i) for i in range(len(self._store)))
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and self._store.find(key) is not None
+
+
+class NodeKeyList:
+    """Uyumluluk: indeks -> node_key dizisi (NodeStore üzerinde görünüm)."""
+    def __init__(self, store: NodeStore):
+        self._store = store
+
+    def __getitem__(self, i: int) -> str:
+        if not -len(self._store) <= i < len(self._store):
+            raise IndexError(i)
+        return self._store.key(i % len(self._store))
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+    def __iter__(self) -> Iterator[str]:
+        return (self._store.key(i) for i in range(len(self._store)))
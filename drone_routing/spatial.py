@@ -0,0 +1,321 @@
+import math
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from .models import NoFlyZone
+
+# No-fly zone sınırlayıcı kutuları için düzgün ızgara (uniform grid) indeksi
+
+BBox = Tuple[float, float, float, float]  # (min_x, min_y, max_x, max_y)
+
+
+def polygon_bbox(polygon: Sequence[Tuple[float, float]]) -> BBox:
+    """Çokgenin eksenlere hizalı sınırlayıcı kutusu."""
+    xs = [p[0] for p in polygon]
+    ys = [p[1] for p in polygon]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def segment_overlaps_bbox(a: Tuple[float, float], b: Tuple[float, float], box: BBox) -> bool:
+    """
+    Segmentin kutuya değip değmediğini Liang-Barsky kırpmasıyla kontrol eder.
+    """
+    x0, y0 = a
+    dx, dy = b[0] - x0, b[1] - y0
+    t0, t1 = 0.0, 1.0
+    for p, q in ((-dx, x0 - box[0]), (dx, box[2] - x0),
+                 (-dy, y0 - box[1]), (dy, box[3] - y0)):
+        if p == 0:
+            if q < 0:
+                return False
+            continue
+        r = q / p
+        if p < 0:
+            if r > t1:
+                return False
+            t0 = max(t0, r)
+        else:
+            if r < t0:
+                return False
+            t1 = min(t1, r)
+    return True
+
+
+class ZoneGridIndex:
+    """
+    No-fly zone'ların sınırlayıcı kutularını düzgün bir ızgaraya yerleştirir.
+    Bir segment yalnızca geçtiği hücrelerdeki ve kutusuna değdiği bölgelerle test edilir.
+    Bölgeler değiştiğinde indeks yeniden kurulmalıdır (Graph.no_fly_zones ataması bunu yapar).
+    """
+    MAX_CELLS_PER_AXIS = 256
+
+    def __init__(self, zones: List[NoFlyZone]):
+        self.zones = zones
+        self.bboxes: List[BBox] = [polygon_bbox(z.coordinates) for z in zones]
+        self.cells: Dict[Tuple[int, int], List[int]] = {}
+        if not self.bboxes:
+            self.origin = (0.0, 0.0)
+            self.cell_size = 1.0
+            self.shape = (0, 0)
+            return
+        min_x = min(b[0] for b in self.bboxes)
+        min_y = min(b[1] for b in self.bboxes)
+        max_x = max(b[2] for b in self.bboxes)
+        max_y = max(b[3] for b in self.bboxes)
+        # Hücre boyutu: ortalama kutu kenarı, hücre sayısı eksen başına sınırlı
+        mean_side = sum((b[2] - b[0]) + (b[3] - b[1]) for b in self.bboxes) / (2 * len(self.bboxes))
+        extent = max(max_x - min_x, max_y - min_y, 1e-9)
+        self.cell_size = max(mean_side, extent / self.MAX_CELLS_PER_AXIS, 1e-9)
+        self.origin = (min_x, min_y)
+        self.shape = (int((max_x - min_x) // self.cell_size) + 1,
+                      int((max_y - min_y) // self.cell_size) + 1)
+        # Hücre sınırına denk gelen kutular komşu hücreye de yazılır (köşe teğetleri kaçmasın)
+        eps = self.cell_size * 1e-6
+        for zi, box in enumerate(self.bboxes):
+            cx0, cy0 = self._cell_of(box[0] - eps, box[1] - eps)
+            cx1, cy1 = self._cell_of(box[2] + eps, box[3] + eps)
+            for cx in range(cx0, cx1 + 1):
+                for cy in range(cy0, cy1 + 1):
+                    self.cells.setdefault((cx, cy), []).append(zi)
+
+    def __len__(self) -> int:
+        return len(self.zones)
+
+    def _cell_of(self, x: float, y: float) -> Tuple[int, int]:
+        cx = int((x - self.origin[0]) // self.cell_size)
+        cy = int((y - self.origin[1]) // self.cell_size)
+        return (min(max(cx, 0), self.shape[0] - 1), min(max(cy, 0), self.shape[1] - 1))
+
+    def _cells_on_segment(self, a: Tuple[float, float], b: Tuple[float, float]) -> List[Tuple[int, int]]:
+        """
+        Segmentin geçtiği ızgara hücreleri (Amanatides-Woo adımlaması).
+        Segment önce ızgara sınırlarına kırpılır.
+        """
+        gx0, gy0 = self.origin
+        gx1 = gx0 + self.shape[0] * self.cell_size
+        gy1 = gy0 + self.shape[1] * self.cell_size
+        x0, y0 = a
+        dx, dy = b[0] - x0, b[1] - y0
+        # Izgaraya kırpma
+        t0, t1 = 0.0, 1.0
+        for p, q in ((-dx, x0 - gx0), (dx, gx1 - x0), (-dy, y0 - gy0), (dy, gy1 - y0)):
+            if p == 0:
+                if q < 0:
+                    return []
+                continue
+            r = q / p
+            if p < 0:
+                t0 = max(t0, r)
+            else:
+                t1 = min(t1, r)
+        if t0 > t1:
+            return []
+        sx, sy = x0 + t0 * dx, y0 + t0 * dy
+        cx, cy = self._cell_of(sx, sy)
+        ex, ey = self._cell_of(x0 + t1 * dx, y0 + t1 * dy)
+        cells = [(cx, cy)]
+        step_x = 1 if dx > 0 else -1
+        step_y = 1 if dy > 0 else -1
+        # Bir sonraki hücre sınırına kadar olan parametrik mesafe
+        if dx != 0:
+            next_x = gx0 + (cx + (1 if dx > 0 else 0)) * self.cell_size
+            t_max_x = (next_x - x0) / dx
+            t_delta_x = self.cell_size / abs(dx)
+        else:
+            t_max_x = t_delta_x = math.inf
+        if dy != 0:
+            next_y = gy0 + (cy + (1 if dy > 0 else 0)) * self.cell_size
+            t_max_y = (next_y - y0) / dy
+            t_delta_y = self.cell_size / abs(dy)
+        else:
+            t_max_y = t_delta_y = math.inf
+        max_steps = self.shape[0] + self.shape[1]
+        while (cx, cy) != (ex, ey) and len(cells) <= max_steps:
+            if t_max_x < t_max_y:
+                cx += step_x
+                t_max_x += t_delta_x
+            else:
+                cy += step_y
+                t_max_y += t_delta_y
+            if not (0 <= cx < self.shape[0] and 0 <= cy < self.shape[1]):
+                break
+            cells.append((cx, cy))
+        return cells
+
+    def query(self, a: Tuple[float, float], b: Tuple[float, float]) -> List[int]:
+        """
+        Segmentin kutusuna değdiği bölgelerin indekslerini (self.zones içindeki sıra) artan sırada döner.
+        """
+        if not self.cells:
+            return []
+        candidates = set()
+        for cell in self._cells_on_segment(a, b):
+            candidates.update(self.cells.get(cell, ()))
+        return [zi for zi in sorted(candidates) if segment_overlaps_bbox(a, b, self.bboxes[zi])]
+
+
+def _zone_key(zone: NoFlyZone) -> Tuple:
+    """Bölgenin geometrik kimliği: aynı id ve köşelerle gelen bölge aynı bit dilimini korur."""
+    return zone.id, tuple(tuple(p) for p in zone.coordinates)
+
+
+class CrossingMatrix:
+    """
+    (src, dst) düğüm çifti için düz segmentin kestiği no-fly zone'ları bitset olarak saklar.
+    Her bölgeye kalıcı bir bit dilimi (slot) verilir; matris tembel doldurulur ve satırlar ilk sorguda ayrılır:
+      known[j][i] : i-j çifti için hangi dilimlerin sonucu hesaplandı
+      bits[j][i]  : hangi dilimlerdeki bölgeler segment tarafından kesiliyor
+    Sorgular hedef düğüm j'nin satırını kullanır (A* hedefleri); yalnızca sorgulanan düğümler bellek tutar.
+    Ayrılmış satırlar arasında sonuçlar simetrik paylaşılır.
+    Bölge çıkarıldığında yalnızca biti 'live' maskesinden düşer, eklendiğinde
+    o bölgenin biti her çift için ilk sorguda hesaplanır (bölge bazlı geçersizleştirme).
+    """
+    WORD_BITS = 64
+
+    def __init__(self, positions: np.ndarray, crosses: Callable[[Tuple[float, float], Tuple[float, float], int], bool]):
+        """
+        positions: (N, 2) düğüm koordinatları
+        crosses(a, b, zone_pos): segment a-b, zones listesindeki zone_pos sıradaki bölgeye giriyor mu
+        """
+        self.positions = positions
+        self._crosses = crosses
+        self.n = len(positions)
+        self.capacity = self.n
+        self.words = 0
+        self.live = np.zeros(0, dtype=np.uint64)
+        self.known: Dict[int, np.ndarray] = {}  # düğüm -> (capacity, words)
+        self.bits: Dict[int, np.ndarray] = {}
+        self.slot_of: Dict[Tuple, int] = {}
+        self.zone_slots: List[int] = []
+        self.index: Optional[ZoneGridIndex] = None
+        self._next_slot = 0
+
+    def set_zones(self, zones: List[NoFlyZone], index: ZoneGridIndex) -> None:
+        """Bölge listesini günceller; korunan bölgelerin hesaplanmış bitleri geçerli kalır."""
+        keys = [_zone_key(z) for z in zones]
+        kept = {k: self.slot_of[k] for k in keys if k in self.slot_of}
+        # Dilimler yalnızca artar; ölü dilimler çoğaldığında matris sıfırdan kurulur
+        if self._next_slot + len(keys) - len(kept) > 2 * len(keys) + self.WORD_BITS:
+            kept = {}
+            self._next_slot = 0
+            self.words = 0
+            self.known = {}
+            self.bits = {}
+        self.slot_of = {}
+        self.zone_slots = []
+        for k in keys:
+            slot = kept.get(k)
+            if slot is None:
+                slot = self._next_slot
+                self._next_slot += 1
+            self.slot_of[k] = slot
+            self.zone_slots.append(slot)
+        words = -(-self._next_slot // self.WORD_BITS)
+        if words > self.words:
+            pad = ((0, 0), (0, words - self.words))
+            for rows in (self.known, self.bits):
+                for i, row in rows.items():
+                    rows[i] = np.pad(row, pad)
+            self.words = words
+        self.live = np.zeros(self.words, dtype=np.uint64)
+        for slot in self.zone_slots:
+            self.live[slot // self.WORD_BITS] |= np.uint64(1 << (slot % self.WORD_BITS))
+        self.index = index
+
+    def reserve(self, capacity: int) -> None:
+        """Düğüm kapasitesini büyütür; mevcut sonuçlar korunur."""
+        if capacity <= self.capacity:
+            return
+        pad = ((0, capacity - self.capacity), (0, 0))
+        for rows in (self.known, self.bits):
+            for i, row in rows.items():
+                rows[i] = np.pad(row, pad)
+        self.capacity = capacity
+
+    def _row(self, j: int) -> Tuple[np.ndarray, np.ndarray]:
+        """j düğümünün (known, bits) satırı; yoksa ayrılır ve diğer ayrılmış satırlardaki sonuçlarla başlatılır."""
+        known = self.known.get(j)
+        if known is None:
+            known = np.zeros((self.capacity, self.words), dtype=np.uint64)
+            bits = np.zeros((self.capacity, self.words), dtype=np.uint64)
+            for i, row in self.known.items():
+                known[i] = row[j]
+                bits[i] = self.bits[i][j]
+            self.known[j], self.bits[j] = known, bits
+        return known, self.bits[j]
+
+    def reset_node(self, i: int) -> None:
+        """Konumu değişen ya da yeni eklenen düğümün tüm çiftlerini geçersiz kılar."""
+        self.known.pop(i, None)
+        self.bits.pop(i, None)
+        for rows in (self.known, self.bits):
+            for row in rows.values():
+                row[i] = 0
+
+    def move_node(self, src: int, dst: int, n: int) -> None:
+        """src düğümünün satır ve sütununu dst'ye taşır (ilk n düğüm etkin); src satırı bırakılır."""
+        if src == dst:
+            return
+        for rows in (self.known, self.bits):
+            row = rows.pop(src, None)
+            if row is None:
+                rows.pop(dst, None)
+            else:
+                rows[dst] = row
+            for row in rows.values():
+                row[dst] = row[src]
+                row[src] = 0
+
+    def _fill(self, i: int, j: int) -> None:
+        """i-j segmenti için eksik dilimleri hesaplar (j satırına, ayrılmışsa i satırına da yazılır)."""
+        known, bits_j = self._row(j)
+        missing = self.live & ~known[i]
+        a = tuple(self.positions[i])
+        b = tuple(self.positions[j])
+        bits = bits_j[i].copy()
+        for zi in self.index.query(a, b):
+            slot = self.zone_slots[zi]
+            w, bit = slot // self.WORD_BITS, np.uint64(1 << (slot % self.WORD_BITS))
+            if missing[w] & bit and self._crosses(a, b, zi):
+                bits[w] |= bit
+        bits_j[i] = bits
+        known[i] |= missing
+        if i in self.known:
+            self.bits[i][j] = bits
+            self.known[i][j] |= missing
+
+    def crossing_bits(self, i: int, j: int) -> int:
+        """i-j segmentinin kestiği canlı bölgelerin dilim bitseti (Python int)."""
+        if not self.zone_slots:
+            return 0
+        known, bits = self._row(j)
+        if (self.live & ~known[i]).any():
+            self._fill(i, j)
+        words = (bits[i] & self.live).tolist()
+        return sum(int(w) << (k * self.WORD_BITS) for k, w in enumerate(words))
+
+    def _filled_rows(self, rows: np.ndarray, j: int) -> np.ndarray:
+        """rows içindeki i'ler için i-j çiftlerini hesaplar; j satırının bitlerini döner."""
+        known, bits = self._row(j)
+        stale = (self.live & ~known[rows]).any(axis=1)
+        for i in rows[stale].tolist():
+            self._fill(i, j)
+        return bits[rows]
+
+    def crossing_counts(self, rows: np.ndarray, j: int) -> np.ndarray:
+        """rows içindeki her i için i-j segmentinin kestiği canlı bölge sayısı."""
+        if not self.zone_slots or len(rows) == 0:
+            return np.zeros(len(rows), dtype=np.int64)
+        live_bits = self._filled_rows(rows, j) & self.live
+        return np.unpackbits(live_bits.view(np.uint8), axis=-1).sum(axis=-1).astype(np.int64)
+
+    def zone_hits(self, rows: np.ndarray, j: int, zone_positions: np.ndarray) -> np.ndarray:
+        """
+        (len(rows), len(zone_positions)) bool matrisi: i-j segmenti zones listesindeki
+        o sıradaki bölgeyi kesiyor mu. Zaman filtrelemesi çağırana bırakılır.
+        """
+        if len(rows) == 0 or len(zone_positions) == 0:
+            return np.zeros((len(rows), len(zone_positions)), dtype=bool)
+        slots = np.asarray(self.zone_slots, dtype=np.int64)[zone_positions]
+        words = self._filled_rows(rows, j)[:, slots // self.WORD_BITS]
+        shifts = (slots % self.WORD_BITS).astype(np.uint64)
+        return ((words >> shifts) & np.uint64(1)).astype(bool)
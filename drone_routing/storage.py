@@ -0,0 +1,240 @@
+import json
+import math
+import struct
+from typing import Any, Dict, List, Optional, Sequence, Union
+import numpy as np
+from .models import Drone, DeliveryPoint, NoFlyZone
+from .data_generator import DeliveryArrays
+from .graph import Graph
+
+# Senaryo ve plan için sütunlu ikili dosya biçimi (bellek eşlemeli okuma)
+#  Düzen: MAGIC (8 bayt) | başlık uzunluğu (uint64, little-endian) | JSON başlık | 64 bayta hizalı diziler
+#  Başlık: {"format": FORMAT_VERSION, "meta": {...}, "arrays": {ad: {"dtype", "shape", "offset"}}};
+#  offset veri bölgesinin başına görelidir. Diziler little-endian ve C sıralıdır.
+#  Değişken uzunluklu alanlar (bölge köşeleri, rotalar) CSR düzeninde: ofset dizisi + düz değer dizisi.
+
+MAGIC = b"DRSCN\x00\x00\x01"
+FORMAT_VERSION = 1
+ALIGN = 64
+# Sütun şeması: ad -> (dtype, boyut sayısı); iki boyutlu sütunlar (n, 2) biçimindedir.
+# Dosya başlığındaki dtype birebir eşleşmeli (nesne / metin dtype'ları hiçbir zaman kabul edilmez).
+SCHEMA = {
+    "drone_id": ("<i8", 1), "drone_max_weight": ("<f8", 1), "drone_battery": ("<i8", 1),
+    "drone_speed": ("<f8", 1), "drone_pos": ("<f8", 2),
+    "dp_id": ("<i8", 1), "dp_pos": ("<f8", 2), "dp_weight": ("<f8", 1),
+    "dp_priority": ("<i8", 1), "dp_window": ("<i8", 2),
+    "zone_id": ("<i8", 1), "zone_active": ("<i8", 2), "zone_offsets": ("<i8", 1), "zone_coords": ("<f8", 2),
+    "route_drone": ("<i8", 1), "route_offsets": ("<i8", 1), "route_stops": ("<i8", 1),
+}
+# Her dosyada bulunması gereken sütunlar (plan sütunları isteğe bağlı)
+REQUIRED = ("drone_id", "drone_max_weight", "drone_battery", "drone_speed", "drone_pos",
+            "dp_id", "dp_pos", "dp_weight", "dp_priority", "dp_window",
+            "zone_id", "zone_active", "zone_offsets", "zone_coords")
+ROUTES = ("route_drone", "route_offsets", "route_stops")
+# Aynı satır sayısını paylaşan sütun grupları
+ROW_GROUPS = (("drone_id", "drone_max_weight", "drone_battery", "drone_speed", "drone_pos"),
+              ("dp_id", "dp_pos", "dp_weight", "dp_priority", "dp_window"),
+              ("zone_id", "zone_active"))
+
+Deliveries = Union[Sequence[DeliveryPoint], DeliveryArrays]
+
+
+def _align(n: int) -> int:
+    return -(-n // ALIGN) * ALIGN
+
+
+def _columns(drones: Sequence[Drone], deliveries: Deliveries, zones: Sequence[NoFlyZone],
+             routes: Optional[Dict[int, List[int]]]) -> Dict[str, np.ndarray]:
+    """Nesne listelerinden (ya da DeliveryArrays'ten) kaydedilecek tipli sütunlar."""
+    if not isinstance(deliveries, DeliveryArrays):
+        deliveries = DeliveryArrays(
+            np.array([dp.id for dp in deliveries], dtype=np.int64),
+            np.array([dp.pos for dp in deliveries], dtype=np.float64).reshape(-1, 2),
+            np.array([dp.weight for dp in deliveries], dtype=np.float64),
+            np.array([dp.priority for dp in deliveries], dtype=np.int64),
+            np.array([dp.time_window for dp in deliveries], dtype=np.int64).reshape(-1, 2))
+    columns = {
+        "drone_id": np.array([dr.id for dr in drones], dtype=np.int64),
+        "drone_max_weight": np.array([dr.max_weight for dr in drones], dtype=np.float64),
+        "drone_battery": np.array([dr.battery for dr in drones], dtype=np.int64),
+        "drone_speed": np.array([dr.speed for dr in drones], dtype=np.float64),
+        "drone_pos": np.array([dr.start_pos for dr in drones], dtype=np.float64).reshape(-1, 2),
+        "dp_id": deliveries.ids,
+        "dp_pos": deliveries.pos,
+        "dp_weight": deliveries.weight,
+        "dp_priority": deliveries.priority,
+        "dp_window": deliveries.time_window,
+        "zone_id": np.array([z.id for z in zones], dtype=np.int64),
+        "zone_active": np.array([z.active_time for z in zones], dtype=np.int64).reshape(-1, 2),
+        "zone_offsets": np.cumsum([0] + [len(z.coordinates) for z in zones], dtype=np.int64),
+        "zone_coords": np.array([p for z in zones for p in z.coordinates], dtype=np.float64).reshape(-1, 2),
+    }
+    if routes is not None:
+        columns["route_drone"] = np.array(list(routes), dtype=np.int64)
+        columns["route_offsets"] = np.cumsum([0] + [len(r) for r in routes.values()], dtype=np.int64)
+        columns["route_stops"] = np.array([dp for r in routes.values() for dp in r], dtype=np.int64)
+    return columns
+
+
+def save_scenario(path: str, drones: Sequence[Drone], deliveries: Deliveries, zones: Sequence[NoFlyZone],
+                  routes: Optional[Dict[int, List[int]]] = None, meta: Optional[Dict[str, Any]] = None) -> None:
+    """
+    Senaryoyu (ve varsa planı: {drone_id: [delivery_id, ...]}) ikili dosyaya yazar.
+    deliveries: DeliveryPoint listesi ya da data_generator.DeliveryArrays (büyük senaryolar için nesnesiz).
+    meta: JSON'a çevrilebilir ek bilgiler (ör. seed, fitness).
+    """
+    columns = _columns(drones, deliveries, zones, routes)
+    arrays, offset = {}, 0
+    for name, arr in columns.items():
+        arr = np.ascontiguousarray(arr, dtype=SCHEMA[name][0])
+        columns[name] = arr
+        arrays[name] = {"dtype": arr.dtype.str, "shape": list(arr.shape), "offset": offset}
+        offset = _align(offset + arr.nbytes)
+    header = json.dumps({"format": FORMAT_VERSION, "meta": meta or {}, "arrays": arrays}).encode()
+    data_start = _align(len(MAGIC) + 8 + len(header))
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<Q", len(header)))
+        f.write(header)
+        for name, arr in columns.items():
+            f.seek(data_start + arrays[name]["offset"])
+            f.write(arr.tobytes())
+        f.truncate(data_start + offset)
+
+
+class ScenarioFile:
+    """
+    load_scenario sonucu: self.arrays içindeki sütunlar dosyaya bellek eşlemeli, salt okunur görünümlerdir
+    (kopyalanmaz). Nesneler (drones, deliveries, zones) yalnızca istendiğinde üretilir.
+    """
+    def __init__(self, arrays: Dict[str, np.ndarray], meta: Dict[str, Any]):
+        self.arrays = arrays
+        self.meta = meta
+
+    def __len__(self) -> int:
+        return len(self.arrays["dp_id"])
+
+    def drones(self) -> List[Drone]:
+        a = self.arrays
+        return [Drone(id=i, max_weight=w, battery=b, speed=s, start_pos=(x, y))
+                for i, w, b, s, (x, y) in zip(a["drone_id"].tolist(), a["drone_max_weight"].tolist(),
+                                              a["drone_battery"].tolist(), a["drone_speed"].tolist(),
+                                              a["drone_pos"].tolist())]
+
+    def delivery_arrays(self, index: slice = slice(None)) -> DeliveryArrays:
+        """Teslimat sütunları (bellek eşlemeli görünümler), isteğe bağlı dilimle."""
+        a = self.arrays
+        return DeliveryArrays(a["dp_id"], a["dp_pos"], a["dp_weight"], a["dp_priority"], a["dp_window"])[index]
+
+    def deliveries(self, index: slice = slice(None)) -> List[DeliveryPoint]:
+        return self.delivery_arrays(index).to_objects()
+
+    def zones(self) -> List[NoFlyZone]:
+        a = self.arrays
+        offsets = a["zone_offsets"].tolist()
+        coords = a["zone_coords"].tolist()
+        return [NoFlyZone(id=z, coordinates=[tuple(p) for p in coords[offsets[k]:offsets[k + 1]]],
+                          active_time=tuple(active))
+                for k, (z, active) in enumerate(zip(a["zone_id"].tolist(), a["zone_active"].tolist()))]
+
+    @property
+    def routes(self) -> Optional[Dict[int, List[int]]]:
+        """Kaydedilmiş plan {drone_id: [delivery_id, ...]}; plan yoksa None."""
+        a = self.arrays
+        if "route_drone" not in a:
+            return None
+        offsets = a["route_offsets"].tolist()
+        stops = a["route_stops"].tolist()
+        return {dr: stops[offsets[k]:offsets[k + 1]] for k, dr in enumerate(a["route_drone"].tolist())}
+
+    def to_graph(self, deliveries: slice = slice(None)) -> Graph:
+        """
+        Senaryodan Graph kurar; deliveries dilimiyle büyük bir senaryonun yalnızca bir kısmı alınabilir
+        (Graph düğüm çiftleri için yoğun N x N matrisler tutar).
+        """
+        return Graph(self.drones(), self.deliveries(deliveries), self.zones())
+
+
+def _check_specs(specs: Dict[str, tuple]) -> None:
+    """Başlıktaki sütunları şemaya göre doğrular (tampon oluşturulmadan önce); uyumsuzlukta ValueError."""
+    unknown = [name for name in specs if name not in SCHEMA]
+    if unknown:
+        raise ValueError(f"Bilinmeyen senaryo sütunları: {', '.join(unknown)}")
+    missing = [name for name in REQUIRED if name not in specs]
+    if any(name in specs for name in ROUTES):
+        missing += [name for name in ROUTES if name not in specs]
+    if missing:
+        raise ValueError(f"Senaryo dosyasında eksik sütunlar: {', '.join(missing)}")
+    for name, (dtype, shape, offset) in specs.items():
+        expected, ndim = SCHEMA[name]
+        if dtype != expected:
+            raise ValueError(f"Bozuk senaryo başlığı: {name} dtype {dtype!r}, beklenen {expected!r}")
+        if len(shape) != ndim or (ndim == 2 and shape[1] != 2) or min(shape) < 0 or offset < 0:
+            raise ValueError(f"Bozuk senaryo başlığı: {name} biçimi {list(shape)}")
+    for group in ROW_GROUPS:
+        rows = {specs[name][1][0] for name in group}
+        if len(rows) > 1:
+            raise ValueError(f"Bozuk senaryo başlığı: {group[0].split('_')[0]} sütunlarının satır sayıları farklı")
+    for offsets, owner in (("zone_offsets", "zone_id"), ("route_offsets", "route_drone")):
+        if offsets in specs and specs[offsets][1][0] != specs[owner][1][0] + 1:
+            raise ValueError(f"Bozuk senaryo başlığı: {offsets} uzunluğu {owner} ile uyumsuz")
+
+
+def _check_offsets(arrays: Dict[str, np.ndarray], offsets: str, owner: str, values: str) -> None:
+    """CSR ofsetleri 0'dan başlamalı, azalmamalı ve değer dizisinin uzunluğunda bitmeli."""
+    off = arrays[offsets]
+    if off[0] != 0 or off[-1] != len(arrays[values]) or (np.diff(off) < 0).any():
+        raise ValueError(f"Bozuk senaryo dosyası: {offsets} geçersiz")
+
+
+def load_scenario(path: str, mmap: bool = True) -> ScenarioFile:
+    """
+    Dosyayı açar; mmap=True ise diziler np.memmap üzerinde kopyasız görünümlerdir (yükleme süresi
+    teslimat sayısından bağımsız), aksi halde dosya bir kez belleğe okunur.
+    Bozuk ya da kesik dosyalarda ValueError.
+    """
+    with open(path, "rb") as f:
+        magic = f.read(len(MAGIC))
+        if magic != MAGIC:
+            raise ValueError(f"Geçersiz senaryo dosyası: {path}")
+        raw = f.read(8)
+        if len(raw) != 8:
+            raise ValueError("Senaryo dosyası kesik: başlık okunamadı")
+        (header_len,) = struct.unpack("<Q", raw)
+        raw = f.read(header_len)
+        if len(raw) != header_len:
+            raise ValueError("Senaryo dosyası kesik: başlık okunamadı")
+        header = json.loads(raw)
+    if not isinstance(header, dict):
+        raise ValueError("Bozuk senaryo başlığı")
+    if header.get("format") != FORMAT_VERSION:
+        raise ValueError(f"Desteklenmeyen senaryo biçimi: {header.get('format')}")
+    data_start = _align(len(MAGIC) + 8 + header_len)
+    try:
+        specs = {name: (spec["dtype"], tuple(int(x) for x in spec["shape"]), int(spec["offset"]))
+                 for name, spec in header["arrays"].items()}
+        meta = dict(header.get("meta") or {})
+    except (KeyError, TypeError, ValueError, AttributeError) as exc:
+        raise ValueError(f"Bozuk senaryo başlığı: {exc}") from None
+    _check_specs(specs)
+    buffer = np.memmap(path, dtype=np.uint8, mode="r") if mmap else np.fromfile(path, dtype=np.uint8)
+    arrays = {}
+    for name, (dtype, shape, offset) in specs.items():
+        dtype = np.dtype(dtype)
+        if 0 in shape:
+            arrays[name] = np.empty(shape, dtype=dtype)
+            continue
+        end = data_start + offset + math.prod(shape) * dtype.itemsize
+        if end > buffer.size:
+            raise ValueError(f"Senaryo dosyası kesik: {name} dizisi dosya sonunu aşıyor ({end} > {buffer.size} bayt)")
+        arrays[name] = np.ndarray(shape, dtype=dtype, buffer=buffer, offset=data_start + offset)
+    _check_offsets(arrays, "zone_offsets", "zone_id", "zone_coords")
+    if "route_drone" in arrays:
+        _check_offsets(arrays, "route_offsets", "route_drone", "route_stops")
+    return ScenarioFile(arrays, meta)
+
+
+def save_graph(path: str, graph: Graph, routes: Optional[Dict[int, List[int]]] = None,
+               meta: Optional[Dict[str, Any]] = None) -> None:
+    """Graph'ın drone, teslimat ve bölgelerini (ve varsa planı) kaydeder."""
+    save_scenario(path, graph.drones, graph.deliveries, graph.no_fly_zones, routes, meta)
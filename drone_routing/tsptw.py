@@ -0,0 +1,285 @@
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence, Tuple
+import numpy as np
+
+# Tek drone için zaman pencereli gezgin satıcı (TSPTW) çözücüsü:
+#  - "exact": dizi tabanlı, katman katman vektörel bitmask DP (baskınlık ve olurluk budamalı)
+#  - "heuristic": son tarihe göre ekleme + yerel arama (çok duraklı rotalar ya da bellek sınırı aşıldığında)
+#  - İsteğe bağlı batarya kısıtı: kenar enerjisi matrisi (Wh) verilirse toplam enerji kapasiteyi aşamaz
+
+EXACT_MAX_STOPS = 16                 # bu sayının üzerindeki durak sayılarında sezgisel çözücü kullanılır
+MEMORY_LIMIT_BYTES = 256 * 1024 ** 2  # DP tablolarının izin verilen azami boyutu
+TIME_BUDGET_S = 1.0                  # sezgisel yerel aramanın süre bütçesi (s)
+
+
+@dataclass
+class TSPTWResult:
+    sequence: List[int]  # ziyaret sırası (durak indeksleri ya da teslimat ID'leri)
+    travel: float        # toplam seyahat süresi (dakika)
+    wait: float          # toplam bekleme süresi (dakika)
+    mode: str            # "exact" ya da "heuristic"
+    stats: dict = field(default_factory=dict)
+
+    def as_tuple(self) -> Tuple[List[int], float, float]:
+        return self.sequence, self.travel, self.wait
+
+
+def _infeasible(mode: str, **stats) -> TSPTWResult:
+    return TSPTWResult([], float('inf'), float('inf'), mode, stats)
+
+
+def schedule(seq: Sequence[int], travel: List[List[float]], ws: List[float], we: List[float],
+             start_time: float) -> Tuple[float, float, float, float]:
+    """
+    Sıra için zaman çizelgesi. travel: 0=başlangıç, k+1=durak k.
+    Geri döner: (toplam gecikme, bitiş zamanı, toplam seyahat, toplam bekleme).
+    """
+    current = start_time
+    prev = 0
+    late = total_travel = total_wait = 0.0
+    for k in seq:
+        tt = travel[prev][k + 1]
+        arr = current + tt
+        total_travel += tt
+        if arr > we[k]:
+            late += arr - we[k]
+        if arr < ws[k]:
+            total_wait += ws[k] - arr
+            arr = ws[k]
+        current = arr
+        prev = k + 1
+    return late, current, total_travel, total_wait
+
+
+def route_energy(seq: Sequence[int], energy: np.ndarray) -> float:
+    """Sıranın toplam enerjisi (Wh). energy: 0=başlangıç, k+1=durak k."""
+    total = 0.0
+    prev = 0
+    for k in seq:
+        total += energy[prev][k + 1]
+        prev = k + 1
+    return total
+
+
+def dp_memory_bytes(n: int, with_energy: bool = False) -> int:
+    """
+    n duraklı DP'nin tablo boyutu: varış zamanları (float64) + ebeveyn (int8) + maske yardımcıları;
+    batarya kısıtında ek olarak enerji tablosu (float64).
+    """
+    return (1 << n) * (n * (17 if with_energy else 9) + 16)
+
+
+def solve_tsptw(travel: np.ndarray, ws: Sequence[float], we: Sequence[float], start_time: float,
+                exact_max_stops: int = EXACT_MAX_STOPS,
+                memory_limit: int = MEMORY_LIMIT_BYTES,
+                time_budget: float = TIME_BUDGET_S,
+                energy: Optional[np.ndarray] = None,
+                battery: float = float('inf')) -> TSPTWResult:
+    """
+    travel: (n+1, n+1) seyahat süresi matrisi (dakika), 0 = drone başlangıcı.
+    Tüm duraklar ziyaret edilmeli; amaç son varış zamanını en aza indirmektir.
+    energy: travel ile aynı düzende kenar enerjisi matrisi (Wh); battery sonluysa rota toplamı onu aşamaz.
+    Durak sayısı eşik altında ve tablo bellek sınırına sığıyorsa kesin DP, aksi halde sezgisel çözücü çalışır.
+    """
+    n = len(ws)
+    if n == 0:
+        return TSPTWResult([], 0.0, 0.0, "exact")
+    travel = np.asarray(travel, dtype=float)
+    ws_l, we_l = [float(x) for x in ws], [float(x) for x in we]
+    if energy is not None and not np.isfinite(battery):
+        energy = None
+    if energy is not None:
+        energy = np.asarray(energy, dtype=float)
+    exact = n <= exact_max_stops and dp_memory_bytes(n, energy is not None) <= memory_limit
+    mode = "exact" if exact else "heuristic"
+    # Olurluk ön kontrolü: bir durağa en erken varış, başlangıç zamanı + en kısa gelen kenardır
+    incoming = travel[:, 1:].copy()
+    incoming[np.arange(1, n + 1), np.arange(n)] = np.inf
+    if (start_time + incoming.min(axis=0) > np.asarray(we_l)).any():
+        return _infeasible(mode, precheck=True)
+    if energy is not None:
+        # Her durağa en ucuz gelen kenarların toplamı bile bataryayı aşıyorsa tur yoktur
+        incoming = energy[:, 1:].copy()
+        incoming[np.arange(1, n + 1), np.arange(n)] = np.inf
+        if incoming.min(axis=0).sum() > battery:
+            return _infeasible(mode, precheck=True)
+    if exact:
+        result = _solve_exact(travel, ws_l, we_l, start_time, energy, battery)
+        if result.sequence or energy is None:
+            return result
+        # Durum başına tek etiket batarya kısıtında tamlığı bozabilir: sezgisel çözücü son bir kez denenir
+        fallback = _solve_heuristic(travel.tolist(), ws_l, we_l, start_time, time_budget, energy.tolist(), battery)
+        fallback.stats["exact"] = result.stats
+        return fallback
+    return _solve_heuristic(travel.tolist(), ws_l, we_l, start_time, time_budget,
+                            None if energy is None else energy.tolist(), battery)
+
+
+def solve_task(task: tuple) -> TSPTWResult:
+    """Süreç havuzu girişi: task = (travel, ws, we, start_time, ayarlar sözlüğü)."""
+    travel, ws, we, start_time, options = task
+    return solve_tsptw(travel, ws, we, start_time, **options)
+
+
+def _solve_exact(travel: np.ndarray, ws: List[float], we: List[float], start_time: float,
+                 energy: Optional[np.ndarray] = None, battery: float = float('inf')) -> TSPTWResult:
+    """
+    Bitmask DP: arr[mask, j] = mask kümesini j'de bitiren en erken varış.
+    Batarya kısıtında her durum seçilen (en erken varışlı) yolun enerjisini taşır; bataryayı aşan öncüller elenir ve
+    harcanan enerji + ziyaret edilmemiş durakların en ucuz gelen kenarları bataryayı aşan alt kümeler budanır.
+    Durum başına tek etiket tutulduğundan bu durumda sonuç en iyi olmayabilir ya da olurlu tur kaçırılabilir.
+    """
+    n = len(ws)
+    ws_a, we_a = np.asarray(ws), np.asarray(we)
+    T = travel[1:, 1:].copy()
+    # Ardışıklık budaması: j'den en erken ayrılışta bile k'nin penceresi kapanıyorsa j -> k kenarı yoktur
+    T[ws_a[:, np.newaxis] + T > we_a[np.newaxis, :]] = np.inf
+    np.fill_diagonal(T, np.inf)
+    min_in = T.min(axis=0)
+    bits = np.arange(n, dtype=np.int64)
+
+    size = 1 << n
+    arr = np.full((size, n), np.inf)
+    parent = np.full((size, n), -1, dtype=np.int8)
+    first = start_time + travel[0, 1:]
+    ok = first <= we_a
+    if energy is not None:
+        E = energy[1:, 1:].copy()
+        np.fill_diagonal(E, np.inf)
+        min_in_e = E.min(axis=0)
+        en = np.full((size, n), np.inf)
+        ok &= energy[0, 1:] <= battery
+        en[(1 << bits)[ok], bits[ok]] = energy[0, 1:][ok]
+    arr[(1 << bits)[ok], bits[ok]] = np.maximum(first, ws_a)[ok]
+
+    all_masks = np.arange(size, dtype=np.int64)
+    popcount = np.zeros(size, dtype=np.int8)
+    for b in range(n):
+        popcount += ((all_masks >> b) & 1).astype(np.int8)
+    states = pruned = 0
+    for c in range(1, n):
+        layer = all_masks[popcount == c]
+        cur = arr[layer]
+        reached = np.isfinite(cur)
+        alive = reached.any(axis=1)
+        # Baskınlık budaması: en erken varıştan sonra bile penceresi kapanacak ziyaret edilmemiş durak varsa
+        # bu alt küme tam bir tura genişletilemez
+        unvisited = ((layer[:, np.newaxis] >> bits) & 1) == 0
+        t_min = np.where(reached, cur, np.inf).min(axis=1)
+        dead = (unvisited & (t_min[:, np.newaxis] + min_in > we_a)).any(axis=1)
+        if energy is not None:
+            cur_e = en[layer]
+            e_min = cur_e.min(axis=1)
+            dead |= e_min + np.where(unvisited, min_in_e, 0.0).sum(axis=1) > battery
+        pruned += int((alive & dead).sum())
+        keep = alive & ~dead
+        layer, cur, unvisited = layer[keep], cur[keep], unvisited[keep]
+        if energy is not None:
+            cur_e = cur_e[keep]
+        states += len(layer)
+        for k in range(n):
+            src = unvisited[:, k]
+            if not src.any():
+                continue
+            vals = cur[src] + T[:, k]
+            if energy is not None:
+                e_vals = cur_e[src] + E[:, k]
+                vals[e_vals > battery] = np.inf
+            best_j = vals.argmin(axis=1)
+            rows = np.arange(len(best_j))
+            best_t = vals[rows, best_j]
+            feasible = best_t <= we_a[k]
+            if not feasible.any():
+                continue
+            new_masks = layer[src][feasible] | (1 << k)
+            arr[new_masks, k] = np.maximum(best_t[feasible], ws_a[k])
+            parent[new_masks, k] = best_j[feasible]
+            if energy is not None:
+                en[new_masks, k] = e_vals[rows, best_j][feasible]
+    full = size - 1
+    best_j = int(arr[full].argmin())
+    if not np.isfinite(arr[full, best_j]):
+        return _infeasible("exact", states=states, pruned=pruned)
+    seq = []
+    mask, j = full, best_j
+    while j != -1:
+        seq.append(j)
+        prev_j = int(parent[mask, j])
+        mask ^= 1 << j
+        j = prev_j
+    seq.reverse()
+    _, _, total_travel, total_wait = schedule(seq, travel.tolist(), ws, we, start_time)
+    stats = {"states": states, "pruned": pruned}
+    if energy is not None:
+        stats["energy"] = float(en[full, best_j])
+    return TSPTWResult(seq, total_travel, total_wait, "exact", stats)
+
+
+def _solve_heuristic(travel: List[List[float]], ws: List[float], we: List[float], start_time: float,
+                     time_budget: float, energy: Optional[List[List[float]]] = None,
+                     battery: float = float('inf')) -> TSPTWResult:
+    """
+    Son tarihe göre sıralı en ucuz ekleme, ardından relocate / swap / 2-opt yerel araması.
+    Sıralar (toplam gecikme, batarya aşımı, bitiş zamanı) üçlüsüne göre sözlüksel karşılaştırılır.
+    """
+    deadline = time.perf_counter() + time_budget
+    n = len(ws)
+
+    def cost(seq):
+        late, end, _, _ = schedule(seq, travel, ws, we, start_time)
+        over = max(0.0, route_energy(seq, energy) - battery) if energy is not None else 0.0
+        return late, over, end
+
+    seq: List[int] = []
+    for k in sorted(range(n), key=lambda s: (we[s], ws[s])):
+        best = None
+        for pos in range(len(seq) + 1):
+            cand = seq[:pos] + [k] + seq[pos:]
+            c = cost(cand)
+            if best is None or c < best[0]:
+                best = (c, cand)
+        seq = best[1]
+    best_cost = cost(seq)
+
+    moves = 0
+    improved = True
+    while improved and time.perf_counter() < deadline:
+        improved = False
+        # relocate: bir durağı başka bir konuma taşı
+        for i in range(n):
+            for j in range(n):
+                if i == j:
+                    continue
+                cand = seq[:i] + seq[i + 1:]
+                cand.insert(j, seq[i])
+                c = cost(cand)
+                if c < best_cost:
+                    seq, best_cost, improved = cand, c, True
+                    moves += 1
+            if time.perf_counter() >= deadline:
+                break
+        # swap ve 2-opt (ters çevirme)
+        for i in range(n - 1):
+            for j in range(i + 1, n):
+                cand = seq[:]
+                cand[i], cand[j] = cand[j], cand[i]
+                c = cost(cand)
+                if c < best_cost:
+                    seq, best_cost, improved = cand, c, True
+                    moves += 1
+                    continue
+                cand = seq[:i] + seq[i:j + 1][::-1] + seq[j + 1:]
+                c = cost(cand)
+                if c < best_cost:
+                    seq, best_cost, improved = cand, c, True
+                    moves += 1
+            if time.perf_counter() >= deadline:
+                break
+    late, _, total_travel, total_wait = schedule(seq, travel, ws, we, start_time)
+    if late > 0 or best_cost[1] > 0:
+        return _infeasible("heuristic", moves=moves)
+    stats = {"moves": moves}
+    if energy is not None:
+        stats["energy"] = route_energy(seq, energy)
+    return TSPTWResult(seq, total_travel, total_wait, "heuristic", stats)
@@ -0,0 +1,195 @@
+import json
+import weakref
+from typing import Optional, Tuple
+import numpy as np
+from .cache import LRUCache
+from .energy_model import compute_energy
+
+# Izgara tabanlı rüzgâr alanı ve kenar başına enerji / süre entegrasyonu
+#  - Düzenli ızgara düğümlerinde (u, v) rüzgâr vektörü (m/s); dosyadan yüklenir ya da üretilir
+#  - Nokta örnekleme: vektörel çift doğrusal (bilinear) enterpolasyon, ızgara dışı kenara kırpılır
+#  - Kenar entegrasyonu: segment eşit parçalara bölünür, her parçanın orta noktasında rüzgârın
+#    uçuş yönündeki (kuyruk + / burun -) bileşeni yer hızını, büyüklüğü rüzgâr gücü cezasını belirler
+#  - Sonuçlar (graf, graf sürümü, hız) anahtarıyla alan sürümü boyunca önbellekte tutulur; grafın yeni sürümü
+#    eklenirken aynı grafın eski sürümlerine ve silinmiş graflara ait girdiler atılır
+
+MIN_GROUND_RATIO = 0.2  # burun rüzgârında yer hızı drone hızının bu oranının altına düşmez
+
+
+class WindField:
+    """
+    Düzenli ızgarada rüzgâr vektör alanı.
+    u[j, i], v[j, i]: (origin[0] + i * cell_size, origin[1] + j * cell_size) düğümündeki doğu / kuzey bileşenleri (m/s).
+    samples: kenar entegrasyonunda segment başına örnek sayısı.
+    update() alanı değiştirir ve version'ı artırır; önbellekteki kenar tabloları geçersiz olur.
+    """
+    def __init__(self, u: np.ndarray, v: np.ndarray, origin: Tuple[float, float] = (0.0, 0.0),
+                 cell_size: float = 100.0, samples: int = 8, cache_size: int = 64):
+        if cell_size <= 0:
+            raise ValueError("cell_size pozitif olmalı")
+        if samples < 1:
+            raise ValueError("samples en az 1 olmalı")
+        self.origin = (float(origin[0]), float(origin[1]))
+        self.cell_size = float(cell_size)
+        self.samples = samples
+        self.version = 0
+        self._tables: LRUCache = LRUCache(cache_size)
+        self._set_grid(u, v)
+
+    def _set_grid(self, u: np.ndarray, v: np.ndarray) -> None:
+        u = np.asarray(u, dtype=float)
+        v = np.asarray(v, dtype=float)
+        if u.ndim != 2 or u.shape != v.shape or u.size == 0:
+            raise ValueError("u ve v aynı boyutlu, boş olmayan 2B ızgaralar olmalı")
+        self.u, self.v = u, v
+
+    def update(self, u: np.ndarray, v: np.ndarray) -> None:
+        """Izgara değerlerini değiştirir (ör. yeni tahmin); önbellek temizlenir."""
+        self._set_grid(u, v)
+        self.version += 1
+        self._tables.clear()
+
+    # --- Oluşturma / dosya ---
+
+    @classmethod
+    def uniform(cls, speed: float, direction: float = 0.0,
+                bounds: Tuple[float, float, float, float] = (0.0, 0.0, 1000.0, 1000.0),
+                cell_size: float = 100.0, **kwargs) -> "WindField":
+        """Sabit rüzgâr; direction: rüzgârın estiği yön (derece, +x ekseninden saat yönünün tersine)."""
+        nx, ny = cls._grid_shape(bounds, cell_size)
+        rad = np.radians(direction)
+        return cls(np.full((ny, nx), speed * np.cos(rad)), np.full((ny, nx), speed * np.sin(rad)),
+                   bounds[:2], cell_size, **kwargs)
+
+    @classmethod
+    def generate(cls, mean_speed: float = 5.0, direction: float = 0.0, gust: float = 2.0,
+                 smoothness: int = 3, bounds: Tuple[float, float, float, float] = (0.0, 0.0, 1000.0, 1000.0),
+                 cell_size: float = 100.0, seed: Optional[int] = None, **kwargs) -> "WindField":
+        """
+        Rastgele, uzamsal olarak düzgün alan: ortalama rüzgâr + smoothness kez 3x3 ortalamayla
+        yumuşatılmış Gauss gürültüsü (standart sapma yaklaşık gust).
+        """
+        nx, ny = cls._grid_shape(bounds, cell_size)
+        rng = np.random.default_rng(seed)
+        rad = np.radians(direction)
+        noise = rng.normal(0.0, 1.0, (2, ny, nx))
+        for _ in range(smoothness):
+            padded = np.pad(noise, ((0, 0), (1, 1), (1, 1)), mode="edge")
+            noise = sum(padded[:, dy:dy + ny, dx:dx + nx] for dy in range(3) for dx in range(3)) / 9.0
+        std = noise.std(axis=(1, 2), keepdims=True)
+        noise = noise / np.where(std > 0, std, 1.0) * gust
+        u = mean_speed * np.cos(rad) + noise[0]
+        v = mean_speed * np.sin(rad) + noise[1]
+        return cls(u, v, bounds[:2], cell_size, **kwargs)
+
+    @staticmethod
+    def _grid_shape(bounds: Tuple[float, float, float, float], cell_size: float) -> Tuple[int, int]:
+        x0, y0, x1, y1 = bounds
+        if x1 <= x0 or y1 <= y0:
+            raise ValueError("bounds (x0, y0, x1, y1) biçiminde ve x1 > x0, y1 > y0 olmalı")
+        return int(np.ceil((x1 - x0) / cell_size)) + 1, int(np.ceil((y1 - y0) / cell_size)) + 1
+
+    @classmethod
+    def load(cls, path: str, **kwargs) -> "WindField":
+        """
+        .npz (u, v, origin, cell_size dizileri) ya da .json ({"u": [[...]], "v": [[...]], "origin": [x, y],
+        "cell_size": c}) dosyasından yükler.
+        """
+        if path.endswith(".json"):
+            with open(path) as f:
+                data = json.load(f)
+        else:
+            with np.load(path) as npz:
+                data = {key: npz[key] for key in npz.files}
+        try:
+            return cls(data["u"], data["v"], tuple(np.asarray(data.get("origin", (0.0, 0.0))).tolist()),
+                       float(data.get("cell_size", 100.0)), **kwargs)
+        except KeyError as exc:
+            raise ValueError(f"Rüzgâr dosyasında eksik alan: {exc.args[0]}") from None
+
+    def save(self, path: str) -> None:
+        """Alanı .npz ya da .json olarak kaydeder (load ile okunur)."""
+        if path.endswith(".json"):
+            with open(path, "w") as f:
+                json.dump({"u": self.u.tolist(), "v": self.v.tolist(), "origin": list(self.origin),
+                           "cell_size": self.cell_size}, f)
+        else:
+            np.savez(path, u=self.u, v=self.v, origin=np.asarray(self.origin), cell_size=self.cell_size)
+
+    # --- Örnekleme ---
+
+    def sample(self, points: np.ndarray) -> np.ndarray:
+        """(..., 2) noktalarında çift doğrusal enterpolasyonla rüzgâr vektörleri (..., 2)."""
+        points = np.asarray(points, dtype=float)
+        ny, nx = self.u.shape
+        gx = np.clip((points[..., 0] - self.origin[0]) / self.cell_size, 0.0, nx - 1)
+        gy = np.clip((points[..., 1] - self.origin[1]) / self.cell_size, 0.0, ny - 1)
+        i0 = np.minimum(gx.astype(np.int64), max(nx - 2, 0))
+        j0 = np.minimum(gy.astype(np.int64), max(ny - 2, 0))
+        i1 = np.minimum(i0 + 1, nx - 1)
+        j1 = np.minimum(j0 + 1, ny - 1)
+        fx = gx - i0
+        fy = gy - j0
+        w00 = (1 - fx) * (1 - fy)
+        w10 = fx * (1 - fy)
+        w01 = (1 - fx) * fy
+        w11 = fx * fy
+        out = np.empty(points.shape)
+        for k, grid in enumerate((self.u, self.v)):
+            out[..., k] = (grid[j0, i0] * w00 + grid[j0, i1] * w10 + grid[j1, i0] * w01 + grid[j1, i1] * w11)
+        return out
+
+    def segment_wind(self, a: np.ndarray, b: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        a -> b segmentleri ((..., 2) uç noktaları) için parça başına (kuyruk bileşeni, rüzgâr büyüklüğü),
+        her biri (..., samples). Sıfır uzunluklu segmentlerde kuyruk bileşeni 0'dır.
+        """
+        a = np.asarray(a, dtype=float)
+        b = np.asarray(b, dtype=float)
+        delta = b - a
+        length = np.hypot(delta[..., 0], delta[..., 1])
+        direction = delta / np.where(length > 0, length, 1.0)[..., np.newaxis]
+        t = (np.arange(self.samples) + 0.5) / self.samples
+        points = a[..., np.newaxis, :] + t[:, np.newaxis] * delta[..., np.newaxis, :]
+        wind = self.sample(points)
+        along = (wind * direction[..., np.newaxis, :]).sum(axis=-1)
+        return along, np.hypot(wind[..., 0], wind[..., 1])
+
+    # --- Kenar tabloları ---
+
+    def edge_tables(self, graph, speed: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Graf düğümleri arasındaki tüm kenarlar için (seyahat süresi (dakika), enerji (Wh)) matrisleri, drone hızında.
+        Enerji hedef düğümün yüküyle compute_energy'nin parça başına yer hızı ve rüzgâr büyüklüğüyle toplamıdır;
+        rüzgârsız alanda graph.dist_matrix / hız / 60 ve graph.edge_energy ile aynıdır.
+        Örnekler (graf, graf sürümü) için, tablolar ek olarak hız için önbelleklenir.
+        """
+        key = (weakref.ref(graph), graph.version, float(speed))
+        cached = self._tables.get(key)
+        if cached is not None:
+            return cached
+        along, magnitude = self._edge_samples(graph)
+        ground = np.maximum(speed + along, MIN_GROUND_RATIO * speed)
+        piece = graph.dist_matrix[..., np.newaxis] / self.samples
+        travel = (piece / ground).sum(axis=-1) / 60
+        energy = compute_energy(piece, graph.weights[np.newaxis, :, np.newaxis], ground, magnitude).sum(axis=-1)
+        tables = (travel, energy)
+        self._store(key, tables)
+        return tables
+
+    def _edge_samples(self, graph) -> Tuple[np.ndarray, np.ndarray]:
+        """Tüm (i, j) kenarları için (N, N, samples) kuyruk bileşeni ve büyüklük; hızdan bağımsız, önbellekli."""
+        key = (weakref.ref(graph), graph.version)
+        cached = self._tables.get(key)
+        if cached is not None:
+            return cached
+        pos = graph.positions
+        samples = self.segment_wind(pos[:, np.newaxis, :], pos[np.newaxis, :, :])
+        self._store(key, samples)
+        return samples
+
+    def _store(self, key: tuple, value) -> None:
+        """Önbelleğe yazar; aynı grafın başka sürümlerine ya da silinmiş graflara ait (N, N) tablolar atılır."""
+        ref, version = key[0], key[1]
+        self._tables.invalidate(lambda k: k[0]() is None or (k[0] == ref and k[1] != version))
+        self._tables.put(key, value)
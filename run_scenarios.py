@@ -6,6 +6,7 @@ from drone_routing.models import Drone
 from drone_routing.graph import Graph
 from drone_routing.csp import CSP
 from drone_routing.ga import GeneticAlgorithm
+from drone_routing.energy_model import compute_energy, battery_capacity_wh
 
 
 def evaluate_solution(individual, graph):
@@ -14,28 +15,37 @@ def evaluate_solution(individual, graph):
     violations = 0
     total_wait = 0.0
     # başlangıç zamanı (dakika)
-    earliest_start = min(graph._time_to_min(dp.time_window[0]) for dp in graph.deliveries)
+    earliest_start = graph.earliest_start
+    drones_by_id = {d.id: d for d in graph.drones}
+    deliveries_by_id = {d.id: d for d in graph.deliveries}
     for dr_id, route in individual.items():
-        drone = next(d for d in graph.drones if d.id == dr_id)
+        drone = drones_by_id[dr_id]
         prev_pos = drone.start_pos
         current_time = earliest_start
+        battery = battery_capacity_wh(drone.battery)
+        energy_used = 0.0
         for dp_id in route:
-            dp = next(d for d in graph.deliveries if d.id == dp_id)
+            dp = deliveries_by_id[dp_id]
             # mesafe ve seyahat süresi (dakika)
             dist = graph._distance(prev_pos, dp.pos)
             travel_time = (dist / drone.speed) * (1/60)
             arrival_time = current_time + travel_time
-            ws = graph._time_to_min(dp.time_window[0])
-            we = graph._time_to_min(dp.time_window[1])
+            ws, we = dp.time_window
             # zaman penceresi kontrolü
             if arrival_time > we:
                 violations += 1
                 break
+            # batarya kontrolü: rota enerjisi drone kapasitesini aşamaz
+            leg_energy = compute_energy(dist, dp.weight, drone.speed)
+            if energy_used + leg_energy > battery:
+                violations += 1
+                break
+            energy_used += leg_energy
             wait_time = max(0, ws - arrival_time)
             total_wait += wait_time
             if arrival_time < ws:
                 arrival_time = ws
-            energy += dist * dp.weight
+            energy += leg_energy
             delivered += 1
             prev_pos = dp.pos
             current_time = arrival_time
@@ -43,11 +53,12 @@ def evaluate_solution(individual, graph):
     return delivered, energy, violations, avg_wait
 
 
-def run_scenario(n_drones, m_deliveries, k_zones, title):
+def run_scenario(n_drones, m_deliveries, k_zones, title, seed=None, layout="uniform"):
     print(f"--- {title} Başlıyor ---")
-    drones = generate_drones(n_drones)
-    deliveries = generate_deliveries(m_deliveries)
-    zones = generate_no_fly_zones(k_zones)
+    # aynı seed ile drone, teslimat ve bölgeler aynı yerleşim merkezlerini paylaşır ve senaryo tekrarlanabilir
+    drones = generate_drones(n_drones, layout=layout, seed=seed)
+    deliveries = generate_deliveries(m_deliveries, layout=layout, seed=seed)
+    zones = generate_no_fly_zones(k_zones, layout=layout, seed=seed)
     graph = Graph(drones, deliveries, zones)
 
     # CSP
@@ -56,10 +67,8 @@ def run_scenario(n_drones, m_deliveries, k_zones, title):
     assignments = csp.solve()
     t_csp = time.time() - start
     # CSP sonuçlarını değerlendir
-    # assignments: {delivery_id: drone_id} -> drone bazlı rota
-    dr_routes = {dr.id: [] for dr in drones}
-    for dp_id, dr_id in assignments.items():
-        dr_routes[dr_id].append(dp_id)
+    # assignments: {delivery_id: drone_id}; drone bazlı sıralı rotalar csp.routes'ta
+    dr_routes = csp.routes
     delivered_csp, energy_csp, violations_csp, avg_wait_csp = evaluate_solution(dr_routes, graph)
     perc_csp = delivered_csp / m_deliveries * 100
     print(f"CSP: teslimat %{perc_csp:.2f}, enerji {energy_csp:.2f}, süre {t_csp:.2f}s, "
@@ -90,10 +99,12 @@ def run_scenario(n_drones, m_deliveries, k_zones, title):
         poly = Polygon(zone.coordinates, closed=True, color='red', alpha=0.3)
         ax.add_patch(poly)
     # CSP rotaları
-    for dp, dr in assignments.items():
+    for dr, route in dr_routes.items():
         dr_pos = next(d.start_pos for d in drones if d.id == dr)
-        dp_pos = next(d.pos for d in deliveries if d.id == dp)
-        ax.plot([dr_pos[0], dp_pos[0]], [dr_pos[1], dp_pos[1]], c='green', linewidth=1)
+        for dp in route:
+            dp_pos = next(d.pos for d in deliveries if d.id == dp)
+            ax.plot([dr_pos[0], dp_pos[0]], [dr_pos[1], dp_pos[1]], c='green', linewidth=1)
+            dr_pos = dp_pos
     ax.set_title(f"{title} - CSP Rotası")
     ax.legend()
     plt.savefig(f"{title}_csp.png")
@@ -1,11 +1,32 @@
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+import os
+import tempfile
+from fastapi import FastAPI, File, Form, UploadFile, WebSocket, WebSocketDisconnect
 from fastapi.responses import JSONResponse
-from pydantic import BaseModel
-from typing import List, Tuple, Dict, Any
+from pydantic import BaseModel, Field, ValidationError
+import numpy as np
+from typing import List, Literal, Optional, Tuple, Dict, Any, Union
 from drone_routing.models import Drone, DeliveryPoint, NoFlyZone
 from drone_routing.graph import Graph
 from drone_routing.csp import CSP
+from drone_routing.assignment import AssignmentSolver
 from drone_routing.ga import GeneticAlgorithm
+from drone_routing.alns import ALNS
+from drone_routing.wind import WindField
+from drone_routing.storage import load_scenario
+
+# Yüklenen senaryodan kurulacak grafın azami düğüm sayısı (Graph yoğun N x N matrisler tutar)
+MAX_UPLOAD_NODES = 5000
+# Yüklenen senaryo dosyasının azami boyutu (bayt); aşılırsa 413
+MAX_UPLOAD_BYTES = 64 * 1024 * 1024
+UPLOAD_CHUNK = 1024 * 1024
+# İstemci rüzgâr ayarları için sınırlar: ızgara hücre sayısı ve kenar başına örnek sayısı
+# (edge_tables (N, N, samples) yoğun diziler kurar); dosyadan yükleme yalnızca WIND_DIR ayarlıysa ve onun altından
+WIND_DIR = os.environ.get("WIND_DIR")
+MAX_WIND_CELLS = 250_000
+MAX_WIND_SAMPLES = 16
+MAX_WIND_SMOOTHNESS = 20
+WIND_GENERATE_KEYS = {"mean_speed", "direction", "gust", "smoothness", "bounds", "cell_size", "seed", "samples"}
+WIND_GRID_KEYS = {"u", "v", "origin", "cell_size", "samples"}
 
 app = FastAPI(
     title="Drone Rota Planlama Servisi",
@@ -26,25 +47,85 @@ class DeliverySchema(BaseModel):
     pos: Tuple[float, float]
     weight: float
     priority: int
-    time_window: Tuple[str, str]
+    time_window: Tuple[Union[str, int], Union[str, int]]  # "HH:MM" ya da dakika
 
 class NoFlyZoneSchema(BaseModel):
     id: int
     coordinates: List[Tuple[float, float]]
-    active_time: Tuple[str, str]
+    active_time: Tuple[Union[str, int], Union[str, int]]  # "HH:MM" ya da dakika
 
-class PlanRequest(BaseModel):
-    drones: List[DroneSchema]
-    deliveries: List[DeliverySchema]
-    no_fly_zones: List[NoFlyZoneSchema]
+class PlanOptions(BaseModel):
     use_csp: bool = True
+    assignment_method: Literal["csp", "hungarian", "auction"] = "csp"
+    assignment_capacity: int = Field(1, ge=1)  # eşleme yöntemlerinde drone başına azami teslimat
     use_ga: bool = False
     ga_params: Dict[str, Any] = {}
+    use_alns: bool = False
+    alns_params: Dict[str, Any] = {}
+    wind: Dict[str, Any] = {}  # GA rüzgâr alanı: {"path": ...} (WIND_DIR altında), {"u": [[...]], "v": [[...]], ...} ya da üretim ayarları
+
+class PlanRequest(PlanOptions):
+    drones: List[DroneSchema]
+    deliveries: List[DeliverySchema]
+    no_fly_zones: List[NoFlyZoneSchema]
 
 class PlanResponse(BaseModel):
     csp_assignment: Dict[int, int] = None
+    csp_routes: Dict[int, List[int]] = None
     ga_solution: Dict[int, List[int]] = None
     ga_fitness: float = None
+    alns_solution: Dict[int, List[int]] = None
+    alns_fitness: float = None
+
+def wind_from_payload(payload: Dict[str, Any]) -> Optional[WindField]:
+    """
+    Rüzgâr ayarlarından alan: WIND_DIR altındaki dosya adı, açık ızgara ya da WindField.generate parametreleri;
+    boşsa None. Bilinmeyen anahtar, sınır aşımı ya da geçersiz değerde ValueError.
+    """
+    if not payload:
+        return None
+    params = dict(payload)
+    try:
+        if "path" in params:
+            return WindField.load(_wind_path(params.pop("path")), **_wind_options(params, {"samples"}))
+        if "u" in params:
+            params = _wind_options(params, WIND_GRID_KEYS)
+            if np.size(params["u"]) > MAX_WIND_CELLS:
+                raise ValueError(f"Rüzgâr ızgarası çok büyük (sınır {MAX_WIND_CELLS} hücre)")
+            return WindField(params.pop("u"), params.pop("v"), **params)
+        params = _wind_options(params, WIND_GENERATE_KEYS)
+        if "bounds" in params or "cell_size" in params:
+            if not float(params.get("cell_size", 100.0)) > 0:
+                raise ValueError("cell_size pozitif olmalı")
+            nx, ny = WindField._grid_shape(params.get("bounds", (0.0, 0.0, 1000.0, 1000.0)),
+                                           float(params.get("cell_size", 100.0)))
+            if nx * ny > MAX_WIND_CELLS:
+                raise ValueError(f"Rüzgâr ızgarası çok büyük: {nx} x {ny} (sınır {MAX_WIND_CELLS} hücre)")
+        if not 0 <= int(params.get("smoothness", 0)) <= MAX_WIND_SMOOTHNESS:
+            raise ValueError(f"smoothness 0 ile {MAX_WIND_SMOOTHNESS} arasında olmalı")
+        return WindField.generate(**params)
+    except (KeyError, TypeError, OverflowError, OSError) as exc:
+        raise ValueError(f"Geçersiz rüzgâr ayarı: {exc}") from None
+
+
+def _wind_options(params: Dict[str, Any], allowed: set) -> Dict[str, Any]:
+    unknown = sorted(set(params) - allowed)
+    if unknown:
+        raise ValueError(f"Bilinmeyen rüzgâr ayarları: {', '.join(unknown)}")
+    if "samples" in params and not 1 <= int(params["samples"]) <= MAX_WIND_SAMPLES:
+        raise ValueError(f"samples 1 ile {MAX_WIND_SAMPLES} arasında olmalı")
+    return params
+
+
+def _wind_path(name: str) -> str:
+    """WIND_DIR altındaki dosya; dizin ayarlı değilse ya da yol dizin dışına çıkıyorsa ValueError."""
+    if not WIND_DIR:
+        raise ValueError("Rüzgâr dosyasından yükleme kapalı (WIND_DIR ayarlı değil)")
+    root = os.path.realpath(WIND_DIR)
+    path = os.path.realpath(os.path.join(root, str(name)))
+    if os.path.commonpath([root, path]) != root or not os.path.isfile(path):
+        raise ValueError(f"Rüzgâr dosyası bulunamadı: {name}")
+    return path
 
 # --- HTTP endpoint ---
 @app.post("/plan", response_model=PlanResponse)
@@ -54,16 +135,74 @@ def plan_route(req: PlanRequest):
     deliveries = [DeliveryPoint(**d.dict()) for d in req.deliveries]
     zones = [NoFlyZone(**z.dict()) for z in req.no_fly_zones]
 
-    graph = Graph(drones, deliveries, zones)
+    try:
+        wind = wind_from_payload(req.wind)
+    except ValueError as exc:
+        return JSONResponse(status_code=400, content={"error": str(exc)})
+    return run_plan(Graph(drones, deliveries, zones), req, wind=wind)
+
+@app.post("/plan/upload", response_model=PlanResponse)
+def plan_upload(file: UploadFile = File(...), options: str = Form("{}"), max_deliveries: Optional[int] = Form(None)):
+    """
+    storage.save_scenario ile yazılmış ikili senaryo dosyasıyla planlama (multipart form).
+    options: PlanOptions JSON'u; max_deliveries ile yalnızca ilk teslimatlar alınır. Dosyada plan varsa GA onunla ısınır.
+    Drone + alınan teslimat sayısı MAX_UPLOAD_NODES'u aşarsa 400, dosya MAX_UPLOAD_BYTES'ı aşarsa 413 döner.
+    """
+    try:
+        opts = PlanOptions.model_validate_json(options)
+    except ValidationError as exc:
+        return JSONResponse(status_code=400, content={"error": str(exc)})
+    try:
+        wind = wind_from_payload(opts.wind)
+    except ValueError as exc:
+        return JSONResponse(status_code=400, content={"error": str(exc)})
+    if max_deliveries is not None and max_deliveries < 0:
+        return JSONResponse(status_code=400, content={"error": "max_deliveries negatif olamaz"})
+    with tempfile.NamedTemporaryFile(suffix=".drs", delete=False) as tmp:
+        size = 0
+        while chunk := file.file.read(UPLOAD_CHUNK):
+            size += len(chunk)
+            if size > MAX_UPLOAD_BYTES:
+                break
+            tmp.write(chunk)
+    try:
+        if size > MAX_UPLOAD_BYTES:
+            return JSONResponse(status_code=413, content={"error": f"Dosya çok büyük (sınır {MAX_UPLOAD_BYTES} bayt)"})
+        try:
+            scenario = load_scenario(tmp.name)
+        except ValueError as exc:
+            return JSONResponse(status_code=400, content={"error": str(exc)})
+        count = len(scenario) if max_deliveries is None else min(max_deliveries, len(scenario))
+        nodes = count + len(scenario.arrays["drone_id"])
+        if nodes > MAX_UPLOAD_NODES:
+            return JSONResponse(status_code=400, content={
+                "error": f"Senaryo çok büyük: {nodes} düğüm (sınır {MAX_UPLOAD_NODES}); max_deliveries ile kısaltın"})
+        graph = scenario.to_graph(slice(count))
+        routes = scenario.routes
+        return run_plan(graph, opts, [routes] if routes else None, wind)
+    finally:
+        os.unlink(tmp.name)
+
+def run_plan(graph: Graph, req: PlanOptions, seeds: Optional[List[Dict[int, List[int]]]] = None,
+             wind: Optional[WindField] = None) -> PlanResponse:
+    """Seçilen çözücüleri graf üzerinde çalıştırır; seeds GA başlangıç popülasyonuna eklenir, wind GA'nın rüzgâr alanıdır."""
     response = PlanResponse()
     if req.use_csp:
-        csp = CSP(graph)
+        if req.assignment_method == "csp":
+            csp = CSP(graph)
+        else:
+            csp = AssignmentSolver(graph, method=req.assignment_method, capacity=req.assignment_capacity)
         response.csp_assignment = csp.solve()
+        response.csp_routes = csp.routes
     if req.use_ga:
-        ga = GeneticAlgorithm(graph, **req.ga_params)
-        sol, fit = ga.run()
+        ga = GeneticAlgorithm(graph, wind_field=wind, **req.ga_params)
+        sol, fit = ga.run(seeds=seeds)
         response.ga_solution = sol
         response.ga_fitness = fit
+    if req.use_alns:
+        sol, fit = ALNS(graph, **req.alns_params).run()
+        response.alns_solution = sol
+        response.alns_fitness = fit
     return response
 
 # --- WebSocket endpoint (dinamik güncellemeler) ---
@@ -75,6 +214,10 @@ async def websocket_endpoint(ws: WebSocket):
     deliveries: List[DeliveryPoint] = []
     zones: List[NoFlyZone] = []
     graph: Graph = None
+    # son replan'ın GA çözümü (sıcak başlangıç tohumu)
+    last_solution: Dict[int, List[int]] = {}
+    # oturumun rüzgâr alanı: kenar tabloları alan ve graf sürümü değişene kadar replan'lar arasında önbellekte kalır
+    wind: Optional[WindField] = None
     try:
         while True:
             msg = await ws.receive_json()
@@ -85,30 +228,82 @@ async def websocket_endpoint(ws: WebSocket):
                 deliveries = [DeliveryPoint(**d) for d in payload.get("deliveries", [])]
                 zones = [NoFlyZone(**z) for z in payload.get("no_fly_zones", [])]
                 graph = Graph(drones, deliveries, zones)
+                last_solution = {}
                 await ws.send_json({"status":"initialized"})
             elif action == "update_no_fly":
                 # yeni no-fly bölgeleri güncelle
                 zones = [NoFlyZone(**z) for z in payload]
+                # atama, bölge uzamsal indeksini de yeniden kurar
                 graph.no_fly_zones = zones
                 await ws.send_json({"status":"no_fly_zones_updated"})
             elif action == "new_delivery":
-                dp = DeliveryPoint(**payload)
-                deliveries.append(dp)
-                graph.deliveries = deliveries
-                graph.nodes = graph._init_nodes()
-                graph.build_graph()
+                # yalnızca yeni düğümün satır/sütunu hesaplanır (graph.deliveries listesine de eklenir)
+                graph.add_delivery(DeliveryPoint(**payload))
                 await ws.send_json({"status":"delivery_added"})
+            elif action == "remove_delivery":
+                graph.remove_delivery(payload["id"])
+                await ws.send_json({"status":"delivery_removed"})
+            elif action == "add_no_fly":
+                graph.add_zone(NoFlyZone(**payload))
+                zones = graph.no_fly_zones
+                await ws.send_json({"status":"no_fly_zone_added"})
+            elif action == "remove_no_fly":
+                graph.remove_zone(payload["id"])
+                zones = graph.no_fly_zones
+                await ws.send_json({"status":"no_fly_zone_removed"})
+            elif action == "drone_position":
+                graph.update_drone_position(payload["id"], tuple(payload["pos"]))
+                await ws.send_json({"status":"drone_position_updated"})
+            elif action == "wind":
+                # aynı boyutlu yeni ızgara mevcut alanı günceller (sürüm artar), aksi halde yeni alan kurulur
+                try:
+                    if wind is not None and set(payload) == {"u", "v"}:
+                        if np.size(payload["u"]) > MAX_WIND_CELLS:
+                            raise ValueError(f"Rüzgâr ızgarası çok büyük (sınır {MAX_WIND_CELLS} hücre)")
+                        wind.update(payload["u"], payload["v"])
+                    else:
+                        wind = wind_from_payload(payload)
+                except ValueError as exc:
+                    await ws.send_json({"error": str(exc)})
+                    continue
+                await ws.send_json({"status": "wind_updated", "version": wind.version if wind else None})
+            elif action == "reachability":
+                # her drone için tek aramada ulaşılabilir teslimatlar ve maliyetleri
+                reach = {dr.id: graph.reachable_deliveries(dr.id) for dr in graph.drones}
+                await ws.send_json({"reachability": reach})
             elif action == "replan":
                 # yeniden planlama
                 csp = CSP(graph)
                 assign = csp.solve()
-                ga = GeneticAlgorithm(graph, **payload.get("ga_params", {}))
-                sol, fit = ga.run() if payload.get("use_ga") else ({}, None)
-                await ws.send_json({
+                sol, fit = {}, None
+                if payload.get("use_ga"):
+                    ga = GeneticAlgorithm(graph, wind_field=wind, **payload.get("ga_params", {}))
+                    # sıcak başlangıç: önceki en iyi plan, CSP ataması ve açgözlü ekleme çözümü
+                    seeds = None
+                    if payload.get("warm_start", True):
+                        seeds = [seed for seed in (last_solution, csp.routes) if seed] + [ga.greedy_solution()]
+                    # "stream": true ise her iyileşmede ara sonuç gönderilir
+                    for progress in ga.iter_run(payload.get("time_limit"), payload.get("patience"), seeds):
+                        sol, fit = progress.best_solution, progress.best_fitness
+                        if payload.get("stream") and progress.improved:
+                            await ws.send_json({"ga_progress": {
+                                "generation": progress.generation,
+                                "ga_solution": sol,
+                                "ga_fitness": fit,
+                                "elapsed": progress.elapsed
+                            }})
+                    last_solution = sol
+                result = {
                     "csp_assignment": assign,
+                    "csp_routes": csp.routes,
                     "ga_solution": sol,
                     "ga_fitness": fit
-                })
+                }
+                if payload.get("use_alns"):
+                    # ALNS, varsa son GA planından başlar
+                    result["alns_solution"], result["alns_fitness"] = ALNS(
+                        graph, **payload.get("alns_params", {})).run(last_solution or None)
+                await ws.send_json(result)
             else:
                 await ws.send_json({"error":"unknown_action"})
     except WebSocketDisconnect:
@@ -0,0 +1,70 @@
+import os
+import random
+import sys
+from typing import Dict, List, Optional
+import pytest
+
+# Testler depo kökünden paket olarak kurulmadan çalışır
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from drone_routing.data_generator import generate_drones, generate_deliveries, generate_no_fly_zones  # noqa: E402
+from drone_routing.graph import Graph  # noqa: E402
+
+
+def make_graph(drones: int = 4, deliveries: int = 20, zones: int = 0, seed: int = 1, **kwargs) -> Graph:
+    """Tohumlu küçük senaryo grafı; kwargs generate_deliveries'e geçer (ör. window_profile)."""
+    return Graph(generate_drones(drones, seed=seed),
+                 generate_deliveries(deliveries, seed=seed, **kwargs),
+                 generate_no_fly_zones(zones, seed=seed))
+
+
+@pytest.fixture
+def graph() -> Graph:
+    return make_graph()
+
+
+def route_violations(g: Graph, routes: Dict[int, List[int]], start: Optional[float] = None) -> List[tuple]:
+    """
+    (drone_id, delivery_id, neden) listesi: graph.earliest_start'ta (ya da start'ta) kalkan rotada
+    pencere, ağırlık ya da batarya (energy_matrix / hız > battery_wh) ihlalleri.
+    """
+    start = g.earliest_start if start is None else start
+    found = []
+    for drone_id, route in routes.items():
+        i = g.drone_idx(drone_id)
+        prev, now, used = i, start, 0.0
+        for dp_id in route:
+            j = g.delivery_idx(dp_id)
+            now += g.dist_matrix[prev, j] / g.speeds[i] / 60
+            used += g.energy_matrix[prev, j] / g.speeds[i]
+            if now > g.window_end[j] + 1e-9:
+                found.append((drone_id, dp_id, "window"))
+            if g.weights[j] > g.max_weights[i]:
+                found.append((drone_id, dp_id, "weight"))
+            if used > g.battery_wh[i] + 1e-9:
+                found.append((drone_id, dp_id, "battery"))
+            now = max(now, g.window_start[j])
+            prev = j
+    return found
+
+
+def route_distance(g: Graph, routes: Dict[int, List[int]]) -> float:
+    total = 0.0
+    for drone_id, route in routes.items():
+        path = [g.drone_idx(drone_id)] + [g.delivery_idx(dp_id) for dp_id in route]
+        total += float(g.dist_matrix[path[:-1], path[1:]].sum())
+    return total
+
+
+def random_feasible_routes(g: Graph, seed: int = 0) -> Dict[int, List[int]]:
+    """Teslimatları rastgele sırayla, olurluluğu bozmuyorsa rastgele bir drone rotasının sonuna ekler."""
+    rng = random.Random(seed)
+    routes: Dict[int, List[int]] = {dr.id: [] for dr in g.drones}
+    ids = [dp.id for dp in g.deliveries]
+    rng.shuffle(ids)
+    for dp_id in ids:
+        drone_id = rng.choice(g.drones).id
+        trial = {drone_id: routes[drone_id] + [dp_id]}
+        if not route_violations(g, trial):
+            routes[drone_id] = trial[drone_id]
+    return routes
@@ -0,0 +1,34 @@
+import random
+import pytest
+from drone_routing.alns import ALNS
+from conftest import make_graph, route_violations
+
+
+def route_energy(g, drone_id, route):
+    path = [g.drone_idx(drone_id)] + [g.delivery_idx(dp_id) for dp_id in route]
+    return float(g.energy_matrix[path[:-1], path[1:]].sum()) / g.speeds[g.drone_idx(drone_id)]
+
+
+@pytest.mark.parametrize("seed", [1, 2])
+def test_alns_routes_are_feasible_and_fitness_consistent(seed):
+    g = make_graph(drones=4, deliveries=40, seed=seed)
+    random.seed(seed)
+    solver = ALNS(g, iterations=150)
+    routes, fitness = solver.run()
+    delivered = sum(routes.values(), [])
+    assert len(delivered) == len(set(delivered))
+    assert not route_violations(g, routes)
+    energy = sum(route_energy(g, dr_id, route) for dr_id, route in routes.items() if route)
+    assert fitness == pytest.approx(solver.alpha * len(delivered) - solver.beta * energy)
+    assert solver.stats["run"]["iterations"] == 150
+
+
+def test_alns_is_reproducible_and_keeps_initial_plan_feasible():
+    g = make_graph(drones=3, deliveries=30, seed=5)
+    initial = {dr.id: [dp.id for dp in g.deliveries[k::3]] for k, dr in enumerate(g.drones)}
+    results = []
+    for _ in range(2):
+        random.seed(7)
+        results.append(ALNS(g, iterations=60).run(initial))
+    assert results[0] == results[1]
+    assert not route_violations(g, results[0][0])
@@ -0,0 +1,59 @@
+import itertools
+import numpy as np
+import pytest
+from drone_routing.assignment import AssignmentSolver, auction, hungarian
+from conftest import make_graph, route_violations
+
+
+def brute_force(cost):
+    n, m = cost.shape
+    return min(cost[np.arange(n), list(cols)].sum() for cols in itertools.permutations(range(m), n))
+
+
+@pytest.mark.parametrize("solver", [hungarian, auction])
+def test_matches_brute_force(solver):
+    rng = np.random.default_rng(0)
+    for _ in range(60):
+        n = int(rng.integers(1, 6))
+        m = int(rng.integers(n, 7))
+        cost = rng.uniform(0, 100, (n, m))
+        cols = solver(cost)
+        assert len(set(cols.tolist())) == n and ((0 <= cols) & (cols < m)).all()
+        assert cost[np.arange(n), cols].sum() == pytest.approx(brute_force(cost), abs=1e-6)
+
+
+@pytest.mark.parametrize("solver", [hungarian, auction])
+def test_rejects_more_rows_than_columns(solver):
+    with pytest.raises(ValueError):
+        solver(np.zeros((3, 2)))
+
+
+@pytest.mark.parametrize("method", ["hungarian", "auction"])
+@pytest.mark.parametrize("capacity", [1, 4, 30])
+def test_solver_routes_are_feasible(method, capacity):
+    g = make_graph(drones=10, deliveries=300, seed=1)
+    solver = AssignmentSolver(g, method=method, capacity=capacity, use_reachability=False)
+    assignment = solver.solve()
+    assert assignment == {dp_id: dr_id for dr_id, route in solver.routes.items() for dp_id in route}
+    assert all(len(route) <= capacity for route in solver.routes.values())
+    assert not route_violations(g, solver.routes)
+
+
+def test_hungarian_and_auction_agree_on_count():
+    g = make_graph(drones=6, deliveries=40, seed=3)
+    counts = [len(AssignmentSolver(g, method=method, use_reachability=False).solve())
+              for method in AssignmentSolver.METHODS]
+    assert counts[0] == counts[1]
+
+
+@pytest.mark.parametrize("options", [{"assignment_method": "greedy"}, {"assignment_capacity": 0}])
+def test_plan_rejects_invalid_assignment_options(options):
+    from fastapi.testclient import TestClient
+    import server
+    body = {"drones": [{"id": 1, "max_weight": 2.0, "battery": 5000, "speed": 10.0, "start_pos": [0, 0]}],
+            "deliveries": [{"id": 1, "pos": [10, 10], "weight": 1.0, "priority": 3, "time_window": ["09:00", "10:00"]}],
+            "no_fly_zones": []}
+    client = TestClient(server.app)
+    assert client.post("/plan", json={**body, **options}).status_code == 422
+    response = client.post("/plan", json={**body, "assignment_method": "auction", "assignment_capacity": 2})
+    assert response.status_code == 200 and response.json()["csp_assignment"] == {"1": 1}
@@ -0,0 +1,23 @@
+import pytest
+from drone_routing.csp import CSP
+from conftest import make_graph, route_violations
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_csp_routes_are_feasible(seed):
+    g = make_graph(drones=4, deliveries=30, zones=2, seed=seed)
+    csp = CSP(g)
+    assignment = csp.solve()
+    assert assignment == {dp_id: dr_id for dr_id, route in csp.routes.items() for dp_id in route}
+    assert csp.stats["delivered"] == len(assignment)
+    assert not route_violations(g, csp.routes)
+
+
+def test_complete_search_delivers_everything_that_fits():
+    g = make_graph(drones=2, deliveries=8, seed=6, window_profile="business")
+    csp = CSP(g, node_limit=100_000, time_limit=None, use_reachability=False)
+    csp.solve()
+    assert csp.stats["complete"]
+    # Geniş pencereler ve yeterli batarya: tüm teslimatlar tek bir sıralamaya sığar
+    assert csp.stats["delivered"] == len(g.deliveries)
+    assert not route_violations(g, csp.routes)
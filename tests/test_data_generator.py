@@ -0,0 +1,88 @@
+import random
+import numpy as np
+import pytest
+from drone_routing.data_generator import (
+    BLOCK, LAYOUTS, WINDOW_PROFILES, ZONE_PROFILES, DeliveryArrays, Layout, generate_deliveries,
+    generate_drones, generate_no_fly_zones, iter_deliveries, make_layout)
+
+
+def test_same_seed_same_scenario():
+    for gen in (generate_drones, generate_deliveries, generate_no_fly_zones):
+        assert gen(15, seed=4) == gen(15, seed=4)
+    assert generate_deliveries(15, seed=4) != generate_deliveries(15, seed=5)
+    random.seed(1)
+    first = generate_deliveries(10)
+    random.seed(1)
+    assert generate_deliveries(10) == first
+
+
+@pytest.mark.parametrize("chunk_size", [1000, BLOCK, BLOCK + 1, 3 * BLOCK])
+def test_iter_deliveries_independent_of_chunk_size(chunk_size):
+    m = BLOCK + 4500
+    reference = DeliveryArrays.concat(list(iter_deliveries(m, seed=2, layout="clustered")))
+    chunks = list(iter_deliveries(m, chunk_size=chunk_size, seed=2, layout="clustered"))
+    assert all(len(c) <= chunk_size for c in chunks)
+    merged = DeliveryArrays.concat(chunks)
+    for name in ("ids", "pos", "weight", "priority", "time_window"):
+        assert np.array_equal(getattr(merged, name), getattr(reference, name))
+    assert merged.ids.tolist() == list(range(1, m + 1))
+
+
+def test_generate_deliveries_matches_iterator():
+    chunks = iter_deliveries(50, chunk_size=7, layout="depot", window_profile="peak", seed=6)
+    assert DeliveryArrays.concat(list(chunks)).to_objects() == \
+        generate_deliveries(50, layout="depot", window_profile="peak", seed=6)
+
+
+@pytest.mark.parametrize("layout", LAYOUTS)
+@pytest.mark.parametrize("profile", list(WINDOW_PROFILES))
+def test_layouts_and_window_profiles(layout, profile):
+    area = (800.0, 500.0)
+    deliveries = generate_deliveries(200, area_size=area, layout=layout, window_profile=profile, seed=3)
+    pos = np.array([dp.pos for dp in deliveries])
+    assert len(deliveries) == 200 and (pos >= 0).all() and (pos <= area).all()
+    low, high = WINDOW_PROFILES[profile]
+    lengths = [we - ws for ws, we in (dp.time_window for dp in deliveries)]
+    assert low <= min(lengths) and max(lengths) <= high
+
+
+def test_depot_layout_shares_centers():
+    layout = make_layout("depot", seed=7, n_centers=3)
+    drones = generate_drones(6, layout=layout, seed=1)
+    centers = {tuple(np.round(c, 2)) for c in layout.centers}
+    assert {dr.start_pos for dr in drones} == centers
+    assert generate_drones(6, layout="depot", seed=7) != generate_drones(6, seed=7)
+
+
+@pytest.mark.parametrize("profile", list(ZONE_PROFILES))
+def test_zone_profiles(profile):
+    zones = generate_no_fly_zones(30, profile=profile, seed=2)
+    low, high = ZONE_PROFILES[profile]
+    for zone in zones:
+        xs, ys = zip(*zone.coordinates)
+        width = max(xs) - min(xs)
+        assert low * 1000 - 0.02 <= width <= high * 1000 + 0.02
+        assert zone.active_time[1] - zone.active_time[0] in (60, 120)
+
+
+def test_zone_profiles_scale_size_not_count():
+    areas = {}
+    for profile in ("small", "medium", "large"):
+        zones = generate_no_fly_zones(40, profile=profile, seed=3)
+        assert len(zones) == 40
+        areas[profile] = np.mean([(max(x for x, _ in z.coordinates) - min(x for x, _ in z.coordinates))
+                                  * (max(y for _, y in z.coordinates) - min(y for _, y in z.coordinates))
+                                  for z in zones])
+    assert areas["small"] < areas["medium"] < areas["large"]
+    assert generate_no_fly_zones(5, seed=1) == generate_no_fly_zones(5, profile="medium", seed=1)
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        Layout("grid")
+    with pytest.raises(ValueError):
+        generate_deliveries(5, window_profile="night", seed=1)
+    with pytest.raises(ValueError):
+        generate_no_fly_zones(5, profile="dense", seed=1)
+    with pytest.raises(ValueError):
+        next(iter_deliveries(5, chunk_size=0, seed=1))
@@ -0,0 +1,80 @@
+import dataclasses
+import itertools
+import random
+import numpy as np
+import pytest
+from drone_routing import tsptw
+from drone_routing.alns import ALNS
+from drone_routing.data_generator import generate_drones, generate_deliveries
+from drone_routing.energy_model import battery_capacity_wh, compute_energy
+from drone_routing.graph import Graph
+from drone_routing.local_search import LocalSearch
+from conftest import make_graph, random_feasible_routes, route_violations
+
+
+def tight_battery_graph(battery: int = 400, seed: int = 3) -> Graph:
+    """Bataryası birkaç teslimata yeten dronelar (400 mAh ~ 5.9 Wh)."""
+    drones = generate_drones(5, seed=seed)
+    for dr in drones:
+        dr.battery = battery
+    return Graph(drones, generate_deliveries(60, seed=seed), [])
+
+
+def test_compute_energy_vectorized_matches_scalar():
+    rng = np.random.default_rng(0)
+    dist, weight, speed, wind = rng.uniform(0, 500, 20), rng.uniform(0, 5, 20), rng.uniform(5, 15, 20), rng.uniform(0, 8, 20)
+    expected = [compute_energy(*args) for args in zip(dist.tolist(), weight.tolist(), speed.tolist(), wind.tolist())]
+    assert compute_energy(dist, weight, speed, wind) == pytest.approx(expected)
+    assert isinstance(compute_energy(100.0, 1.0, 10.0), float)
+
+
+def test_energy_matrix_tracks_incremental_updates():
+    g = make_graph(drones=3, deliveries=15)
+    g.add_delivery(dataclasses.replace(generate_deliveries(1, seed=9)[0], id=999))
+    g.remove_delivery(g.deliveries[0].id)
+    g.update_drone_position(g.drones[0].id, (12.0, 34.0))
+    fresh = Graph(g.drones, g.deliveries, g.no_fly_zones)
+    keys = [f"drone_{dr.id}" for dr in g.drones] + [f"dp_{dp.id}" for dp in g.deliveries]
+    idx = [g.store.index(k) for k in keys]
+    fresh_idx = [fresh.store.index(k) for k in keys]
+    assert g.energy_matrix[np.ix_(idx, idx)] == pytest.approx(fresh.energy_matrix[np.ix_(fresh_idx, fresh_idx)])
+    assert g.battery_wh[g.drone_idx(g.drones[0].id)] == pytest.approx(battery_capacity_wh(g.drones[0].battery))
+
+
+def test_tsptw_respects_battery():
+    rng = np.random.default_rng(1)
+    for _ in range(120):
+        n = int(rng.integers(1, 7))
+        pts = rng.uniform(0, 100, (n + 1, 2))
+        dist = np.hypot(*(pts[:, np.newaxis] - pts[np.newaxis]).transpose(2, 0, 1))
+        travel, energy = dist / 10, dist * rng.uniform(0.5, 1.5, (1, n + 1))
+        ws = rng.uniform(0, 20, n)
+        we = ws + rng.uniform(5, 60, n)
+        battery = float(rng.uniform(50, 400))
+        feasible = any(
+            tsptw.schedule(perm, travel.tolist(), ws.tolist(), we.tolist(), 0.0)[0] == 0
+            and tsptw.route_energy(perm, energy) <= battery
+            for perm in itertools.permutations(range(n)))
+        result = tsptw.solve_tsptw(travel, ws, we, 0.0, energy=energy, battery=battery)
+        if not feasible:
+            assert result.sequence == []
+        if result.sequence:
+            assert sorted(result.sequence) == list(range(n))
+            assert tsptw.route_energy(result.sequence, energy) <= battery + 1e-9
+            assert tsptw.schedule(result.sequence, travel.tolist(), ws.tolist(), we.tolist(), 0.0)[0] == 0
+
+
+def test_alns_stays_within_battery():
+    g = tight_battery_graph()
+    random.seed(0)
+    routes, _ = ALNS(g, iterations=100).run()
+    assert sum(map(len, routes.values())) > 0
+    assert not route_violations(g, routes)
+
+
+def test_local_search_stays_within_battery():
+    g = tight_battery_graph(battery=300, seed=4)
+    routes = random_feasible_routes(g, seed=4)
+    improved = LocalSearch(g).improve(routes)
+    assert not route_violations(g, improved)
+    assert sorted(sum(improved.values(), [])) == sorted(sum(routes.values(), []))
@@ -0,0 +1,211 @@
+import dataclasses
+import random
+import numpy as np
+import pytest
+from drone_routing.data_generator import generate_deliveries
+from drone_routing.ga import GeneticAlgorithm
+from conftest import make_graph
+
+
+@pytest.fixture
+def ga_graph():
+    return make_graph(drones=5, deliveries=30, zones=2, seed=3)
+
+
+@pytest.mark.parametrize("wind_speed", [0.0, 4.0])
+def test_evaluate_batch_matches_evaluate(ga_graph, wind_speed):
+    random.seed(0)
+    ga = GeneticAlgorithm(ga_graph, population_size=40, wind_speed=wind_speed)
+    population = ga._initialize_population() + [ga.greedy_solution(), {}]
+    expected = [ga._evaluate(ind) for ind in population]
+    assert ga.evaluate_batch(population) == pytest.approx(expected)
+    assert ga.evaluate_batch(ga.encode(population)) == pytest.approx(expected)
+
+
+def test_encode_decode_round_trip(ga_graph):
+    random.seed(1)
+    ga = GeneticAlgorithm(ga_graph, encoding="array")
+    for ind in ga._initialize_population():
+        decoded = ga.decode(ga.encode(ind)[0])
+        assert decoded == {dr.id: ind.get(dr.id, []) for dr in ga.drones}
+
+
+def test_two_opt_batch_never_lowers_fitness(ga_graph):
+    random.seed(2)
+    ga = GeneticAlgorithm(ga_graph, encoding="array")
+    genomes = ga.encode(ga._initialize_population())
+    before = ga.evaluate_batch(genomes)
+    improved = genomes.copy()
+    ga._two_opt_batch(improved)
+    assert (ga.evaluate_batch(improved) >= before - 1e-9).all()
+    n = len(ga.deliveries)
+    # Ters çevirme kesimleri ve drone başına teslimat kümesini korur
+    assert (improved[:, n:] == genomes[:, n:]).all()
+    for old, new in zip(genomes, improved):
+        for dr_id, route in ga.decode(old).items():
+            assert sorted(ga.decode(new)[dr_id]) == sorted(route)
+
+
+def test_array_run_returns_consistent_fitness(ga_graph):
+    random.seed(4)
+    ga = GeneticAlgorithm(ga_graph, generations=5, population_size=20, encoding="array")
+    solution, fitness = ga.run()
+    assert ga._evaluate(solution) == pytest.approx(fitness)
+
+
+@pytest.mark.parametrize("encoding", ["dict", "array"])
+def test_worker_pool_does_not_change_result(ga_graph, encoding):
+    results = []
+    for workers in (0, 2):
+        random.seed(5)
+        ga = GeneticAlgorithm(ga_graph, generations=4, population_size=16, encoding=encoding, workers=workers)
+        results.append(ga.run())
+    assert results[0] == results[1]
+
+
+@pytest.mark.parametrize("encoding", ["dict", "array"])
+@pytest.mark.parametrize("drones, deliveries", [(0, 6), (3, 0)])
+def test_run_without_drones_or_deliveries(encoding, drones, deliveries):
+    g = make_graph(drones=drones, deliveries=deliveries)
+    random.seed(0)
+    solution, fitness = GeneticAlgorithm(g, generations=3, population_size=6, encoding=encoding).run()
+    assert solution == {dr.id: [] for dr in g.drones} and fitness == 0.0
+
+
+def test_two_opt_batch_on_single_long_route():
+    g = make_graph(drones=1, deliveries=60, seed=7, window_profile="business")
+    random.seed(3)
+    ga = GeneticAlgorithm(g, encoding="array")
+    order = [dp.id for dp in g.deliveries]
+    genomes = ga.encode([{g.drones[0].id: order[k:] + order[:k]} for k in range(0, 60, 10)])
+    before = ga.evaluate_batch(genomes)
+    ga._two_opt_batch(genomes)
+    assert (ga.evaluate_batch(genomes) >= before - 1e-9).all()
+
+
+# --- Anytime çalıştırma ---
+
+@pytest.mark.parametrize("encoding", ["dict", "array"])
+def test_iter_run_best_never_decreases(ga_graph, encoding):
+    random.seed(6)
+    ga = GeneticAlgorithm(ga_graph, generations=12, population_size=16, encoding=encoding)
+    steps = list(ga.iter_run())
+    assert [p.generation for p in steps] == list(range(12))
+    fitness = [p.best_fitness for p in steps]
+    assert fitness == sorted(fitness)
+    assert [p.improved for p in steps[1:]] == [b > a for a, b in zip(fitness, fitness[1:])]
+    assert all(ga._evaluate(p.best_solution) == pytest.approx(p.best_fitness) for p in steps)
+    assert [p.stop_reason for p in steps] == [None] * 11 + ["generations"]
+
+
+def test_iter_run_stops_on_time_limit(ga_graph):
+    random.seed(7)
+    ga = GeneticAlgorithm(ga_graph, generations=100_000, population_size=16)
+    steps = list(ga.iter_run(time_limit=0.3))
+    assert steps[-1].stop_reason == "time_limit" and len(steps) < 100_000
+    # önceki adımda bir nesil daha sığıyordu, son adımda sığmıyor
+    assert steps[-2].elapsed + steps[-2].generation_time <= 0.3
+    assert steps[-1].elapsed + steps[-1].generation_time > 0.3
+
+
+def test_iter_run_stops_on_patience(ga_graph):
+    random.seed(8)
+    ga = GeneticAlgorithm(ga_graph, generations=100_000, population_size=8, patience=3)
+    steps = list(ga.iter_run())
+    assert steps[-1].stop_reason == "patience"
+    assert not any(p.improved for p in steps[-3:]) and steps[-4].improved
+
+
+def test_run_stops_when_callback_returns_false(ga_graph):
+    random.seed(9)
+    seen = []
+    ga = GeneticAlgorithm(ga_graph, generations=50, population_size=16)
+    solution, fitness = ga.run(callback=lambda p: seen.append(p) or p.generation < 2)
+    assert [p.generation for p in seen] == [0, 1, 2]
+    assert seen[-1].stop_reason == "callback"
+    assert (solution, fitness) == (seen[-1].best_solution, seen[-1].best_fitness)
+
+
+# --- Sıcak başlangıç ---
+
+def assert_valid_genome(ga, individual, check_weight=True):
+    assert set(individual) == {dr.id for dr in ga.drones}
+    assigned = [dp_id for route in individual.values() for dp_id in route]
+    assert len(assigned) == len(set(assigned)) and set(assigned) <= set(ga._dp_idx)
+    weights = {dp.id: dp.weight for dp in ga.deliveries}
+    for dr in ga.drones:
+        assert not check_weight or all(weights[dp_id] <= dr.max_weight for dp_id in individual[dr.id])
+
+
+def test_repair_seed_fixes_invalid_plans(ga_graph):
+    ga = GeneticAlgorithm(ga_graph)
+    light = min(ga.drones, key=lambda dr: dr.max_weight)
+    heavy = [dp.id for dp in ga.deliveries if dp.weight > light.max_weight]
+    ids = [dp.id for dp in ga.deliveries]
+    assert heavy
+    seed = {light.id: heavy[:2] + ids[:3] + [ids[0], 99_999],
+            ga.drones[1].id: ids[:2] + ids[5:8],
+            12_345: ids[8:10]}
+    repaired = ga.repair_seed(seed)
+    assert_valid_genome(ga, repaired)
+    assert not set(heavy) & set(repaired[light.id])
+    # tohumun geçerli atamaları (ilk görülen, kapasiteye uyan) aynı drone'da ve aynı sırada kalır
+    weights = {dp.id: dp.weight for dp in ga.deliveries}
+    capacity = {dr.id: dr.max_weight for dr in ga.drones}
+    seen = set()
+    for dr_id, route in seed.items():
+        if dr_id not in capacity:
+            continue
+        kept = [dp_id for dp_id in route if dp_id in weights and dp_id not in seen
+                and weights[dp_id] <= capacity[dr_id] and not seen.add(dp_id)]
+        assert [dp_id for dp_id in repaired[dr_id] if dp_id in kept] == kept
+    assert_valid_genome(ga, ga.repair_seed({dp_id: light.id for dp_id in ids[:6]}))
+
+
+@pytest.mark.parametrize("encoding", ["dict", "array"])
+def test_seeded_run_starts_no_worse_than_seed(ga_graph, encoding):
+    random.seed(10)
+    ga = GeneticAlgorithm(ga_graph, generations=3, population_size=12, encoding=encoding)
+    seed = ga.greedy_solution()
+    assert ga.repair_seed(seed) == seed
+    population = ga._seeded_population([seed])
+    assert len(population) == 12 and population[0] == seed
+    for individual in population:
+        # pertürbasyonlar (_mutate) kapasiteyi denetlemez; yalnızca tekrar / bilinmeyen teslimat olmamalı
+        assert_valid_genome(ga, individual, check_weight=False)
+    first = next(ga.iter_run(seeds=[seed]))
+    assert first.best_fitness >= ga._evaluate(seed) - 1e-9
+
+
+# --- Rota önbellekleri ---
+
+def test_route_cache_hits_and_graph_mutation_invalidates():
+    g = make_graph(drones=3, deliveries=20, seed=11)
+    random.seed(12)
+    ga = GeneticAlgorithm(g, population_size=10)
+    population = ga._initialize_population()
+    first = [ga._evaluate(ind) for ind in population]
+    hits = ga.cache_stats()["hits"]
+    assert [ga._evaluate(ind) for ind in population] == first
+    assert ga.cache_stats()["hits"] > hits
+    ind = {dr_id: route[:] for dr_id, route in population[0].items()}
+    ga._apply_local_search(ind)
+    size = len(ga.improved_cache)
+    again = {dr_id: route[:] for dr_id, route in population[0].items()}
+    ga._apply_local_search(again)
+    assert again == ind and len(ga.improved_cache) == size and size > 0
+
+    # Mutasyonlardan sonra sonuçlar sıfırdan kurulan GA ile aynı olmalı (eski katkılar kullanılmaz)
+    extra = dataclasses.replace(generate_deliveries(1, seed=5)[0], id=500)
+    g.add_delivery(extra)
+    g.update_drone_position(g.drones[0].id, (900.0, 900.0))
+    removed = g.deliveries[0].id
+    g.remove_delivery(removed)
+    assert len(ga.route_cache) > 0
+    fresh = GeneticAlgorithm(g, population_size=10)
+    for individual in population:
+        individual = {dr_id: [dp_id for dp_id in route if dp_id != removed] for dr_id, route in individual.items()}
+        individual[g.drones[1].id].append(500)
+        assert ga._evaluate(individual) == pytest.approx(fresh._evaluate(individual))
+        assert ga.evaluate_batch([individual]) == pytest.approx([fresh._evaluate(individual)])
+    assert 500 in ga._dp_idx and removed not in ga._dp_idx
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+from conftest import make_graph
+
+
+def path_cost(g, path):
+    idx = [g.store.index(key) for key in path]
+    return float(g.cost_matrix[idx[:-1], idx[1:]].sum())
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_search_from_matches_find_path(seed, monkeypatch):
+    g = make_graph(drones=3, deliveries=30, zones=3, seed=seed)
+    searches = {dr.id: g.search_from(f"drone_{dr.id}") for dr in g.drones}
+    informed = {(dr.id, dp.id): g.find_path(f"drone_{dr.id}", f"dp_{dp.id}")[1]
+                for dr in g.drones for dp in g.deliveries}
+    # Tahminsiz A* aynı kurallarla tam etiket-yerleştirme aramasıdır: maliyetler birebir aynı olmalı
+    monkeypatch.setattr(g, "_heuristic_many", lambda rows, j, t_depart=None, t_arrive=None: np.zeros(len(rows)))
+    for dr in g.drones:
+        g_score, _, came_from = searches[dr.id]
+        for dp in g.deliveries:
+            key = f"dp_{dp.id}"
+            path, cost = g.find_path(f"drone_{dr.id}", key)
+            expected = g_score[g.delivery_idx(dp.id)]
+            assert cost == pytest.approx(expected) if np.isfinite(cost) else not np.isfinite(expected)
+            assert informed[dr.id, dp.id] >= expected - 1e-9
+            if np.isfinite(expected):
+                found = g.extract_path(came_from, key)
+                assert found[0] == f"drone_{dr.id}" and found[-1] == key
+                assert path_cost(g, found) == pytest.approx(expected)
+
+
+def test_reachable_deliveries_uses_search_costs():
+    g = make_graph(drones=2, deliveries=25, seed=4)
+    for dr in g.drones:
+        g_score, _, _ = g.search_from(f"drone_{dr.id}")
+        reach = g.reachable_deliveries(dr.id)
+        assert reach == {dp.id: pytest.approx(g_score[g.delivery_idx(dp.id)])
+                         for dp in g.deliveries if np.isfinite(g_score[g.delivery_idx(dp.id)])}
+    with pytest.raises(ValueError):
+        g.search_from(f"dp_{g.deliveries[0].id}")
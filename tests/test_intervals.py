@@ -0,0 +1,76 @@
+import random
+import numpy as np
+import pytest
+from drone_routing.graph import Graph
+from drone_routing.intervals import IntervalTree
+from drone_routing.models import DeliveryPoint, Drone, NoFlyZone, split_window
+from conftest import make_graph
+
+
+def test_query_matches_brute_force():
+    rng = random.Random(0)
+    for _ in range(50):
+        intervals = []
+        for k in range(rng.randint(0, 30)):
+            start = rng.uniform(0, 100)
+            intervals.append((start, start + rng.uniform(0, 20), k))
+        tree = IntervalTree(intervals)
+        assert len(tree) == len(intervals)
+        for _ in range(20):
+            lo = rng.uniform(-10, 110)
+            hi = lo + rng.uniform(0, 30)
+            expected = {k for start, end, k in intervals if start <= hi and end >= lo}
+            assert sorted(tree.query(lo, hi)) == sorted(expected)
+
+
+def test_rejects_reversed_interval():
+    with pytest.raises(ValueError):
+        IntervalTree([(0, 10, "a"), (22 * 60, 2 * 60, "b")])
+
+
+def test_split_window():
+    assert split_window((540, 600)) == [(540, 600)]
+    assert split_window((22 * 60, 2 * 60)) == [(-120, 120), (1320, 1560)]
+
+
+def corridor_graph(windows):
+    """(0, 500) -> (1000, 500) uçuşunu kesen, verilen aktif pencereli aynı konumda bölgeler."""
+    drone = Drone(id=1, max_weight=5.0, battery=10000, speed=10.0, start_pos=(0.0, 500.0))
+    dp = DeliveryPoint(id=1, pos=(1000.0, 500.0), weight=1.0, priority=3, time_window=(0, 3000))
+    zones = [NoFlyZone(id=k + 1, coordinates=[(400, 400), (600, 400), (600, 600), (400, 600)], active_time=w)
+             for k, w in enumerate(windows)]
+    return Graph([drone], [dp], zones)
+
+
+@pytest.mark.parametrize("depart, active", [
+    (500, [False, False]), (549, [True, False]), (640, [True, False]), (700, [False, False]),
+    (60, [False, True]), (1350, [False, True]), (1500, [False, True]), (1570, [False, False]),
+])
+def test_heuristic_counts_only_active_zones(depart, active):
+    # ikinci bölge gece yarısını aşar (22:00-02:00)
+    g = corridor_graph([(550, 650), ("22:00", "02:00")])
+    i, j = g.drone_idx(1), g.delivery_idx(1)
+    base = g.dist_matrix[i, j]
+    t0 = np.array([float(depart)])
+    t1 = t0 + base / 10.0 / 60
+    h = g._heuristic_many(np.array([i]), j, t0, t1)[0]
+    assert h == pytest.approx(base + g.NO_FLY_PENALTY * sum(active))
+    assert g.heuristic("drone_1", "dp_1", depart_time=float(depart)) == pytest.approx(h)
+
+
+def test_heuristic_many_matches_per_row_brute_force():
+    g = make_graph(drones=3, deliveries=30, zones=6, seed=5)
+    rng = np.random.default_rng(0)
+    rows = np.arange(len(g.store))
+    for j in np.flatnonzero(g.is_delivery)[:10].tolist():
+        t0 = rng.uniform(8 * 60, 18 * 60, len(rows))
+        t1 = t0 + rng.uniform(0, 30, len(rows))
+        h = g._heuristic_many(rows, j, t0, t1)
+        for r in rows.tolist():
+            crossed = g.crossing.crossing_bits(r, j)
+            count = 0
+            for k, zone in enumerate(g.no_fly_zones):
+                slot = g.crossing.zone_slots[k]
+                on = any(start <= t1[r] and end >= t0[r] for start, end in split_window(zone.active_time))
+                count += bool((crossed >> slot) & 1) and on
+            assert h[r] == pytest.approx(g.dist_matrix[r, j] + g.NO_FLY_PENALTY * count)
@@ -0,0 +1,54 @@
+import random
+import pytest
+from drone_routing.ga import GeneticAlgorithm
+from drone_routing.islands import IslandModel
+from conftest import make_graph
+
+
+@pytest.fixture(scope="module")
+def island_graph():
+    return make_graph(drones=4, deliveries=25, seed=2)
+
+
+@pytest.mark.parametrize("topology", ["ring", "random"])
+@pytest.mark.parametrize("encoding", ["dict", "array"])
+def test_result_is_best_island(island_graph, topology, encoding):
+    random.seed(1)
+    model = IslandModel(island_graph, islands=3, generations=6, migration_interval=2, topology=topology,
+                        population_size=10, encoding=encoding)
+    best, fitness, stats = model.run()
+    assert fitness == max(s["best_fitness"] for s in stats)
+    assert GeneticAlgorithm(island_graph)._evaluate(best) == pytest.approx(fitness)
+    for s in stats:
+        assert s["generations"] == 6 and len(s["history"]) == 3
+        # adalar en iyi bireylerini tutar: geçmiş azalmaz
+        assert s["history"] == sorted(s["history"])
+        assert 0 < s["elapsed"] <= s["wall_time"]
+    assert len({s["elapsed"] for s in stats}) == len(stats)
+
+
+def test_migration_is_reproducible(island_graph):
+    runs = []
+    for _ in range(2):
+        random.seed(4)
+        runs.append(IslandModel(island_graph, islands=2, generations=4, migration_interval=1,
+                                topology="random", population_size=8).run()[:2])
+    assert runs[0] == runs[1]
+
+
+def test_time_limit_stops_islands_between_generations(island_graph):
+    random.seed(2)
+    model = IslandModel(island_graph, islands=2, generations=10_000, migration_interval=10_000,
+                        time_limit=0.5, population_size=10)
+    _, _, stats = model.run()
+    for s in stats:
+        # tek göç dönemi 10000 nesil isterdi; süre sınırı dönemin içinde uygulanır
+        assert 0 < s["generations"] < 10_000
+        assert s["wall_time"] < 5.0
+
+
+def test_invalid_arguments(island_graph):
+    with pytest.raises(ValueError):
+        IslandModel(island_graph, topology="star")
+    with pytest.raises(ValueError):
+        IslandModel(island_graph, islands=2, island_params=[{}])
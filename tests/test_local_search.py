@@ -0,0 +1,23 @@
+import pytest
+from drone_routing.local_search import LocalSearch
+from conftest import make_graph, random_feasible_routes, route_distance, route_violations
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_improve_keeps_routes_feasible_and_shortens(seed):
+    g = make_graph(drones=4, deliveries=40, seed=seed, window_profile="business")
+    routes = random_feasible_routes(g, seed)
+    assert not route_violations(g, routes)
+    improved = LocalSearch(g).improve(routes)
+    assert not route_violations(g, improved)
+    assert sorted(sum(improved.values(), [])) == sorted(sum(routes.values(), []))
+    assert route_distance(g, improved) <= route_distance(g, routes) + 1e-9
+
+
+def test_improve_route_stays_on_one_drone():
+    g = make_graph(drones=2, deliveries=25, seed=4, window_profile="business")
+    routes = random_feasible_routes(g, 4)
+    drone_id = max(routes, key=lambda k: len(routes[k]))
+    route = LocalSearch(g).improve_route(drone_id, routes[drone_id])
+    assert sorted(route) == sorted(routes[drone_id])
+    assert not route_violations(g, {drone_id: route})
@@ -0,0 +1,23 @@
+import dataclasses
+import pytest
+from drone_routing.models import DeliveryPoint, NoFlyZone, format_time, format_window, parse_time, parse_window
+
+
+def test_zone_is_immutable_and_hashable():
+    zone = NoFlyZone(id=1, coordinates=[[0, 0], [10, 0], [10, 10]], active_time=("09:30", "11:00"))
+    assert zone.coordinates == ((0.0, 0.0), (10.0, 0.0), (10.0, 10.0))
+    assert zone.active_time == (570, 660)
+    same = NoFlyZone(id=1, coordinates=((0, 0), (10, 0), (10, 10)), active_time=(570, 660))
+    assert zone == same and hash(zone) == hash(same) and len({zone, same}) == 1
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        zone.coordinates = ()
+    dp = DeliveryPoint(id=1, pos=[1.0, 2.0], weight=1.0, priority=3, time_window=("09:00", "10:00"))
+    assert dp.pos == (1.0, 2.0) and hash(dp) == hash(dataclasses.replace(dp))
+
+
+def test_time_formatting_round_trip():
+    for text in ("00:00", "09:05", "13:30", "23:59"):
+        assert format_time(parse_time(text)) == text
+    assert parse_window(("09:00", 600)) == (540, 600)
+    assert format_window((540, 600)) == ("09:00", "10:00")
+    assert format_time(25 * 60 + 15) == "01:15"
@@ -0,0 +1,52 @@
+import dataclasses
+import random
+import numpy as np
+from drone_routing.data_generator import generate_deliveries, generate_no_fly_zones
+from conftest import make_graph
+
+
+def brute_crossings(g, i, j):
+    a, b = tuple(g.positions[i]), tuple(g.positions[j])
+    return sum(g._segment_crosses_polygon(a, b, z.coordinates) for z in g.no_fly_zones)
+
+
+def check_pairs(g, rng):
+    n = len(g.node_ids)
+    for _ in range(30):
+        i, j = rng.randrange(n), rng.randrange(n)
+        assert g.crossing.crossing_bits(i, j).bit_count() == brute_crossings(g, i, j)
+    j = rng.randrange(n)
+    counts = g.crossing.crossing_counts(np.arange(n), j)
+    assert counts.tolist() == [brute_crossings(g, i, j) for i in range(n)]
+
+
+def test_rows_are_allocated_on_first_query():
+    g = make_graph(drones=3, deliveries=40, zones=5)
+    assert not g.crossing.known
+    g.crossing.crossing_counts(np.arange(len(g.node_ids)), 0)
+    assert list(g.crossing.known) == [0]
+
+
+def test_crossings_match_brute_force_under_updates():
+    rng = random.Random(0)
+    g = make_graph(drones=4, deliveries=25, zones=6)
+    pool = generate_no_fly_zones(10, seed=7)
+    next_id = 1000
+    check_pairs(g, rng)
+    for step in range(120):
+        op = rng.randrange(5)
+        if op == 0:
+            dp = dataclasses.replace(generate_deliveries(1, seed=step)[0], id=next_id)
+            next_id += 1
+            g.add_delivery(dp)
+        elif op == 1 and len(g.deliveries) > 5:
+            g.remove_delivery(rng.choice(g.deliveries).id)
+        elif op == 2:
+            g.update_drone_position(rng.choice(g.drones).id, (rng.uniform(0, 1000), rng.uniform(0, 1000)))
+        elif op == 3:
+            zone = rng.choice(pool)
+            if all(z.id != zone.id for z in g.no_fly_zones):
+                g.add_zone(zone)
+        elif op == 4 and g.no_fly_zones:
+            g.remove_zone(rng.choice(g.no_fly_zones).id)
+        check_pairs(g, rng)
@@ -0,0 +1,164 @@
+import json
+import struct
+import numpy as np
+import pytest
+from drone_routing.data_generator import generate_drones, generate_no_fly_zones, iter_deliveries
+from drone_routing.storage import MAGIC, _align, load_scenario, save_graph, save_scenario
+from conftest import make_graph
+
+
+def rewrite(src, dst, arrays=None, values=None):
+    """src dosyasını dst'ye başlık sütunlarını (arrays: ad -> alanlar) ve değerleri (values: ad -> dizi) değiştirerek yazar."""
+    data = open(src, "rb").read()
+    (header_len,) = struct.unpack("<Q", data[8:16])
+    header = json.loads(data[16:16 + header_len])
+    body = bytearray(data[_align(16 + header_len):])
+    for name, arr in (values or {}).items():
+        spec = header["arrays"][name]
+        raw = np.asarray(arr, dtype=spec["dtype"]).tobytes()
+        body[spec["offset"]:spec["offset"] + len(raw)] = raw
+    for name, fields in (arrays or {}).items():
+        header["arrays"].setdefault(name, {"offset": 0}).update(fields)
+    raw = json.dumps(header).encode()
+    with open(dst, "wb") as f:
+        f.write(MAGIC + struct.pack("<Q", len(raw)) + raw)
+        f.seek(_align(16 + len(raw)))
+        f.write(bytes(body))
+    return str(dst)
+
+
+@pytest.fixture
+def scenario_path(tmp_path):
+    g = make_graph(drones=3, deliveries=12, zones=2, seed=4)
+    routes = {g.drones[0].id: [dp.id for dp in g.deliveries[:3]], g.drones[1].id: []}
+    path = str(tmp_path / "scenario.drs")
+    save_graph(path, g, routes, meta={"seed": 4})
+    return g, routes, path
+
+
+@pytest.mark.parametrize("mmap", [True, False])
+def test_round_trip(scenario_path, mmap):
+    g, routes, path = scenario_path
+    scenario = load_scenario(path, mmap=mmap)
+    assert scenario.drones() == g.drones
+    assert scenario.deliveries() == g.deliveries
+    assert scenario.zones() == g.no_fly_zones
+    assert scenario.routes == routes
+    assert scenario.meta == {"seed": 4} and len(scenario) == 12
+    sub = scenario.to_graph(slice(5))
+    assert sub.deliveries == g.deliveries[:5] and sub.drones == g.drones
+
+
+def test_delivery_arrays_without_routes(tmp_path):
+    arrays = next(iter_deliveries(300, seed=2))
+    path = str(tmp_path / "big.drs")
+    save_scenario(path, generate_drones(2, seed=2), arrays, generate_no_fly_zones(0, seed=2))
+    scenario = load_scenario(path)
+    assert scenario.routes is None and scenario.zones() == []
+    loaded = scenario.delivery_arrays(slice(100, 200))
+    assert np.array_equal(loaded.pos, arrays.pos[100:200])
+    assert np.array_equal(loaded.time_window, arrays.time_window[100:200])
+
+
+def test_rejects_bad_magic_and_truncated_files(scenario_path, tmp_path):
+    _, _, path = scenario_path
+    data = open(path, "rb").read()
+    bad = tmp_path / "bad.drs"
+    for content in (b"NOTDRS00" + data[8:], data[:12], data[:len(data) - 64]):
+        bad.write_bytes(content)
+        with pytest.raises(ValueError):
+            load_scenario(str(bad))
+
+
+def test_rejects_corrupt_header(tmp_path):
+    path = tmp_path / "corrupt.drs"
+    for header in ([1, 2], {"format": 1, "arrays": {"dp_id": {"dtype": "<i8"}}}, {"format": 1, "arrays": {}}):
+        raw = json.dumps(header).encode()
+        path.write_bytes(MAGIC + struct.pack("<Q", len(raw)) + raw)
+        with pytest.raises(ValueError):
+            load_scenario(str(path))
+
+
+CORRUPT = {
+    "object_dtype": {"dp_id": {"dtype": "|O"}},
+    "text_window": {"dp_window": {"dtype": "<U4"}},
+    "float_offsets": {"zone_offsets": {"dtype": "<f8"}},
+    "big_endian": {"dp_weight": {"dtype": ">f8"}},
+    "flat_positions": {"dp_pos": {"shape": [10]}},
+    "three_columns": {"drone_pos": {"shape": [3, 3]}},
+    "short_positions": {"dp_pos": {"shape": [2, 2]}},
+    "short_zone_active": {"zone_active": {"shape": [1, 2]}},
+    "short_offsets": {"zone_offsets": {"shape": [2]}},
+    "unknown_column": {"extra": {"dtype": "<i8", "shape": [1]}},
+    "partial_routes": {"route_stops": {"dtype": "<i8", "shape": [0]}},
+}
+
+
+@pytest.mark.parametrize("case", list(CORRUPT))
+def test_rejects_schema_mismatch(case, tmp_path):
+    g = make_graph(drones=3, deliveries=5, zones=2, seed=4)
+    path = str(tmp_path / "ok.drs")
+    # partial_routes: planı olmayan dosyaya tek başına route_stops eklenir
+    save_graph(path, g, None if case == "partial_routes" else {g.drones[0].id: [g.deliveries[0].id]})
+    bad = rewrite(path, tmp_path / "bad.drs", arrays=CORRUPT[case])
+    with pytest.raises(ValueError):
+        load_scenario(bad)
+
+
+@pytest.mark.parametrize("offsets", [[0, 4, 3], [0, 2, 6], [1, 4, 8], [0, 4, 9]])
+def test_rejects_bad_csr_offsets(offsets, tmp_path):
+    g = make_graph(drones=2, deliveries=4, zones=2, seed=4)
+    path = str(tmp_path / "ok.drs")
+    save_graph(path, g)
+    assert load_scenario(path).arrays["zone_offsets"].tolist() == [0, 4, 8]
+    with pytest.raises(ValueError):
+        load_scenario(rewrite(path, tmp_path / "bad.drs", values={"zone_offsets": offsets}))
+
+
+def test_rejects_bad_route_offsets(scenario_path, tmp_path):
+    _, _, path = scenario_path
+    with pytest.raises(ValueError):
+        load_scenario(rewrite(path, tmp_path / "bad.drs", values={"route_offsets": [0, 5, 3]}))
+
+
+class TestUpload:
+    @pytest.fixture
+    def client(self):
+        from fastapi.testclient import TestClient
+        import server
+        return TestClient(server.app)
+
+    def upload(self, client, path, **form):
+        with open(path, "rb") as f:
+            return client.post("/plan/upload", files={"file": ("s.drs", f)}, data=form)
+
+    def test_plans_uploaded_scenario(self, client, scenario_path):
+        g, _, path = scenario_path
+        response = self.upload(client, path, max_deliveries="6")
+        assert response.status_code == 200
+        routes = response.json()["csp_routes"]
+        assert {int(dr_id) for dr_id in routes} <= {dr.id for dr in g.drones}
+        assert {dp_id for route in routes.values() for dp_id in route} <= {dp.id for dp in g.deliveries[:6]}
+
+    def test_rejects_bad_requests(self, client, scenario_path, tmp_path, monkeypatch):
+        import server
+        _, _, path = scenario_path
+        assert self.upload(client, path, options='{"use_csp": "maybe"}').status_code == 400
+        assert self.upload(client, path, options="not json").status_code == 400
+        assert self.upload(client, path, max_deliveries="-1").status_code == 400
+        truncated = tmp_path / "truncated.drs"
+        truncated.write_bytes(open(path, "rb").read()[:100])
+        assert self.upload(client, str(truncated)).status_code == 400
+        for case in ("object_dtype", "text_window", "float_offsets", "flat_positions", "short_positions"):
+            crafted = rewrite(path, tmp_path / f"{case}.drs", arrays=CORRUPT[case])
+            assert self.upload(client, crafted).status_code == 400
+        monkeypatch.setattr(server, "MAX_UPLOAD_NODES", 10)
+        assert self.upload(client, path).status_code == 400
+        assert self.upload(client, path, max_deliveries="7").status_code == 200
+
+    def test_rejects_oversized_upload(self, client, scenario_path, monkeypatch):
+        import server
+        _, _, path = scenario_path
+        monkeypatch.setattr(server, "UPLOAD_CHUNK", 256)
+        monkeypatch.setattr(server, "MAX_UPLOAD_BYTES", 1000)
+        assert self.upload(client, path).status_code == 413
@@ -0,0 +1,81 @@
+import itertools
+import numpy as np
+import pytest
+from drone_routing import tsptw
+from conftest import make_graph
+
+
+def random_instance(rng, n, slack=(5, 60)):
+    pts = rng.uniform(0, 100, (n + 1, 2))
+    dist = np.hypot(*(pts[:, np.newaxis] - pts[np.newaxis]).transpose(2, 0, 1))
+    ws = rng.uniform(0, 20, n)
+    we = ws + rng.uniform(*slack, n)
+    return dist / 10, ws, we
+
+
+def best_by_enumeration(travel, ws, we):
+    """Pencere ihlalsiz sıralar arasında en erken bitiş; hiç yoksa None."""
+    best = None
+    for perm in itertools.permutations(range(len(ws))):
+        late, end, _, _ = tsptw.schedule(perm, travel.tolist(), ws.tolist(), we.tolist(), 0.0)
+        if late == 0 and (best is None or end < best):
+            best = end
+    return best
+
+
+def test_exact_matches_enumeration():
+    rng = np.random.default_rng(0)
+    for _ in range(150):
+        n = int(rng.integers(1, 7))
+        travel, ws, we = random_instance(rng, n)
+        best = best_by_enumeration(travel, ws, we)
+        result = tsptw.solve_tsptw(travel, ws, we, 0.0)
+        assert result.mode == "exact"
+        if best is None:
+            assert result.sequence == []
+            continue
+        assert sorted(result.sequence) == list(range(n))
+        late, end, _, _ = tsptw.schedule(result.sequence, travel.tolist(), ws.tolist(), we.tolist(), 0.0)
+        assert late == 0
+        assert end == pytest.approx(best)
+
+
+def test_heuristic_returns_feasible_tour():
+    rng = np.random.default_rng(1)
+    for _ in range(20):
+        travel, ws, we = random_instance(rng, 12, slack=(200, 400))
+        result = tsptw.solve_tsptw(travel, ws, we, 0.0, exact_max_stops=0, time_budget=0.2)
+        assert result.mode == "heuristic"
+        assert sorted(result.sequence) == list(range(12))
+        late, _, total_travel, _ = tsptw.schedule(result.sequence, travel.tolist(), ws.tolist(), we.tolist(), 0.0)
+        assert late == 0
+        assert result.travel == pytest.approx(total_travel)
+
+
+def test_graph_solve_tsptw_returns_delivery_ids():
+    g = make_graph(drones=2, deliveries=8)
+    ids = [dp.id for dp in g.deliveries[:5]]
+    result = g.solve_tsptw(g.drones[0].id, ids)
+    assert sorted(result.sequence) == sorted(ids) or result.sequence == []
+    assert g.solve_tsptw(g.drones[0].id, []).sequence == []
+
+
+def test_cache_survives_zone_changes_and_drops_removed_deliveries():
+    g = make_graph(drones=2, deliveries=10, zones=2)
+    drone_id, ids = g.drones[0].id, [dp.id for dp in g.deliveries[:4]]
+    first = g.solve_tsptw(drone_id, ids)
+    g.add_zone(make_graph(zones=4, seed=9).no_fly_zones[3])
+    assert g.solve_tsptw(drone_id, ids).sequence == first.sequence
+    assert g.tsptw_cache.stats()["hits"] == 1
+    g.remove_delivery(ids[0])
+    assert len(g.tsptw_cache) == 0
+
+
+def test_fleet_matches_single_drone_solves():
+    g = make_graph(drones=3, deliveries=12)
+    assignment = {dr.id: [dp.id for dp in g.deliveries[k::3]] for k, dr in enumerate(g.drones)}
+    fleet = g.solve_fleet_tsptw(assignment, max_workers=1)
+    assert list(fleet) == list(assignment)
+    fresh = make_graph(drones=3, deliveries=12)
+    for drone_id, dp_ids in assignment.items():
+        assert fleet[drone_id].sequence == fresh.solve_tsptw(drone_id, dp_ids).sequence
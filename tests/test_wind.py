@@ -0,0 +1,118 @@
+import random
+import numpy as np
+import pytest
+from drone_routing.ga import GeneticAlgorithm
+from drone_routing.wind import WindField
+from conftest import make_graph
+
+
+def linear_field():
+    """u = 1 + 0.01 x, v = -2 + 0.02 y: çift doğrusal enterpolasyon bunu tam üretir."""
+    xs, ys = np.meshgrid(np.arange(11) * 100.0, np.arange(6) * 100.0)
+    return WindField(1 + 0.01 * xs, -2 + 0.02 * ys, cell_size=100.0)
+
+
+def test_sample_interpolates_linear_field_and_clips():
+    field = linear_field()
+    points = np.array([[0.0, 0.0], [150.0, 250.0], [999.0, 499.0], [-50.0, 800.0]])
+    expected_x = np.clip(points[:, 0], 0, 1000)
+    expected_y = np.clip(points[:, 1], 0, 500)
+    wind = field.sample(points)
+    assert wind[:, 0] == pytest.approx(1 + 0.01 * expected_x)
+    assert wind[:, 1] == pytest.approx(-2 + 0.02 * expected_y)
+    assert field.sample(points.reshape(2, 2, 2)).shape == (2, 2, 2)
+
+
+def test_calm_field_matches_graph_tables():
+    g = make_graph(drones=3, deliveries=10)
+    travel, energy = WindField.uniform(0.0).edge_tables(g, 10.0)
+    assert travel == pytest.approx(g.dist_matrix / 10.0 / 60)
+    assert energy == pytest.approx(g.energy_matrix / 10.0)
+
+
+def test_tailwind_is_faster_than_headwind():
+    field = WindField.uniform(4.0, direction=0.0)
+    along, magnitude = field.segment_wind(np.array([[100.0, 500.0], [900.0, 500.0]]),
+                                          np.array([[900.0, 500.0], [100.0, 500.0]]))
+    assert along[0] == pytest.approx(4.0) and along[1] == pytest.approx(-4.0)
+    assert magnitude == pytest.approx(4.0)
+
+
+@pytest.mark.parametrize("suffix", [".npz", ".json"])
+def test_save_load_round_trip(tmp_path, suffix):
+    field = WindField.generate(seed=3, bounds=(0.0, 0.0, 500.0, 300.0), cell_size=50.0)
+    path = str(tmp_path / f"wind{suffix}")
+    field.save(path)
+    loaded = WindField.load(path)
+    assert loaded.u == pytest.approx(field.u) and loaded.v == pytest.approx(field.v)
+    assert loaded.origin == field.origin and loaded.cell_size == field.cell_size
+
+
+def test_cache_drops_old_graph_versions():
+    g = make_graph(drones=3, deliveries=10)
+    field = WindField.generate(seed=1)
+    first = field.edge_tables(g, 8.0)
+    assert field.edge_tables(g, 8.0) is first
+    g.update_drone_position(g.drones[0].id, (10.0, 10.0))
+    field.edge_tables(g, 8.0)
+    assert {key[1] for key in field._tables._data} == {g.version}
+    field.update(field.u * 2, field.v * 2)
+    assert len(field._tables) == 0 and field.version == 1
+
+
+def test_ga_batch_fitness_with_wind_field():
+    g = make_graph(drones=4, deliveries=25, seed=2)
+    random.seed(0)
+    ga = GeneticAlgorithm(g, population_size=20, wind_field=WindField.generate(seed=2))
+    population = ga._initialize_population()
+    assert ga.evaluate_batch(population) == pytest.approx([ga._evaluate(ind) for ind in population])
+
+
+class TestWindPayload:
+    """server.wind_from_payload: istemci rüzgâr ayarları sınırlı ve yalnızca ValueError üretir."""
+
+    @pytest.mark.parametrize("payload", [
+        {"path": "/etc/passwd"},
+        {"cell_size": 1, "bounds": [0, 0, 100000, 100000]},
+        {"cell_size": 0},
+        {"samples": 1000},
+        {"smoothness": 10 ** 6},
+        {"mean_speed": "fast"},
+        {"bounds": [0, 0, 10]},
+        {"unknown": 1},
+        {"u": [[1.0, 2.0]], "v": [[1.0]]},
+        {"u": [[0.0] * 600] * 600, "v": [[0.0] * 600] * 600},
+    ])
+    def test_rejects_invalid_payloads(self, payload):
+        import server
+        with pytest.raises(ValueError):
+            server.wind_from_payload(payload)
+
+    def test_path_restricted_to_wind_dir(self, tmp_path, monkeypatch):
+        import server
+        WindField.uniform(3.0).save(str(tmp_path / "calm.json"))
+        monkeypatch.setattr(server, "WIND_DIR", str(tmp_path))
+        assert server.wind_from_payload({"path": "calm.json"}).u == pytest.approx(3.0)
+        with pytest.raises(ValueError):
+            server.wind_from_payload({"path": "../" + tmp_path.name + "/../../etc/passwd"})
+
+    def test_generate_within_limits(self):
+        import server
+        field = server.wind_from_payload({"mean_speed": 4.0, "cell_size": 50, "samples": 4, "seed": 1})
+        assert field.u.shape == (21, 21) and field.samples == 4
+
+    def test_plan_endpoint_returns_400(self):
+        from fastapi.testclient import TestClient
+        import server
+        g = make_graph(drones=2, deliveries=4)
+        body = {
+            "drones": [{"id": d.id, "max_weight": d.max_weight, "battery": d.battery, "speed": d.speed,
+                        "start_pos": d.start_pos} for d in g.drones],
+            "deliveries": [{"id": d.id, "pos": d.pos, "weight": d.weight, "priority": d.priority,
+                            "time_window": d.time_window} for d in g.deliveries],
+            "no_fly_zones": [], "use_ga": True, "ga_params": {"generations": 2, "population_size": 4},
+        }
+        client = TestClient(server.app)
+        assert client.post("/plan", json={**body, "wind": {"cell_size": 0.5}}).status_code == 400
+        assert client.post("/plan", json={**body, "wind": {"path": "x.npz"}}).status_code == 400
+        assert client.post("/plan", json={**body, "wind": {"mean_speed": 3.0, "seed": 1}}).status_code == 200